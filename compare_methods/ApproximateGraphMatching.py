@@ -0,0 +1,363 @@
+import gc
+import math
+import time
+
+import numpy as np
+
+
+class BeamGraphMatcher:
+    """
+    Approximate graph edit distance by a beam search over the assignments of the nodes of the first graph to the nodes
+    of the second graph or to their deletion. The nodes are matched by their structure and their type attribute, the
+    labels are only used for the initial assignment which maps the nodes of the same label.
+    The effort is limited by the beam width, the number of expanded states and a wall clock budget per pair, which
+    also covers indexing the graphs and completing the states of a stopped search. The search returns the best edit
+    cost found, which is an upper bound, a lower bound from an admissible heuristic and whether the cost is exact,
+    which is the case if no state was dropped by the limits.
+    """
+
+    def __init__(self, node_del: float = 1, node_ins: float = 1, edge_del: float = 1, edge_ins: float = 1,
+                 node_sub: float = 1, beam_width: int = 10, max_iterations: int = None, time_budget: float = None):
+        """
+        :param node_del: cost of a node deletion
+        :param node_ins: cost of a node insertion
+        :param edge_del: cost of an edge deletion
+        :param edge_ins: cost of an edge insertion
+        :param node_sub: cost of the substitution of a node by a node of another type, math.inf to forbid it
+        :param beam_width: number of states which are kept per search level
+        :param max_iterations: maximum number of expanded states, None for no limit
+        :param time_budget: wall clock budget of a pair in seconds, None for no limit
+        """
+        self.node_del = node_del
+        self.node_ins = node_ins
+        self.edge_del = edge_del
+        self.edge_ins = edge_ins
+        self.node_sub = node_sub
+        self.beam_width = beam_width
+        self.max_iterations = max_iterations
+        self.time_budget = time_budget
+        # measured time to index the graphs of the last pair per node and edge, to skip it if it exceeds the budget
+        self.setup_time_per_element = 0.0
+
+    def match(self, G1, G2):
+        """
+        Search the edit cost between two graphs. The search allocates many acyclic containers, a collection of the
+        cyclic garbage collector triggered by them scans the whole heap e.g. all window graphs and can take longer than
+        the budget, so it is deferred till the search is done.
+        :param G1: first networkx graph
+        :param G2: second networkx graph
+        :return: dict with the best cost, the lower bound, whether the cost is exact and the expanded states
+        """
+        is_gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self.search(G1, G2)
+        finally:
+            if is_gc_enabled:
+                gc.enable()
+
+    def search(self, G1, G2):
+        """
+        Beam search of the edit cost between two graphs within the limits
+        :return: dict like match
+        """
+        start_time = time.perf_counter()
+        deadline = start_time + self.time_budget if self.time_budget is not None else None
+        elements_count = G1.number_of_nodes() + G1.number_of_edges() + G2.number_of_nodes() + G2.number_of_edges()
+        if deadline is not None and self.setup_time_per_element * elements_count >= self.time_budget:
+            return self.get_size_bounds(G1, G2)
+
+        problem = self.create_problem(G1, G2)
+        nodes_count_1 = len(problem['types_1'])
+        nodes_count_2 = len(problem['types_2'])
+        remaining_edges_1 = problem['remaining_edges_1']
+        edges_count_2 = problem['edges_count_2']
+
+        # a state is the cost so far, the assignment of the nodes of the first graph (-1 for a deletion), the inverse
+        # assignment and the number of counted edges of the second graph
+        states = [(0, [], {}, 0)]
+        completion_start_time = time.perf_counter()
+        upper_bound = self.get_label_completion_cost(problem, 0, *states[0])
+        setup_end_time = time.perf_counter()
+        self.setup_time_per_element = (setup_end_time - start_time) / max(elements_count, 1)
+
+        # the time of a completion is reserved, so the states of a stopped search can be completed within the budget
+        completion_duration = setup_end_time - completion_start_time
+        search_deadline = deadline - completion_duration if deadline is not None else None
+        lower_bound = math.inf
+        is_exact = True
+        iterations = 0
+        for level in range(nodes_count_1):
+            candidates = []
+            for state in states:
+                if self.is_limit_reached(search_deadline, iterations):
+                    break
+                iterations += 1
+                state_candidates = self.expand_state(problem, level, state, upper_bound, search_deadline)
+                if state_candidates is None:
+                    break
+                candidates += state_candidates
+            else:
+                candidates.sort(key=lambda candidate: candidate[0])
+                if len(candidates) > self.beam_width:
+                    is_exact = False
+                    lower_bound = min(lower_bound, candidates[self.beam_width][0])
+                states = []
+                for f_cost, g_cost, assignment, inverse_assignment, position_2, counted_edges_2 in \
+                        candidates[:self.beam_width]:
+                    if position_2 >= 0:
+                        inverse_assignment = dict(inverse_assignment)
+                        inverse_assignment[position_2] = level
+                    states.append((g_cost, assignment + [position_2], inverse_assignment, counted_edges_2))
+                continue
+
+            # the search is stopped, the unassigned nodes of the most promising states are assigned to the nodes of
+            # the same label as long as the budget allows it
+            is_exact = False
+            f_costs = [g_cost + self.get_heuristic_cost(nodes_count_1 - level, nodes_count_2 - len(inverse_assignment),
+                                                        remaining_edges_1[level], edges_count_2 - counted_edges_2)
+                       for g_cost, assignment, inverse_assignment, counted_edges_2 in states]
+            lower_bound = min([lower_bound] + f_costs)
+            # the completion of the initial state is the initial upper bound
+            completed_states = sorted(zip(f_costs, states), key=lambda f_cost_state: f_cost_state[0]) if level else []
+            for f_cost, state in completed_states:
+                if deadline is not None and time.perf_counter() + completion_duration > deadline:
+                    break
+                upper_bound = min(upper_bound, self.get_label_completion_cost(problem, level, *state))
+            states = []
+            break
+
+        for g_cost, assignment, inverse_assignment, counted_edges_2 in states:
+            upper_bound = min(upper_bound, g_cost + self.get_insertion_cost(
+                nodes_count_2 - len(inverse_assignment), edges_count_2 - counted_edges_2))
+        if is_exact or lower_bound >= upper_bound:
+            return {'cost': upper_bound, 'lower_bound': upper_bound, 'exact': True, 'iterations': iterations}
+        return {'cost': upper_bound, 'lower_bound': lower_bound, 'exact': False, 'iterations': iterations}
+
+    def expand_state(self, problem, level, state, upper_bound, deadline):
+        """
+        Assign the node of the level to every unassigned node of the second graph or delete it
+        :return: list of the candidates which can improve the upper bound, None if the deadline passed
+        """
+        g_cost, assignment, inverse_assignment, counted_edges_2 = state
+        nodes_count_1 = len(problem['types_1'])
+        nodes_count_2 = len(problem['types_2'])
+        candidates = []
+        positions_2 = [-1] + [position for position in range(nodes_count_2) if position not in inverse_assignment]
+        for idx, position_2 in enumerate(positions_2):
+            # a state of large graphs has many candidates, so the deadline is also checked within a state
+            if deadline is not None and idx % 64 == 63 and time.perf_counter() >= deadline:
+                return None
+            cost, added_edges_2 = self.get_assignment_cost(problem, level, position_2, assignment, inverse_assignment)
+            f_cost = g_cost + cost + self.get_heuristic_cost(
+                nodes_count_1 - level - 1, nodes_count_2 - len(inverse_assignment) - (position_2 >= 0),
+                problem['remaining_edges_1'][level + 1], problem['edges_count_2'] - counted_edges_2 - added_edges_2)
+            # states which can not improve the best cost are pruned without losing exactness
+            if f_cost < upper_bound:
+                candidates.append((f_cost, g_cost + cost, assignment, inverse_assignment, position_2,
+                                   counted_edges_2 + added_edges_2))
+        return candidates
+
+    @staticmethod
+    def create_problem(G1, G2):
+        """
+        Index the nodes of both graphs by their positions. The nodes of the first graph are assigned by descending
+        degree, so the search branches early on the hubs.
+        :return: dict of the adjacency, loops and types of both graphs by position
+        """
+        nodes_1 = sorted(G1, key=G1.degree, reverse=True)
+        nodes_2 = list(G2)
+        positions_1 = {node: position for position, node in enumerate(nodes_1)}
+        positions_2 = {node: position for position, node in enumerate(nodes_2)}
+        adjacency_1 = [{positions_1[neighbor] for neighbor in G1.adj[node] if neighbor != node} for node in nodes_1]
+        loops_1 = [G1.has_edge(node, node) for node in nodes_1]
+        earlier_neighbors_1 = [[neighbor for neighbor in adjacency_1[position] if neighbor < position]
+                               for position in range(len(nodes_1))]
+        return {
+            'adjacency_1': adjacency_1,
+            'adjacency_2': [{positions_2[neighbor] for neighbor in G2.adj[node] if neighbor != node}
+                            for node in nodes_2],
+            'loops_1': loops_1,
+            'loops_2': [G2.has_edge(node, node) for node in nodes_2],
+            'types_1': [G1.nodes[node].get('type') for node in nodes_1],
+            'types_2': [G2.nodes[node].get('type') for node in nodes_2],
+            'earlier_neighbors_1': earlier_neighbors_1,
+            # number of edges of the first graph which are not counted before the assignment of a node
+            'remaining_edges_1': np.cumsum([len(neighbors) + loop for neighbors, loop in
+                                            zip(earlier_neighbors_1[::-1], loops_1[::-1])])[::-1].tolist() + [0],
+            'edges_count_2': G2.number_of_edges(),
+            # position of the node of the same label in the second graph, -1 if there is none
+            'label_positions': [positions_2.get(node, -1) for node in nodes_1]
+        }
+
+    def is_limit_reached(self, deadline, iterations):
+        if self.max_iterations is not None and iterations >= self.max_iterations:
+            return True
+        return deadline is not None and time.perf_counter() >= deadline
+
+    def get_size_bounds(self, G1, G2):
+        """
+        Bounds from the numbers of nodes and edges only, if indexing the graphs does not fit the budget. The upper
+        bound deletes the first and inserts the second graph.
+        :return: dict like match
+        """
+        nodes_count_1, edges_count_1 = G1.number_of_nodes(), G1.number_of_edges()
+        nodes_count_2, edges_count_2 = G2.number_of_nodes(), G2.number_of_edges()
+        upper_bound = nodes_count_1 * self.node_del + edges_count_1 * self.edge_del + \
+            self.get_insertion_cost(nodes_count_2, edges_count_2)
+        lower_bound = self.get_heuristic_cost(nodes_count_1, nodes_count_2, edges_count_1, edges_count_2)
+        if lower_bound >= upper_bound:
+            return {'cost': upper_bound, 'lower_bound': upper_bound, 'exact': True, 'iterations': 0}
+        return {'cost': upper_bound, 'lower_bound': lower_bound, 'exact': False, 'iterations': 0}
+
+    def get_assignment_cost(self, problem, level, position_2, assignment, inverse_assignment):
+        """
+        Cost of assigning the node of the level to a node of the second graph or of deleting it with the edges to the
+        nodes which are already assigned
+        :return: cost and the number of edges of the second graph which are counted by the assignment
+        """
+        loop_1 = problem['loops_1'][level]
+        if position_2 < 0:
+            return self.node_del + self.edge_del * (len(problem['earlier_neighbors_1'][level]) + loop_1), 0
+
+        cost = 0 if problem['types_1'][level] == problem['types_2'][position_2] else self.node_sub
+        neighbors_2 = problem['adjacency_2'][position_2]
+        for neighbor in problem['earlier_neighbors_1'][level]:
+            if assignment[neighbor] not in neighbors_2:
+                cost += self.edge_del
+        added_edges_2 = 0
+        for neighbor in neighbors_2:
+            if neighbor in inverse_assignment:
+                added_edges_2 += 1
+                if inverse_assignment[neighbor] not in problem['adjacency_1'][level]:
+                    cost += self.edge_ins
+        loop_2 = problem['loops_2'][position_2]
+        if loop_1 != loop_2:
+            cost += self.edge_del if loop_1 else self.edge_ins
+        return cost, added_edges_2 + loop_2
+
+    def get_label_completion_cost(self, problem, level, g_cost, assignment, inverse_assignment, counted_edges_2):
+        """
+        Cost of a complete assignment, the unassigned nodes of a state are assigned to the unassigned nodes of the
+        same label or deleted
+        :return: cost
+        """
+        assignment = list(assignment)
+        inverse_assignment = dict(inverse_assignment)
+        for position_1 in range(level, len(problem['types_1'])):
+            position_2 = problem['label_positions'][position_1]
+            if position_2 in inverse_assignment or (
+                    position_2 >= 0 and problem['types_1'][position_1] != problem['types_2'][position_2] and
+                    self.node_sub >= self.node_del + self.node_ins):
+                position_2 = -1
+            cost, added_edges_2 = self.get_assignment_cost(problem, position_1, position_2, assignment,
+                                                           inverse_assignment)
+            g_cost += cost
+            counted_edges_2 += added_edges_2
+            assignment.append(position_2)
+            if position_2 >= 0:
+                inverse_assignment[position_2] = position_1
+        return g_cost + self.get_insertion_cost(len(problem['types_2']) - len(inverse_assignment),
+                                                problem['edges_count_2'] - counted_edges_2)
+
+    def get_heuristic_cost(self, nodes_count_1, nodes_count_2, edges_count_1, edges_count_2):
+        """
+        Lower bound of the cost of the unassigned nodes and uncounted edges, only their numbers can not be matched
+        """
+        if nodes_count_1 > nodes_count_2:
+            nodes_cost = (nodes_count_1 - nodes_count_2) * self.node_del
+        else:
+            nodes_cost = (nodes_count_2 - nodes_count_1) * self.node_ins
+        if edges_count_1 > edges_count_2:
+            return nodes_cost + (edges_count_1 - edges_count_2) * self.edge_del
+        return nodes_cost + (edges_count_2 - edges_count_1) * self.edge_ins
+
+    def get_insertion_cost(self, nodes_count_2, edges_count_2):
+        """
+        Cost of inserting the unassigned nodes and uncounted edges of the second graph
+        """
+        return nodes_count_2 * self.node_ins + edges_count_2 * self.edge_ins
+
+
+class ApproximateGraphMatching:
+    """
+    Approximate graph matching algorithm with the compare and distance methods of the gmatch4py algorithms, so it can
+    be used by the TwitterGraphComparator. The flag exact tells whether all costs of the last compare were exact.
+    """
+
+    def __init__(self, matcher: BeamGraphMatcher):
+        self.matcher = matcher
+        self.exact = True
+
+    def start_pair(self, time_budget: float = None):
+        """
+        Set the wall clock budget for the next compare and reset the flag exact
+        :param time_budget: budget in seconds, None for no limit
+        """
+        self.matcher.time_budget = time_budget
+        self.exact = True
+
+    def match(self, G1, G2):
+        result = self.matcher.match(G1, G2)
+        self.exact = self.exact and result['exact']
+        return result
+
+    def compare(self, graph_list, selected):
+        """
+        :param graph_list: list of networkx graphs
+        :param selected: not used, all graphs are compared
+        :return: matrix of the pairs
+        """
+        matrix = np.zeros((len(graph_list), len(graph_list)))
+        for i in range(len(graph_list)):
+            for j in range(i, len(graph_list)):
+                matrix[i, j] = matrix[j, i] = self.compare_pair(graph_list[i], graph_list[j], i == j)
+        return matrix
+
+    def compare_pair(self, G1, G2, is_same_graph: bool):
+        raise NotImplementedError
+
+    def distance(self, matrix):
+        raise NotImplementedError
+
+
+class ApproximateGraphEditDistance(ApproximateGraphMatching):
+    """
+    Approximate graph edit distance, the best edit cost found by the beam search
+    """
+
+    def __init__(self, node_del: float = 1, node_ins: float = 1, edge_del: float = 1, edge_ins: float = 1,
+                 beam_width: int = 10, max_iterations: int = None, time_budget: float = None):
+        super().__init__(BeamGraphMatcher(node_del, node_ins, edge_del, edge_ins, node_sub=node_del + node_ins,
+                                          beam_width=beam_width, max_iterations=max_iterations,
+                                          time_budget=time_budget))
+
+    def compare_pair(self, G1, G2, is_same_graph: bool):
+        return 0.0 if is_same_graph else self.match(G1, G2)['cost']
+
+    def distance(self, matrix):
+        return matrix
+
+
+class ApproximateMCS(ApproximateGraphMatching):
+    """
+    Approximate maximum common edge subgraph of nodes of the same type, the similarity is the number of common edges
+    divided by the number of edges of the larger graph. The common edges are the edges which are not deleted or
+    inserted by the best assignment found by the beam search, so the similarity is a lower bound.
+    """
+
+    def __init__(self, beam_width: int = 10, max_iterations: int = None, time_budget: float = None):
+        super().__init__(BeamGraphMatcher(0, 0, 1, 1, node_sub=math.inf, beam_width=beam_width,
+                                          max_iterations=max_iterations, time_budget=time_budget))
+
+    def compare_pair(self, G1, G2, is_same_graph: bool):
+        edges_count = max(G1.number_of_edges(), G2.number_of_edges())
+        if edges_count == 0:
+            return 0.0
+        if is_same_graph:
+            return 1.0
+        common_edges_count = (G1.number_of_edges() + G2.number_of_edges() - self.match(G1, G2)['cost']) / 2
+        return common_edges_count / edges_count
+
+    def distance(self, matrix):
+        return np.max(matrix) - matrix
@@ -1,5 +1,11 @@
+from datetime import datetime
+import os
+
 import pandas as pd
 
+from utils.CandleStore import CandleStore
+from utils.PartitionType import get_seconds_for_partition_type
+
 
 class BTCPriceDataCreator:
     """
@@ -7,13 +13,34 @@ class BTCPriceDataCreator:
     """
 
     data_path = '../data/btc_price_data/'
+    candle_store_path = data_path + 'store/'
+    symbol_pair = 'BTC-USD'
 
     def __init__(self, year, partition_type):
-        filename = f"{year}_{partition_type.value}.csv"
-        self.btc_data = pd.read_csv(self.data_path + filename, header=0, converters={'date': pd.to_datetime})
+        granularity = get_seconds_for_partition_type(partition_type)
+        start_date_time = datetime(int(year), 1, 1)
+        end_date_time = datetime(int(year), 12, 31, 23, 59, 59)
+
+        candle_store = CandleStore(self.candle_store_path)
+        self.btc_data = candle_store.get_range(self.symbol_pair, granularity, start_date_time, end_date_time)
+
+        # merge the yearly price data file if the store does not cover the whole year, the candles of the store are
+        # preferred and the store is not changed
+        if candle_store.find_gaps(self.symbol_pair, granularity, start_date_time, end_date_time):
+            file_path = self.data_path + f"{year}_{partition_type.value}.csv"
+            if os.path.exists(file_path):
+                candles_df = pd.read_csv(file_path, usecols=CandleStore.candle_columns, header=0)
+                candles_df = pd.concat([CandleStore.prepare_candles(candles_df), self.btc_data], ignore_index=True)
+                self.btc_data = CandleStore.prepare_candles(candles_df.drop_duplicates('unix', keep='last'))
+            elif self.btc_data.shape[0] == 0:
+                raise FileNotFoundError(f"No {partition_type.value} price data of year {year} in the candle store "
+                                        f"{self.candle_store_path} or the file {file_path}")
+            else:
+                print(f"The candle store covers the {partition_type.value} price data of year {year} partially and "
+                      f"there is no file {file_path}")
+
         self.btc_data = self.btc_data.rename(columns={'date': 'date_time'})
-        self.btc_data = self.btc_data[['date_time', 'close']]
-        self.btc_data.set_index(pd.to_datetime(self.btc_data['date_time']), inplace=True)
+        self.btc_data = self.btc_data.set_index('date_time')
         self.btc_data = self.btc_data[['close']]
 
     def get_prepared_price_df(self):
@@ -0,0 +1,38 @@
+from compare_methods.ApproximateGraphMatching import ApproximateGraphEditDistance, ApproximateMCS
+from compare_methods.BenchmarkTwitterGraphCreator import create_tweets
+from compare_methods.NodeVocabulary import NodeVocabulary
+from compare_methods.TwitterGraphComparator import TwitterGraphComparator
+from compare_methods.TwitterGraphCreator import TwitterGraphCreator
+from utils.PartitionType import PartitionType
+from utils.StopWatch import StopWatch
+
+if __name__ == '__main__':
+    """
+    Run the approximate graph edit distance and maximum common subgraph on all windows with different total time
+    budgets, the total time follows the budget and a larger budget gives tighter bounds.
+    """
+    ################################################ configuration #####################################################
+
+    tweets_count = 100000
+    days = 7
+    partition_type = PartitionType.ONE_HOUR
+    time_budgets = [10, 30, 90]
+
+    ####################################################################################################################
+
+    tweets_df = create_tweets(tweets_count, days=days)
+    graph_list = TwitterGraphCreator(tweets_df, vocabulary=NodeVocabulary()).compute_compact_graphs(partition_type)
+    twitter_graph_comparator = TwitterGraphComparator(graph_list)
+    twitter_graph_comparator.graph_matching_algorithms = [ApproximateGraphEditDistance, ApproximateMCS]
+    print(f"{len(graph_list) - 1} graph pairs of {partition_type.value} windows")
+    stop_watch = StopWatch()
+
+    for time_budget in time_budgets:
+        stop_watch.start()
+        compare_results = twitter_graph_comparator.compute_graph_distances(normalized=False, time_budget=time_budget)
+        print(f"time budget {time_budget}[s] per algorithm took {stop_watch.get_time()}[s]")
+        for compare_result in compare_results:
+            result_df = compare_result['data']
+            print(f"{compare_result['algorithm']}: {round(result_df['duration'].sum(), 2)}[s], mean distance "
+                  f"{round(result_df['distance'].mean(), 4)}, {int(result_df['exact'].sum())} of "
+                  f"{result_df.shape[0]} distances exact")
@@ -0,0 +1,75 @@
+import tracemalloc
+
+from compare_methods.BenchmarkTwitterGraphCreator import create_tweets
+from compare_methods.NodeVocabulary import NodeVocabulary
+from compare_methods.TwitterGraphCreator import TwitterGraphCreator
+from utils.PartitionType import PartitionType
+from utils.StopWatch import StopWatch
+
+
+def is_graph_equal(G1, G2):
+    """
+    Compare nodes with their types in insertion order and the edges
+    """
+    return list(G1.nodes(data=True)) == list(G2.nodes(data=True)) and \
+        set(map(frozenset, G1.edges())) == set(map(frozenset, G2.edges()))
+
+
+def is_compact_graph_equal(G, compact_graph):
+    """
+    Compare a compact graph with the networkx graph it has to be equal to, including the number of edges and the raw
+    CSR arrays, every neighbor is stored once and in the order of the networkx adjacency
+    """
+    labels = compact_graph.get_labels()
+    positions = {label: position for position, label in enumerate(labels)}
+    return is_graph_equal(G, compact_graph.to_networkx()) and compact_graph.number_of_edges() == G.number_of_edges() \
+        and all(compact_graph.get_neighbors(position).tolist() == [positions[neighbor] for neighbor in G.adj[label]]
+                for position, label in enumerate(labels))
+
+
+def measure_graph_stage(tweets_df, partition_type, vocabulary=None):
+    """
+    Create the window graphs and measure the time and the memory which is held by them
+    :return: graph records, duration and allocated bytes
+    """
+    stop_watch = StopWatch()
+    tracemalloc.start()
+    stop_watch.start()
+    graph_records = TwitterGraphCreator(tweets_df, vocabulary=vocabulary).compute_graphs(partition_type)
+    duration = stop_watch.get_time()
+    allocated_bytes, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return graph_records, duration, allocated_bytes
+
+
+if __name__ == '__main__':
+    """
+    Memory report of the window graphs as networkx graphs and as compact graphs with interned node ids
+    """
+    ################################################ configuration #####################################################
+
+    tweets_count = 300000
+    days = 14
+    partition_type = PartitionType.FIVE_MINUTES
+
+    ####################################################################################################################
+
+    tweets_df = create_tweets(tweets_count, days=days)
+
+    nx_records, nx_duration, nx_bytes = measure_graph_stage(tweets_df, partition_type)
+    vocabulary = NodeVocabulary()
+    compact_records, compact_duration, compact_bytes = measure_graph_stage(tweets_df, partition_type, vocabulary)
+
+    windows_count = len(nx_records)
+    print(f"{tweets_count} tweets in {windows_count} windows of {partition_type.value}, "
+          f"{len(vocabulary)} distinct node labels")
+    for name, duration, allocated_bytes in [('networkx', nx_duration, nx_bytes),
+                                            ('compact', compact_duration, compact_bytes)]:
+        print(f"{name}: took {duration}[s], {round(allocated_bytes / 1024 ** 2, 2)}[MB] held by the graphs, "
+              f"{round(allocated_bytes / windows_count / 1024, 2)}[KB] per window")
+    print(f"compact arrays: {round(sum(r['graph'].nbytes for r in compact_records) / 1024 ** 2, 2)}[MB]")
+
+    # the compact graphs have the same nodes, node types and edges, also with reciprocal mentions
+    equal_graphs = all(is_compact_graph_equal(nx_record['graph'], compact_record['graph'])
+                       for nx_record, compact_record in zip(nx_records, compact_records))
+    print(f"equal graphs: {equal_graphs}")
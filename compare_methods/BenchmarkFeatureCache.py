@@ -0,0 +1,46 @@
+import numpy as np
+
+from compare_methods import OverlapMetrics as om
+from compare_methods.BenchmarkTwitterGraphCreator import create_tweets
+from compare_methods.NodeVocabulary import NodeVocabulary
+from compare_methods.TwitterGraphComparator import TwitterGraphComparator
+from compare_methods.TwitterGraphCreator import TwitterGraphCreator
+from utils.PartitionType import PartitionType
+from utils.StopWatch import StopWatch
+
+if __name__ == '__main__':
+    """
+    Benchmark the comparison with the graph feature cache against calling compare of the overlap metrics for every
+    pair and check that the distances are equal.
+    """
+    ################################################ configuration #####################################################
+
+    tweets_count = 100000
+    days = 7
+    partition_type = PartitionType.ONE_HOUR
+    algorithms = [om.Jaccard, om.VertexEdgeOverlap, om.BagOfNodes]
+
+    ####################################################################################################################
+
+    tweets_df = create_tweets(tweets_count, days=days)
+    graph_list = TwitterGraphCreator(tweets_df, vocabulary=NodeVocabulary()).compute_compact_graphs(partition_type)
+    stop_watch = StopWatch()
+
+    results = {}
+    for name, feature_cache_size in [('compare', 0), ('feature cache', 128)]:
+        twitter_graph_comparator = TwitterGraphComparator(graph_list, feature_cache_size=feature_cache_size)
+        twitter_graph_comparator.graph_matching_algorithms = algorithms
+        stop_watch.start()
+        results[name] = twitter_graph_comparator.compute_graph_distances(normalized=False)
+        print(f"{name}: {len(graph_list) - 1} graph pairs took {stop_watch.get_time()}[s]")
+        if twitter_graph_comparator.feature_cache is not None:
+            print(f"{twitter_graph_comparator.feature_cache.misses} graphs featurized, "
+                  f"{twitter_graph_comparator.feature_cache.hits} cache hits")
+
+    for compare_result, cached_result in zip(results['compare'], results['feature cache']):
+        duration = compare_result['data']['duration'].sum()
+        cached_duration = cached_result['data']['duration'].sum()
+        max_difference = np.max(np.abs(compare_result['data']['distance'].to_numpy(dtype=float) -
+                                       cached_result['data']['distance'].to_numpy(dtype=float)))
+        print(f"{compare_result['algorithm']}: {round(duration, 3)}[s] -> {round(cached_duration, 3)}[s], "
+              f"max distance difference {max_difference}, can be cached: {max_difference == 0}")
@@ -0,0 +1,69 @@
+from compare_methods.BenchmarkCompactGraph import is_graph_equal
+from compare_methods.BenchmarkTwitterGraphCreator import create_tweets
+from compare_methods.NodeVocabulary import NodeVocabulary
+from compare_methods.TwitterGraphCreator import TwitterGraphCreator
+from utils.PartitionType import PartitionType
+from utils.StopWatch import StopWatch
+
+
+def is_record_equal(record_1, record_2):
+    """
+    Compare the intervals and the graphs of two graph records
+    """
+    graph_1, graph_2 = [record['graph'].to_networkx() if hasattr(record['graph'], 'to_networkx') else record['graph']
+                        for record in (record_1, record_2)]
+    return record_1['interval_start'] == record_2['interval_start'] and \
+        record_1['interval_end'] == record_2['interval_end'] and is_graph_equal(graph_1, graph_2)
+
+
+def is_equal_to_networkx_records(tweets_df, partition_type, *graph_records_lists):
+    """
+    Compare graph records with the networkx graphs of the former tweet by tweet creation, which uses resample
+    """
+    networkx_records = TwitterGraphCreator(tweets_df).compute_graphs(partition_type)
+    return all(len(graph_records) == len(networkx_records) and
+               all(is_record_equal(networkx_record, record) for networkx_record, record in
+                   zip(networkx_records, graph_records)) for graph_records in graph_records_lists)
+
+
+if __name__ == '__main__':
+    """
+    Check that the coarse graphs of the single pass multi resolution creation are equal to the directly created
+    graphs, and compare the time against one creation per partition type.
+    """
+    ################################################ configuration #####################################################
+
+    tweets_count = 200000
+    days = 7
+    partition_types = list(PartitionType) + ['30Min', '4H']
+    # offsets which do not divide a day, resample anchors them at the midnight of the first tweet
+    undivided_partition_types = ['7Min', '35Min']
+
+    ####################################################################################################################
+
+    tweets_df = create_tweets(tweets_count, days=days)
+    stop_watch = StopWatch()
+
+    stop_watch.start()
+    direct_records = {partition_type: TwitterGraphCreator(tweets_df, vocabulary=NodeVocabulary()).compute_graphs(
+        partition_type) for partition_type in partition_types}
+    print(f"one pass per partition type took {stop_watch.get_time()}[s]")
+
+    stop_watch.reset()
+    multi_resolution_records = TwitterGraphCreator(tweets_df, vocabulary=NodeVocabulary()) \
+        .compute_multi_resolution_graphs(partition_types)
+    print(f"single pass took {stop_watch.get_time()}[s]")
+
+    # the networkx graphs of the former tweet by tweet creation are the reference
+    for partition_type in partition_types:
+        equal_graphs = is_equal_to_networkx_records(tweets_df, partition_type, multi_resolution_records[partition_type],
+                                                    direct_records[partition_type])
+        print(f"{TwitterGraphCreator.get_partition_value(partition_type)}: "
+              f"{len(multi_resolution_records[partition_type])} graphs, equal to the direct graphs: {equal_graphs}")
+
+    undivided_records = TwitterGraphCreator(tweets_df, vocabulary=NodeVocabulary()) \
+        .compute_multi_resolution_graphs(undivided_partition_types)
+    for partition_type in undivided_partition_types:
+        equal_graphs = is_equal_to_networkx_records(tweets_df, partition_type, undivided_records[partition_type])
+        print(f"{partition_type}: {len(undivided_records[partition_type])} graphs, equal to the direct graphs: "
+              f"{equal_graphs}")
@@ -0,0 +1,69 @@
+import os
+import time
+
+import gmatch4py as gm
+import numpy as np
+import pandas as pd
+
+from compare_methods import OverlapMetrics as om
+from compare_methods.BenchmarkTwitterGraphCreator import create_tweets
+from compare_methods.NodeVocabulary import NodeVocabulary
+from compare_methods.TwitterGraphCreator import TwitterGraphCreator
+from utils.ParquetTweetStore import ParquetTweetStore
+from utils.PartitionType import PartitionType
+from utils.TweetLoader import TweetLoader
+
+
+def measure_pair_latencies(comp_algorithm, graphs):
+    """
+    Compare the consecutive graphs pairwise
+    :return: array of the distances and array of the latencies per pair in microseconds
+    """
+    distances = []
+    latencies = []
+    for g1, g2 in zip(graphs, graphs[1:]):
+        start_time = time.perf_counter()
+        distances.append(np.asarray(comp_algorithm.distance(comp_algorithm.compare([g1, g2], None)))[0][1])
+        latencies.append((time.perf_counter() - start_time) * 1e6)
+    return np.array(distances, dtype=float), np.array(latencies)
+
+
+if __name__ == '__main__':
+    """
+    Per pair latency of the set based overlap metrics against the gmatch4py algorithms and the largest difference of
+    their distances. Uses the parquet tweet store if it exists, otherwise generated tweets.
+    """
+    ################################################ configuration #####################################################
+
+    tweets_store_path = '../data/tweets_parquet/'
+    date_time_start = pd.Timestamp('2022-01-01')
+    date_time_end = pd.Timestamp('2022-01-07 23:59:59')
+    tweets_count = 100000
+    days = 7
+    partition_type = PartitionType.ONE_HOUR
+    algorithm_pairs = [(gm.BagOfNodes, om.BagOfNodes), (gm.Jaccard, om.Jaccard),
+                       (gm.VertexEdgeOverlap, om.VertexEdgeOverlap)]
+
+    ####################################################################################################################
+
+    if os.path.isdir(tweets_store_path):
+        tweet_loader = TweetLoader(ParquetTweetStore(tweets_store_path), columns=TwitterGraphCreator.GRAPH_COLUMNS)
+        tweets_df = tweet_loader.load(date_time_start, date_time_end)
+    else:
+        tweets_df = create_tweets(tweets_count, days=days)
+    graph_list = TwitterGraphCreator(tweets_df, vocabulary=NodeVocabulary()).compute_compact_graphs(partition_type)
+    # both graphs of a pair need nodes, the comparator does not call the algorithms for two empty graphs
+    compact_graphs = [record['graph'] for record in graph_list if record['graph'].number_of_nodes() > 0]
+    networkx_graphs = [graph.to_networkx() for graph in compact_graphs]
+    print(f"{len(compact_graphs) - 1} graph pairs of {partition_type.value} windows")
+
+    for algorithm, overlap_metric in algorithm_pairs:
+        distances, latencies = measure_pair_latencies(algorithm(), networkx_graphs)
+        native_distances, native_latencies = measure_pair_latencies(overlap_metric(), compact_graphs)
+        print(f"{algorithm.__name__}: gmatch4py {round(np.median(latencies), 1)}[us] per pair, set based "
+              f"{round(np.median(native_latencies), 1)}[us] per pair - speedup "
+              f"{round(np.median(latencies) / np.median(native_latencies), 2)}x, "
+              f"max distance difference {np.max(np.abs(distances - native_distances))}")
+
+        # the metric can only replace the gmatch4py algorithm in the comparator if the distances are identical
+        print(f"{overlap_metric.__name__} can replace gmatch4py: {np.array_equal(distances, native_distances)}")
@@ -0,0 +1,61 @@
+from datetime import datetime
+import os
+
+from compare_methods.BenchmarkTwitterGraphCreator import create_tweets
+from compare_methods.GraphCache import GraphCache
+from compare_methods.NodeVocabulary import NodeVocabulary
+from compare_methods.TwitterGraphComparator import TwitterGraphComparator
+from compare_methods.TwitterGraphCreator import TwitterGraphCreator
+from utils.ParquetTweetStore import ParquetTweetStore
+from utils.PartitionType import PartitionType
+from utils.StopWatch import StopWatch
+from utils.TweetLoader import TweetLoader
+from utils.TweetReaders import get_tweets_input_files
+
+if __name__ == '__main__':
+    """
+    Scaling benchmark of the parallel graph comparison over the number of worker processes. Uses the cached graphs or
+    the tweets of the parquet tweet store if they exist, otherwise generated tweets.
+    """
+    ################################################ configuration #####################################################
+
+    tweets_data_path = '../data/tweets/'
+    tweets_store_path = '../data/tweets_parquet/'
+    graph_cache_path = '../data/graph_cache/'
+    year = '2018'
+    tweets_count = 100000
+    days = 7
+    partition_type = PartitionType.ONE_HOUR
+
+    ####################################################################################################################
+
+    graph_list = None
+    if os.path.isdir(tweets_store_path):
+        input_file_paths = get_tweets_input_files(tweets_data_path, tweets_store_path, year)
+        fingerprint = GraphCache.create_fingerprint(input_file_paths, partition_type.value,
+                                                    TwitterGraphCreator.get_graph_options())
+        graph_list = GraphCache(graph_cache_path).load(year, partition_type.value, fingerprint)
+        if graph_list is None:
+            tweet_loader = TweetLoader(ParquetTweetStore(tweets_store_path), columns=TwitterGraphCreator.GRAPH_COLUMNS)
+            tweets_df = tweet_loader.load(datetime(int(year), 1, 1), datetime(int(year), 12, 31, 23, 59, 59, 999999))
+    else:
+        tweets_df = create_tweets(tweets_count, days=days)
+    if graph_list is None:
+        graph_list = TwitterGraphCreator(tweets_df, vocabulary=NodeVocabulary()).compute_compact_graphs(partition_type)
+    twitter_graph_comparator = TwitterGraphComparator(graph_list)
+    stop_watch = StopWatch()
+
+    # number of processes doubled up to the number of cores
+    processes_counts = [1]
+    while processes_counts[-1] * 2 <= os.cpu_count():
+        processes_counts.append(processes_counts[-1] * 2)
+    if processes_counts[-1] != os.cpu_count():
+        processes_counts.append(os.cpu_count())
+
+    durations = {}
+    for processes in processes_counts:
+        stop_watch.start()
+        compare_results = twitter_graph_comparator.compute_graph_distances(normalized=True, processes=processes)
+        durations[processes] = stop_watch.get_time()
+        print(f"{processes} processes: {len(graph_list) - 1} graph pairs with {len(compare_results)} algorithms took "
+              f"{durations[processes]}[s] - speedup {round(durations[1] / durations[processes], 2)}x")
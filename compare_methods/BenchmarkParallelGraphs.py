@@ -0,0 +1,59 @@
+from datetime import datetime
+import os
+
+from compare_methods.BenchmarkMultiResolutionGraphs import is_record_equal
+from compare_methods.BenchmarkTwitterGraphCreator import create_tweets
+from compare_methods.NodeVocabulary import NodeVocabulary
+from compare_methods.TwitterGraphCreator import TwitterGraphCreator
+from utils.ParquetTweetStore import ParquetTweetStore
+from utils.PartitionType import PartitionType
+from utils.StopWatch import StopWatch
+from utils.TweetLoader import TweetLoader
+
+if __name__ == '__main__':
+    """
+    Scaling benchmark of the parallel graph creation over the number of worker processes. Uses the tweets of 2018 of
+    the parquet tweet store if it exists, otherwise generated tweets.
+    """
+    ################################################ configuration #####################################################
+
+    tweets_store_path = '../data/tweets_parquet/'
+    year = 2018
+    tweets_count = 300000
+    days = 14
+    partition_type = PartitionType.FIVE_MINUTES
+
+    ####################################################################################################################
+
+    if os.path.isdir(tweets_store_path):
+        tweet_loader = TweetLoader(ParquetTweetStore(tweets_store_path), columns=TwitterGraphCreator.GRAPH_COLUMNS)
+        tweets_df = tweet_loader.load(datetime(year, 1, 1), datetime(year, 12, 31, 23, 59, 59, 999999))
+    else:
+        tweets_df = create_tweets(tweets_count, days=days)
+    stop_watch = StopWatch()
+
+    # number of processes doubled up to the number of cores
+    processes_counts = [1]
+    while processes_counts[-1] * 2 <= os.cpu_count():
+        processes_counts.append(processes_counts[-1] * 2)
+    if processes_counts[-1] != os.cpu_count():
+        processes_counts.append(os.cpu_count())
+
+    # compact graphs are returned by the workers as they are, networkx graphs are converted in this process
+    for name, create_vocabulary in [('compact', NodeVocabulary), ('networkx', lambda: None)]:
+        durations = {}
+        for processes in processes_counts:
+            graph_creator = TwitterGraphCreator(tweets_df, vocabulary=create_vocabulary())
+            stop_watch.start()
+            graph_records = graph_creator.compute_graphs_parallel(partition_type, processes=processes)
+            durations[processes] = stop_watch.get_time()
+            print(f"{name} {processes} processes: {len(graph_records)} graphs of {tweets_df.shape[0]} tweets took "
+                  f"{durations[processes]}[s] - speedup {round(durations[1] / durations[processes], 2)}x")
+
+        # the graphs are equal to the sequential creation
+        sequential_records = TwitterGraphCreator(tweets_df, vocabulary=create_vocabulary()).compute_graphs(
+            partition_type)
+        equal_graphs = len(sequential_records) == len(graph_records) and all(
+            is_record_equal(sequential_record, record) for sequential_record, record in
+            zip(sequential_records, graph_records))
+        print(f"{name} equal to the sequential graphs: {equal_graphs}")
@@ -0,0 +1,53 @@
+import pandas as pd
+
+from compare_methods.BenchmarkTwitterGraphCreator import create_tweets
+from compare_methods.TwitterGraphCreator import TwitterGraphCreator
+from utils.PartitionType import PartitionType
+from utils.StopWatch import StopWatch
+
+
+def is_graph_equal(G1, G2):
+    """
+    Compare nodes with their types and the edges, the node order of the live graph differs
+    """
+    return dict(G1.nodes(data='type')) == dict(G2.nodes(data='type')) and \
+        set(map(frozenset, G1.edges())) == set(map(frozenset, G2.edges()))
+
+
+if __name__ == '__main__':
+    """
+    Benchmark the sliding window graphs with edge reference counting against rebuilding every overlapping window
+    """
+    ################################################ configuration #####################################################
+
+    tweets_count = 100000
+    days = 3
+    window_type = PartitionType.ONE_HOUR
+    step_type = PartitionType.FIVE_MINUTES
+
+    ####################################################################################################################
+
+    tweets_df = create_tweets(tweets_count, days=days)
+    graph_creator = TwitterGraphCreator(tweets_df)
+    stop_watch = StopWatch()
+
+    stop_watch.start()
+    steps_count = sum(1 for graph_record in graph_creator.compute_sliding_graphs(window_type, step_type, as_view=True))
+    print(f"sliding views: {steps_count} windows took {stop_watch.get_time()}[s]")
+
+    stop_watch.reset()
+    sliding_records = list(graph_creator.compute_sliding_graphs(window_type, step_type))
+    print(f"sliding copies: {len(sliding_records)} windows took {stop_watch.get_time()}[s]")
+
+    stop_watch.reset()
+    rebuilt_graphs = []
+    for graph_record in sliding_records:
+        window_start = pd.Timestamp(graph_record['interval_start'])
+        window_end = pd.Timestamp(graph_record['interval_end'])
+        window_df = tweets_df[(tweets_df.index >= window_start) & (tweets_df.index < window_end)]
+        rebuilt_graphs.append(TwitterGraphCreator.create_twitter_graph(window_df))
+    print(f"rebuild: {len(rebuilt_graphs)} windows took {stop_watch.get_time()}[s]")
+
+    equal_graphs = all(is_graph_equal(graph_record['graph'], G) for graph_record, G in
+                       zip(sliding_records, rebuilt_graphs))
+    print(f"equal graphs: {equal_graphs}")
@@ -0,0 +1,55 @@
+import numpy as np
+
+from compare_methods import OverlapMetrics as om
+from compare_methods.BenchmarkTwitterGraphCreator import create_tweets
+from compare_methods.NodeVocabulary import NodeVocabulary
+from compare_methods.SparseWindowDistances import SparseWindowDistances
+from compare_methods.TwitterGraphComparator import TwitterGraphComparator
+from compare_methods.TwitterGraphCreator import TwitterGraphCreator
+from utils.PartitionType import PartitionType
+from utils.StopWatch import StopWatch
+
+if __name__ == '__main__':
+    """
+    Benchmark the sparse window x feature matrix against the pairwise comparison of the TwitterGraphComparator for
+    adjacent windows, and the lag and all pairs distances which are only feasible with the matrix.
+    """
+    ################################################ configuration #####################################################
+
+    tweets_count = 300000
+    days = 14
+    partition_type = PartitionType.FIFTEEN_MINUTES
+    block_size = 256
+
+    ####################################################################################################################
+
+    tweets_df = create_tweets(tweets_count, days=days)
+    graph_list = TwitterGraphCreator(tweets_df, vocabulary=NodeVocabulary()).compute_compact_graphs(partition_type)
+    print(f"{tweets_df.shape[0]} tweets in {len(graph_list)} windows of {partition_type.value}")
+    stop_watch = StopWatch()
+
+    twitter_graph_comparator = TwitterGraphComparator(graph_list)
+    twitter_graph_comparator.graph_matching_algorithms = [om.BagOfNodes]
+    stop_watch.start()
+    compare_result = twitter_graph_comparator.compute_graph_distances(normalized=True)[0]['data']
+    print(f"comparator BagOfNodes lag 1: {stop_watch.get_time()}[s]")
+
+    for method in SparseWindowDistances.methods:
+        stop_watch.start()
+        sparse_window_distances = SparseWindowDistances(graph_list, method)
+        feature_matrix = sparse_window_distances.feature_matrix
+        print(f"{method}: feature matrix {feature_matrix.shape} with {feature_matrix.nnz} entries took "
+              f"{stop_watch.get_time()}[s]")
+
+        day_lag = sparse_window_distances.get_lag('1D')
+        for lag in [1, day_lag]:
+            stop_watch.start()
+            lag_df = sparse_window_distances.compute_lag_distances(lag, normalized=True)
+            print(f"{method} lag {lag}: {lag_df.shape[0]} distances took {stop_watch.get_time()}[s]")
+            if lag == 1 and method == 'BagOfNodes':
+                print(f"equal to the comparator: "
+                      f"{np.array_equal(lag_df['distance'].to_numpy(), compare_result['distance'].to_numpy(float))}")
+
+        stop_watch.start()
+        distance_matrix = sparse_window_distances.compute_distance_matrix(block_size)
+        print(f"{method} all pairs: {distance_matrix.shape} distance matrix took {stop_watch.get_time()}[s]")
@@ -0,0 +1,107 @@
+import os
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+from compare_methods.TwitterGraphCreator import TwitterGraphCreator
+from utils.ParquetTweetStore import ParquetTweetStore
+from utils.PartitionType import PartitionType
+from utils.StopWatch import StopWatch
+from utils.TweetLoader import TweetLoader
+
+
+def create_twitter_graph_per_row(df):
+    """
+    Former graph creation of the TwitterGraphCreator which adds the entities tweet by tweet
+    """
+    G = nx.Graph()
+    for idx, row in df.iterrows():
+        user_node = row['user_screen_name']
+        G.add_nodes_from([(user_node, {'type': 'user'})])
+        for user_mention_node in row['mentions']:
+            if not isinstance(user_mention_node, str):
+                user_mention_node = user_mention_node['screen_name']
+            if user_mention_node is user_node:
+                continue
+            G.add_nodes_from(
+                [(user_mention_node, {'type': 'user'})])
+            G.add_edge(user_node, user_mention_node)
+        for hashtag in row['hashtags']:
+            if hashtag.lower() in ['btc', 'bitcoin']:
+                continue
+            hashtag_node = hashtag.lower()
+            G.add_nodes_from([(hashtag_node, {'type': 'hashtag'})])
+            G.add_edge(user_node, hashtag_node)
+        for domain in row['domains']:
+            domain_node = domain.lower()
+            G.add_nodes_from([(domain_node, {'type': 'domain'})])
+            G.add_edge(user_node, domain_node)
+    G.remove_nodes_from([n for (n, deg) in G.degree() if deg == 0])
+    return G
+
+
+def is_graph_identical(G1, G2):
+    """
+    Compare nodes with their types, edges and the adjacency in insertion order
+    """
+    return list(G1.nodes(data=True)) == list(G2.nodes(data=True)) and list(G1.edges) == list(G2.edges) and \
+        all(list(G1.adj[node]) == list(G2.adj[node]) for node in G1)
+
+
+def create_tweets(tweets_count, days=2, seed=0):
+    """
+    Create prepared tweets over some days, mentions partly in the crawled dict format, with self mentions and with
+    reciprocal mentions of users who mention each other
+    """
+    rng = np.random.default_rng(seed)
+    users = [f"user{idx}" for idx in range(2000)]
+    hashtags = ['Bitcoin', 'BTC', 'crypto', 'Crypto', 'ETH', 'blockchain', 'user7', 'NFT']
+    domains = ['youtube.com', 'CoinDesk.com', 'bit.ly', 'twitter.com']
+    created_at = pd.Timestamp('2022-01-01') + pd.to_timedelta(np.sort(rng.integers(0, days * 86400, tweets_count)),
+                                                              unit='s')
+    user_idx = rng.integers(0, len(users), tweets_count)
+    tweets_df = pd.DataFrame({
+        'created_at': created_at,
+        'user_screen_name': [users[idx] for idx in user_idx],
+        'mentions': [[users[(idx + k * 31) % len(users)] if k % 2 else {'id': k, 'screen_name': users[idx]}
+                      for k in range(idx % 3)] + ([users[(idx - 31) % len(users)]] if idx % 5 == 0 else [])
+                     for idx in user_idx],
+        'hashtags': [list(rng.choice(hashtags, size=idx % 4)) for idx in user_idx],
+        'domains': [list(rng.choice(domains, size=idx % 2)) for idx in user_idx]})
+    return tweets_df.set_index('created_at')
+
+
+if __name__ == '__main__':
+    """
+    Benchmark the bulk graph creation against the former tweet by tweet creation. Uses the parquet tweet store if it
+    exists, otherwise generated tweets.
+    """
+    ################################################ configuration #####################################################
+
+    tweets_store_path = '../data/tweets_parquet/'
+    date_time_start = pd.Timestamp('2022-01-01')
+    date_time_end = pd.Timestamp('2022-01-02 23:59:59')
+    tweets_count = 100000
+    partition_type = PartitionType.ONE_HOUR
+
+    ####################################################################################################################
+
+    if os.path.isdir(tweets_store_path):
+        tweet_loader = TweetLoader(ParquetTweetStore(tweets_store_path), columns=TwitterGraphCreator.GRAPH_COLUMNS)
+        tweets_df = tweet_loader.load(date_time_start, date_time_end)
+    else:
+        tweets_df = create_tweets(tweets_count)
+    windows = [tweets for time_stamp, tweets in tweets_df.resample(partition_type.value)]
+    print(f"{tweets_df.shape[0]} tweets in {len(windows)} windows of {partition_type.value}")
+
+    stop_watch = StopWatch()
+    results = {}
+    for name, create_twitter_graph in [('per row', create_twitter_graph_per_row),
+                                       ('bulk', TwitterGraphCreator.create_twitter_graph)]:
+        stop_watch.start()
+        results[name] = [create_twitter_graph(window_df) for window_df in windows]
+        duration = stop_watch.get_time()
+        print(f"{name}: {len(windows)} windows took {duration}[s] ({round(len(windows) / duration, 2)} windows/s)")
+
+    print(f"identical graphs: {all(is_graph_identical(G1, G2) for G1, G2 in zip(results['per row'], results['bulk']))}")
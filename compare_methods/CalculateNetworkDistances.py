@@ -1,49 +1,17 @@
+from datetime import timedelta
 import os
-import time
 
+from compare_methods.ApproximateGraphMatching import ApproximateGraphEditDistance, ApproximateMCS
 from compare_methods.BTCPriceDataCreator import BTCPriceDataCreator
+from compare_methods.GraphCache import GraphCache
+from compare_methods.NodeVocabulary import NodeVocabulary
 from compare_methods.TwitterGraphComparator import TwitterGraphComparator
 from compare_methods.TwitterGraphCreator import *
 
+from utils.ParquetTweetStore import ParquetTweetStore
 from utils.PartitionType import PartitionType
-
-
-def read_monthly_data(tweets_data_path, year):
-    """
-    Read the monthly tweets data csv Files and create one full data frame
-    :param tweets_data_path: the path where the files are
-    :param year: the year in which the data is collected
-    :return: complete data frame containing all tweets
-    """
-    print(f"Start reading Files for Method Comparison for year {year}")
-    # Twitter dataframe converters
-    twitter_df_converters = {
-        'created_at': pd.to_datetime,
-        'text': str,
-        'hashtags': eval,
-        'mentions': eval,
-        'domains': eval,
-        'user_screen_name': str,
-    }
-
-    # create time frame based graphs
-    monthly_df_list = []
-    for root, dirs, files in os.walk(tweets_data_path + year + '/'):
-        for file in files:
-
-            if not file.endswith(".csv"):
-                continue
-            start_time = time.time()
-            monthly_df = pd.read_csv(root + file, converters=twitter_df_converters, header=0)
-            monthly_df.set_index('created_at', inplace=True)
-            monthly_df_list.append(monthly_df)
-            print(
-                f"Successfully loaded data from file: {file} with shape {monthly_df.shape[0]} took: "
-                f"{round(float(time.time() - start_time), 2)}[s]")
-
-    complete_tweets_df = pd.concat(monthly_df_list)
-    print(f"Concatenated all monthly tweets final size: {complete_tweets_df.shape[0]}")
-    return complete_tweets_df
+from utils.TweetLoader import TweetLoader
+from utils.TweetReaders import get_tweets_input_files, read_year_tweets
 
 
 def calc_mean_duration_time(time_graph_data_df):
@@ -65,20 +33,24 @@ def calc_mean_node_size(node_graph_data_df):
         int)
 
 
-def create_and_save_statistics(year, dest_file_path, comp_results):
+def create_and_save_statistics(year, partition_type, dest_file_path, comp_results, processes):
     """
     Create and save statistics of the graph comparison
     :param year: the year in which the data is collected
+    :param partition_type: the partition type of the compared graphs
     :param dest_file_path: destination file path
-    :param comp_results: the
+    :param comp_results: the results of the graph comparison
+    :param processes: number of processes the graph pairs were compared on, the durations are only comparable
+    between runs with the same number of processes
     """
     algorithms = [comp_result['algorithm'] for comp_result in comp_results]
     mean_duration_times = [calc_mean_duration_time(comp_result['data']) for comp_result in
-                           compare_results]
+                           comp_results]
     mean_node_sizes = [calc_mean_node_size(comp_result['data']) for comp_result in
-                       compare_results]
+                       comp_results]
     statistics_result_df = pd.DataFrame.from_dict(
-        {'algorithm': algorithms, 'mean_duration_time': mean_duration_times, 'mean_node_size': mean_node_sizes})
+        {'algorithm': algorithms, 'mean_duration_time': mean_duration_times, 'mean_node_size': mean_node_sizes,
+         'processes': processes})
     statistics_result_path = dest_file_path + year + '/' + partition_type.value + "_statistics.csv"
     statistics_result_df.to_csv(statistics_result_path, index=False)
 
@@ -88,30 +60,74 @@ if __name__ == '__main__':
     Calculate the network distances based on the chosen network comparison methods.
     """
 
-    # read in Tweets
+    # read in Tweets, the parquet tweet store is used if it exists
     tweets_data_path = '../data/tweets/'
+    tweets_store_path = '../data/tweets_parquet/'
     # comp_results path
     result_csv_path = '../data/comp_results/'
 
+    # only the columns needed for the graphs are loaded, the decoded tweets of a year are shared by all partition
+    # types
+    tweet_loader = TweetLoader(ParquetTweetStore(tweets_store_path), columns=TwitterGraphCreator.GRAPH_COLUMNS)
+
+    # the window graphs are stored as compact graphs with node ids of one vocabulary
+    node_vocabulary = NodeVocabulary()
+
+    # the created graphs are cached per year and partition type
+    graph_cache = GraphCache('../data/graph_cache/')
+
+    # number of processes the graph pairs are compared on, None for the number of cores. With more than one process
+    # the durations are measured while the processes share the cores and memory bandwidth, so the number of processes
+    # is saved with the durations in the statistics.
+    comparator_processes = None
+
+    # time budget in seconds per partition type for the approximate graph edit distance and maximum common subgraph,
+    # None to compare without them
+    approximate_time_budget = None
+
     # calculate distances for the data of the years 2018 and 2022
     for year in ['2018', '2022']:
 
-        # read tweets data
-        tweets_df = read_monthly_data(tweets_data_path, year)
+        # the cached graphs are used if neither the tweets nor the graph options have changed
+        input_file_paths = get_tweets_input_files(tweets_data_path, tweets_store_path, year)
+        fingerprints = {partition_type: graph_cache.create_fingerprint(
+            input_file_paths, partition_type.value, TwitterGraphCreator.get_graph_options())
+            for partition_type in PartitionType}
+        graph_lists = {partition_type: graph_cache.load(year, partition_type.value, fingerprints[partition_type])
+                       for partition_type in PartitionType}
+
+        if any(graph_list is None for graph_list in graph_lists.values()):
+
+            # read tweets data, the store is only used if the year is converted
+            tweets_df = read_year_tweets(tweets_data_path, tweet_loader, tweets_store_path, year)
+
+            # create the graphs of all partition types in one pass over the tweets
+            print(f"Create partitioned Graph lists for all partition types and year {year}")
+            graph_creator = TwitterGraphCreator(tweets_df, vocabulary=node_vocabulary)
+            graph_lists = graph_creator.compute_multi_resolution_graphs(list(PartitionType))
+            for partition_type, graph_list in graph_lists.items():
+                graph_cache.store(year, partition_type.value, fingerprints[partition_type], graph_list)
+
+            # the tweets of a year are loaded once, so their decoded row groups are not kept for the next year
+            del tweets_df, graph_creator
+            tweet_loader.clear_cache()
+        else:
+            print(f"Use cached Graph lists for all partition types and year {year}")
 
         for partition_type in PartitionType:
 
             print(f"############## Start processing Partition Type {partition_type.value} ##############")
-
-            # create a list of graphs for the given partition_type
-            print(f"Create partitioned Graph list for partition type: {partition_type.value} and year {year}")
-            graph_creator = TwitterGraphCreator(tweets_df)
-            graph_list = graph_creator.compute_graphs(partition_type)
+            graph_list = graph_lists[partition_type]
 
             # calculate the graph distances based on the used comparison methods
             print(f"Calculate network distances for partition type: {partition_type.value} and year {year}")
             twitter_graph_comparator = TwitterGraphComparator(graph_list)
-            compare_results = twitter_graph_comparator.compute_graph_distances(normalized=True)
+            if approximate_time_budget is not None:
+                twitter_graph_comparator.graph_matching_algorithms = \
+                    TwitterGraphComparator.get_default_algorithms() + [ApproximateGraphEditDistance, ApproximateMCS]
+            compare_results = twitter_graph_comparator.compute_graph_distances(normalized=True,
+                                                                              processes=comparator_processes,
+                                                                              time_budget=approximate_time_budget)
 
             # fetch the bitcoin price data
             print(f"Fetch bitcoin price data for year {year}")
@@ -120,7 +136,8 @@ if __name__ == '__main__':
 
             # create and save statistic data of distance computation
             print(f"Create and save statistics for partition type: {partition_type.value} and year {year}")
-            create_and_save_statistics(year, result_csv_path, compare_results)
+            create_and_save_statistics(year, partition_type, result_csv_path, compare_results,
+                                       comparator_processes or os.cpu_count())
 
             # merge the calculated network distances into one data frame
             for count, compare_result in enumerate(compare_results):
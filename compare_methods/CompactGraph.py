@@ -0,0 +1,136 @@
+import networkx as nx
+import numpy as np
+
+from compare_methods.NodeVocabulary import NodeVocabulary
+
+
+class CompactGraph:
+    """
+    Compact undirected graph of a window. The nodes are interned ids of a shared NodeVocabulary and the adjacency is
+    stored as CSR arrays, the neighbors of a node are ordered by the insertion of their edges. Algorithms which need
+    a networkx graph convert it on demand with to_networkx.
+    """
+
+    __slots__ = ['vocabulary', 'node_ids', 'node_types', 'indptr', 'indices']
+
+    def __init__(self, vocabulary: NodeVocabulary, node_ids, node_types, indptr, indices):
+        """
+        :param vocabulary: vocabulary of the node labels
+        :param node_ids: int32 array of the vocabulary ids of the nodes in insertion order
+        :param node_types: int8 array of the type codes of the nodes
+        :param indptr: int32 array, the neighbors of node i are indices[indptr[i]:indptr[i + 1]]
+        :param indices: int32 array of the local node positions of the neighbors
+        """
+        self.vocabulary = vocabulary
+        self.node_ids = node_ids
+        self.node_types = node_types
+        self.indptr = indptr
+        self.indices = indices
+
+    @classmethod
+    def from_edge_list(cls, vocabulary: NodeVocabulary, nodes, node_types, edge_sources, edge_targets):
+        """
+        Create a compact graph from nodes and an edge list in insertion order
+        :param vocabulary: vocabulary of the node labels
+        :param nodes: node labels in insertion order, every node needs to be part of an edge
+        :param node_types: node types e.g. 'user'
+        :param edge_sources: labels of the first nodes of the edges
+        :param edge_targets: labels of the second nodes of the edges
+        :return: CompactGraph
+        """
+        node_positions = {node: position for position, node in enumerate(nodes)}
+        sources = np.fromiter((node_positions[node] for node in edge_sources), dtype=np.int32)
+        targets = np.fromiter((node_positions[node] for node in edge_targets), dtype=np.int32)
+        return cls.from_positions(vocabulary, vocabulary.intern(nodes), vocabulary.encode_types(node_types), sources,
+                                  targets)
+
+    @classmethod
+    def from_positions(cls, vocabulary: NodeVocabulary, node_ids, node_types, sources, targets):
+        """
+        Create the CSR arrays from an edge list of local node positions in insertion order. An edge and its reverse
+        e.g. of two users who mention each other are one undirected edge, its first occurrence is kept like in networkx.
+        :return: CompactGraph
+        """
+        edge_keys = np.minimum(sources, targets).astype(np.int64) * node_ids.shape[0] + np.maximum(sources, targets)
+        first_positions = np.sort(np.unique(edge_keys, return_index=True)[1])
+        if first_positions.shape[0] < sources.shape[0]:
+            sources, targets = sources[first_positions], targets[first_positions]
+
+        # both directions of an edge, a self loop is a single neighbor entry like in networkx
+        is_loop = sources == targets
+        ranks = np.arange(sources.shape[0], dtype=np.int32)
+        rows = np.concatenate([sources, targets[~is_loop]])
+        columns = np.concatenate([targets, sources[~is_loop]])
+        order = np.lexsort((np.concatenate([ranks, ranks[~is_loop]]), rows))
+
+        indptr = np.zeros(node_ids.shape[0] + 1, dtype=np.int32)
+        np.cumsum(np.bincount(rows, minlength=node_ids.shape[0]), out=indptr[1:])
+        return cls(vocabulary, node_ids, node_types, indptr, columns[order].astype(np.int32))
+
+    @classmethod
+    def from_networkx(cls, G, vocabulary: NodeVocabulary):
+        """
+        Create a compact graph from a twitter graph
+        :param G: networkx graph with a type attribute per node
+        :param vocabulary: vocabulary of the node labels
+        :return: CompactGraph
+        """
+        node_positions = {node: position for position, node in enumerate(G)}
+        edges = list(G.edges())
+        sources = np.fromiter((node_positions[u] for u, v in edges), dtype=np.int32, count=len(edges))
+        targets = np.fromiter((node_positions[v] for u, v in edges), dtype=np.int32, count=len(edges))
+        node_types = vocabulary.encode_types(node_type for node, node_type in G.nodes(data='type'))
+        return cls.from_positions(vocabulary, vocabulary.intern(G), node_types, sources, targets)
+
+    @classmethod
+    def create_empty(cls, vocabulary: NodeVocabulary):
+        """
+        :return: CompactGraph without nodes
+        """
+        return cls(vocabulary, np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int8), np.zeros(1, dtype=np.int32),
+                   np.empty(0, dtype=np.int32))
+
+    def to_networkx(self):
+        """
+        Convert to a networkx graph with the node labels and the type attribute. The nodes and edges are equal to the
+        graph the compact graph was created from, the nodes are added in the same order.
+        :return: networkx graph
+        """
+        G = nx.Graph()
+        labels = self.vocabulary.get_labels(self.node_ids)
+        G.add_nodes_from((label, {'type': node_type}) for label, node_type in
+                         zip(labels, self.vocabulary.decode_types(self.node_types)))
+
+        # every edge once from its lower node position
+        rows = np.repeat(np.arange(self.node_ids.shape[0], dtype=np.int32), np.diff(self.indptr))
+        is_upper = self.indices >= rows
+        G.add_edges_from((labels[u], labels[v]) for u, v in zip(rows[is_upper], self.indices[is_upper]))
+        return G
+
+    def number_of_nodes(self):
+        return self.node_ids.shape[0]
+
+    def number_of_edges(self):
+        rows = np.repeat(np.arange(self.node_ids.shape[0], dtype=np.int32), np.diff(self.indptr))
+        loops_count = int(np.count_nonzero(self.indices == rows))
+        return (self.indices.shape[0] + loops_count) // 2
+
+    def get_labels(self):
+        """
+        :return: list of the node labels in insertion order
+        """
+        return self.vocabulary.get_labels(self.node_ids)
+
+    def get_neighbors(self, position):
+        """
+        :param position: local position of a node
+        :return: array of the local positions of its neighbors
+        """
+        return self.indices[self.indptr[position]:self.indptr[position + 1]]
+
+    @property
+    def nbytes(self):
+        """
+        Size of the arrays of the graph, the labels are stored once in the vocabulary
+        """
+        return self.node_ids.nbytes + self.node_types.nbytes + self.indptr.nbytes + self.indices.nbytes
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from compare_methods.CompactGraph import CompactGraph
+from compare_methods.NodeVocabulary import NodeVocabulary
+
+
+class CachedGraphList:
+    """
+    Read only list of cached graph records. The arrays are memory mapped and the graph of a window is only created
+    when its record is accessed.
+    """
+
+    def __init__(self, entry_path):
+        """
+        :param entry_path: directory of the cache entry
+        """
+        with open(os.path.join(entry_path, 'records.json'), 'r', encoding='utf-8') as records_file:
+            self.records = json.load(records_file)
+        with open(os.path.join(entry_path, 'labels.json'), 'r', encoding='utf-8') as labels_file:
+            labels = json.load(labels_file)
+        self.vocabulary = NodeVocabulary()
+        self.vocabulary.intern(labels)
+        self.arrays = {name: np.load(os.path.join(entry_path, f"{name}.npy"), mmap_mode='r')
+                       for name in GraphCache.array_names}
+
+    def __len__(self):
+        return len(self.records['interval_starts'])
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        node_slice = slice(self.arrays['node_starts'][idx], self.arrays['node_starts'][idx + 1])
+        indices_slice = slice(self.arrays['indices_starts'][idx], self.arrays['indices_starts'][idx + 1])
+        indptr_slice = slice(self.arrays['node_starts'][idx] + idx, self.arrays['node_starts'][idx + 1] + idx + 1)
+        graph = CompactGraph(self.vocabulary, self.arrays['node_ids'][node_slice],
+                             self.arrays['node_types'][node_slice], self.arrays['indptr'][indptr_slice],
+                             self.arrays['indices'][indices_slice])
+        return {'interval_start': self.records['interval_starts'][idx],
+                'interval_end': self.records['interval_ends'][idx],
+                'partition': self.records['partition'],
+                'graph': graph}
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+
+class GraphCache:
+    """
+    Persistent cache of the window graphs of a year and partition. The graphs are stored as concatenated CSR arrays
+    in a directory per entry which is named by a fingerprint of the input files, the partition and the options of
+    the graph creation, so an entry is invalidated if one of them changes.
+    """
+
+    array_names = ['node_ids', 'node_types', 'indptr', 'indices', 'node_starts', 'indices_starts']
+
+    def __init__(self, cache_path: str):
+        """
+        :param cache_path: directory of the cache e.g. ../data/graph_cache/
+        """
+        self.cache_path = cache_path
+
+    @staticmethod
+    def create_fingerprint(input_file_paths, partition_value: str, graph_options: dict):
+        """
+        Create the fingerprint of the inputs of the graph creation. The input files are identified by path, size and
+        modification time, so they do not need to be read.
+        :param input_file_paths: files of the tweets the graphs are created from
+        :param partition_value: pandas offset alias of the partition
+        :param graph_options: options of the graph creation e.g. TwitterGraphCreator.get_graph_options()
+        :return: hex digest
+        """
+        input_files = []
+        for file_path in sorted(input_file_paths):
+            file_stat = os.stat(file_path)
+            input_files.append([os.path.abspath(file_path), file_stat.st_size, file_stat.st_mtime_ns])
+        fingerprint_source = json.dumps({'input_files': input_files, 'partition': partition_value,
+                                         'graph_options': graph_options}, sort_keys=True)
+        return hashlib.sha256(fingerprint_source.encode('utf-8')).hexdigest()
+
+    def get_entry_path(self, year, partition_value: str, fingerprint: str):
+        return os.path.join(self.cache_path, f"{year}_{partition_value}_{fingerprint[:20]}")
+
+    def load(self, year, partition_value: str, fingerprint: str):
+        """
+        Load the cached graph records of a year and partition
+        :return: CachedGraphList or None if there is no entry for the fingerprint
+        """
+        entry_path = self.get_entry_path(year, partition_value, fingerprint)
+        if not os.path.isdir(entry_path):
+            return None
+        return CachedGraphList(entry_path)
+
+    def store(self, year, partition_value: str, fingerprint: str, graph_records):
+        """
+        Store the graph records of a year and partition and remove the outdated entries of them
+        :param year: the year of the graphs
+        :param partition_value: pandas offset alias of the partition
+        :param fingerprint: fingerprint of the inputs
+        :param graph_records: graph records with networkx graphs or CompactGraphs
+        :return: path of the cache entry
+        """
+        vocabulary = NodeVocabulary()
+        graphs = [self.to_local_graph(record['graph'], vocabulary) for record in graph_records]
+        arrays = {'node_ids': np.concatenate([np.empty(0, dtype=np.int32)] + [graph.node_ids for graph in graphs]),
+                  'node_types': np.concatenate([np.empty(0, dtype=np.int8)] + [graph.node_types for graph in graphs]),
+                  'indptr': np.concatenate([np.empty(0, dtype=np.int32)] + [graph.indptr for graph in graphs]),
+                  'indices': np.concatenate([np.empty(0, dtype=np.int32)] + [graph.indices for graph in graphs]),
+                  'node_starts': np.cumsum([0] + [graph.number_of_nodes() for graph in graphs], dtype=np.int64),
+                  'indices_starts': np.cumsum([0] + [graph.indices.shape[0] for graph in graphs], dtype=np.int64)}
+        records = {'partition': partition_value,
+                   'interval_starts': [record['interval_start'] for record in graph_records],
+                   'interval_ends': [record['interval_end'] for record in graph_records]}
+
+        # write to a temporary directory which is renamed, so an entry is never incomplete
+        os.makedirs(self.cache_path, exist_ok=True)
+        temp_path = tempfile.mkdtemp(dir=self.cache_path)
+        for name, array in arrays.items():
+            np.save(os.path.join(temp_path, f"{name}.npy"), array)
+        with open(os.path.join(temp_path, 'labels.json'), 'w', encoding='utf-8') as labels_file:
+            json.dump(vocabulary.labels, labels_file)
+        with open(os.path.join(temp_path, 'records.json'), 'w', encoding='utf-8') as records_file:
+            json.dump(records, records_file)
+
+        entry_path = self.get_entry_path(year, partition_value, fingerprint)
+        self.remove_entries(year, partition_value)
+        os.replace(temp_path, entry_path)
+        return entry_path
+
+    def remove_entries(self, year, partition_value: str):
+        """
+        Remove all entries of a year and partition
+        """
+        if not os.path.isdir(self.cache_path):
+            return
+        prefix = f"{year}_{partition_value}_"
+        for entry in os.listdir(self.cache_path):
+            if entry.startswith(prefix) and len(entry) == len(prefix) + 20:
+                shutil.rmtree(os.path.join(self.cache_path, entry))
+
+    @staticmethod
+    def to_local_graph(graph, vocabulary: NodeVocabulary):
+        """
+        Convert a graph to a CompactGraph with the node ids of the vocabulary of the cache entry
+        :param graph: networkx graph or CompactGraph
+        :param vocabulary: vocabulary of the cache entry
+        :return: CompactGraph
+        """
+        if isinstance(graph, CompactGraph):
+            return CompactGraph(vocabulary, vocabulary.intern(graph.get_labels()), graph.node_types, graph.indptr,
+                                graph.indices)
+        return CompactGraph.from_networkx(graph, vocabulary)
@@ -0,0 +1,74 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+class GraphFeatureCache:
+    """
+    Bounded LRU cache of the per graph representations of the comparison algorithms. Every window graph is compared
+    with its predecessor and its successor, with the cache its node and edge ids are created once and the distance is
+    computed from the two cached features instead of calling compare of the algorithm. Only the metrics of
+    OverlapMetrics are cached, their compare uses the same features, so the distances are equal. The gmatch4py
+    algorithms are compared by their own compare, a representation of them is only added once BenchmarkFeatureCache
+    shows no distance difference against gmatch4py.
+    """
+
+    def __init__(self, max_size: int = 128):
+        """
+        :param max_size: maximum number of cached features
+        """
+        self.max_size = max_size
+        self.features = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def is_supported(algorithm):
+        """
+        :return: whether the algorithm has a per graph representation, like the metrics of OverlapMetrics
+        """
+        return hasattr(algorithm, 'create_features')
+
+    def get_features(self, algorithm, comp_algorithm, key, graph):
+        """
+        Get the representation of a graph for an algorithm, it is created if it is not cached
+        :param algorithm: network comparison algorithm
+        :param comp_algorithm: initialized instance of the algorithm
+        :param key: key of the window e.g. the interval start
+        :param graph: networkx graph or CompactGraph of the window
+        :return: features of the graph
+        """
+        cache_key = (algorithm.__name__, key)
+        if cache_key in self.features:
+            self.hits += 1
+            self.features.move_to_end(cache_key)
+            return self.features[cache_key]
+        self.misses += 1
+        features = comp_algorithm.create_features(graph)
+        self.features[cache_key] = features
+        if len(self.features) > self.max_size:
+            self.features.popitem(last=False)
+        return features
+
+    def compute_distance(self, algorithm, comp_algorithm, key_1, g1, key_2, g2):
+        """
+        Calculate the distance between two graphs from their cached features. The similarity matrix of the pair is
+        created like by compare of the algorithm, so the distance of the algorithm is used.
+        :param algorithm: network comparison algorithm
+        :param comp_algorithm: initialized instance of the algorithm
+        :param key_1: key of the first window
+        :param g1: first graph
+        :param key_2: key of the second window
+        :param g2: second graph
+        :return: distance
+        """
+        get_similarity = comp_algorithm.get_similarity
+        features_1 = self.get_features(algorithm, comp_algorithm, key_1, g1)
+        features_2 = self.get_features(algorithm, comp_algorithm, key_2, g2)
+        similarity = get_similarity(features_1, features_2)
+        matrix = np.array([[get_similarity(features_1, features_1), similarity],
+                           [similarity, get_similarity(features_2, features_2)]], dtype=float)
+        return np.asarray(comp_algorithm.distance(matrix))[0][1]
+
+    def clear(self):
+        self.features = OrderedDict()
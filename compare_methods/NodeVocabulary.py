@@ -0,0 +1,54 @@
+import numpy as np
+
+
+class NodeVocabulary:
+    """
+    Interns the node labels of the twitter graphs (screen names, hashtags and domains) to integer ids, so every label
+    is stored once for all window graphs. The node types are stored as small integer codes.
+    """
+
+    # node type codes, the code of a type is its position
+    NODE_TYPES = ('user', 'hashtag', 'domain')
+
+    def __init__(self):
+        self.ids = {}
+        self.labels = []
+        self.type_codes = {node_type: code for code, node_type in enumerate(self.NODE_TYPES)}
+
+    def intern(self, labels):
+        """
+        Get the ids of node labels, unknown labels are added to the vocabulary
+        :param labels: iterable of node labels
+        :return: int32 array of node ids
+        """
+        node_ids = []
+        for label in labels:
+            node_id = self.ids.setdefault(label, len(self.labels))
+            if node_id == len(self.labels):
+                self.labels.append(label)
+            node_ids.append(node_id)
+        return np.array(node_ids, dtype=np.int32)
+
+    def get_labels(self, node_ids):
+        """
+        :param node_ids: array of node ids
+        :return: list of node labels
+        """
+        return [self.labels[node_id] for node_id in node_ids]
+
+    def encode_types(self, node_types):
+        """
+        :param node_types: iterable of node types e.g. 'user'
+        :return: int8 array of type codes
+        """
+        return np.array([self.type_codes[node_type] for node_type in node_types], dtype=np.int8)
+
+    def decode_types(self, type_codes):
+        """
+        :param type_codes: array of type codes
+        :return: list of node types
+        """
+        return [self.NODE_TYPES[code] for code in type_codes]
+
+    def __len__(self):
+        return len(self.labels)
@@ -0,0 +1,164 @@
+import math
+
+import numpy as np
+
+from compare_methods.CompactGraph import CompactGraph
+from compare_methods.NodeVocabulary import NodeVocabulary
+
+
+def get_intersection_size(ids_1, ids_2):
+    """
+    :param ids_1: sorted array of unique ids
+    :param ids_2: sorted array of unique ids
+    :return: number of ids in both arrays
+    """
+    if ids_1 is ids_2:
+        return ids_1.shape[0]
+    if ids_1.shape[0] == 0 or ids_2.shape[0] == 0:
+        return 0
+    # merge the two sorted runs, the stable sort of numpy detects them, an id of both arrays is then repeated
+    merged_ids = np.concatenate([ids_1, ids_2])
+    merged_ids.sort(kind='stable')
+    return int(np.count_nonzero(merged_ids[1:] == merged_ids[:-1]))
+
+
+class OverlapMetric:
+    """
+    Graph comparison by the overlap of the node and edge sets. The nodes and edges of a graph are represented by sorted
+    arrays of integer ids, so the set operations are merges of two arrays. The metrics have the compare and distance
+    methods of the gmatch4py algorithms and can replace them in the TwitterGraphComparator without gmatch4py.
+    """
+
+    def __init__(self):
+        # vocabulary of the node ids, the vocabulary of the first CompactGraph or one for networkx graphs
+        self.vocabulary = None
+
+    def get_node_ids(self, graph):
+        """
+        :param graph: networkx graph or CompactGraph
+        :return: array of the ids of the nodes in the vocabulary of the metric, in the order of the graph
+        """
+        if isinstance(graph, CompactGraph):
+            if self.vocabulary is None:
+                self.vocabulary = graph.vocabulary
+            if graph.vocabulary is self.vocabulary:
+                return graph.node_ids
+            return self.vocabulary.intern(graph.get_labels())
+        if self.vocabulary is None:
+            self.vocabulary = NodeVocabulary()
+        return self.vocabulary.intern(graph)
+
+    def create_node_ids(self, graph):
+        """
+        :param graph: networkx graph or CompactGraph
+        :return: sorted array of the node ids
+        """
+        return np.sort(self.get_node_ids(graph).astype(np.int64))
+
+    def create_node_and_edge_ids(self, graph):
+        """
+        Create the node ids and the ids of the undirected edges, the lower node id of an edge is in the upper 32 bits
+        :param graph: networkx graph or CompactGraph
+        :return: sorted arrays of the node ids and of the unique edge ids
+        """
+        node_ids = self.get_node_ids(graph).astype(np.int64)
+        if isinstance(graph, CompactGraph):
+            rows = np.repeat(np.arange(graph.number_of_nodes(), dtype=np.int32), np.diff(graph.indptr))
+            is_upper = graph.indices >= rows
+            sources, targets = node_ids[rows[is_upper]], node_ids[graph.indices[is_upper]]
+        else:
+            node_positions = {node: position for position, node in enumerate(graph)}
+            edges = list(graph.edges())
+            sources = node_ids[np.fromiter((node_positions[u] for u, v in edges), dtype=np.int64, count=len(edges))]
+            targets = node_ids[np.fromiter((node_positions[v] for u, v in edges), dtype=np.int64, count=len(edges))]
+        # an edge may be stored in both directions e.g. by graphs cached before the reciprocal edges were deduplicated
+        return np.sort(node_ids), np.unique((np.minimum(sources, targets) << 32) | np.maximum(sources, targets))
+
+    def create_features(self, graph):
+        """
+        :param graph: networkx graph or CompactGraph
+        :return: representation of the graph which is compared by get_similarity
+        """
+        raise NotImplementedError
+
+    def get_similarity(self, features_1, features_2):
+        """
+        :return: similarity of two graphs from their features
+        """
+        raise NotImplementedError
+
+    def compare(self, graph_list, selected):
+        """
+        Calculate the similarity matrix of the graphs
+        :param graph_list: list of networkx graphs or CompactGraphs
+        :param selected: not used, all graphs are compared
+        :return: similarity matrix
+        """
+        features = [self.create_features(graph) for graph in graph_list]
+        matrix = np.zeros((len(graph_list), len(graph_list)))
+        for i in range(len(graph_list)):
+            for j in range(i, len(graph_list)):
+                matrix[i, j] = matrix[j, i] = self.get_similarity(features[i], features[j])
+        return matrix
+
+    def distance(self, matrix):
+        """
+        Convert a similarity matrix to a distance matrix like gmatch4py does for similarity based algorithms
+        :param matrix: similarity matrix
+        :return: distance matrix
+        """
+        return np.max(matrix) - matrix
+
+
+class BagOfNodes(OverlapMetric):
+    """
+    Cosine similarity of the node indicator vectors of the graphs
+    """
+
+    def create_features(self, graph):
+        return self.create_node_ids(graph)
+
+    def get_similarity(self, node_ids_1, node_ids_2):
+        if node_ids_1.shape[0] == 0 or node_ids_2.shape[0] == 0:
+            return 0.0
+        return get_intersection_size(node_ids_1, node_ids_2) / math.sqrt(node_ids_1.shape[0] * node_ids_2.shape[0])
+
+
+class Jaccard(OverlapMetric):
+    """
+    Product of the jaccard indices of the node sets and of the edge sets of the graphs
+    """
+
+    def create_features(self, graph):
+        return self.create_node_and_edge_ids(graph)
+
+    def get_similarity(self, features_1, features_2):
+        (node_ids_1, edge_ids_1), (node_ids_2, edge_ids_2) = features_1, features_2
+        if node_ids_1.shape[0] == 0 or node_ids_2.shape[0] == 0:
+            return 0.0
+        nodes_intersection_size = get_intersection_size(node_ids_1, node_ids_2)
+        edges_intersection_size = get_intersection_size(edge_ids_1, edge_ids_2)
+        edges_union_size = edge_ids_1.shape[0] + edge_ids_2.shape[0] - edges_intersection_size
+        if edges_union_size == 0:
+            return 0.0
+        nodes_union_size = node_ids_1.shape[0] + node_ids_2.shape[0] - nodes_intersection_size
+        return nodes_intersection_size / nodes_union_size * edges_intersection_size / edges_union_size
+
+
+class VertexEdgeOverlap(OverlapMetric):
+    """
+    Vertex/edge overlap of Papadimitriou et al. (Web graph similarity for anomaly detection), the share of the nodes
+    and edges of both graphs which are part of the other graph
+    """
+
+    def create_features(self, graph):
+        return self.create_node_and_edge_ids(graph)
+
+    def get_similarity(self, features_1, features_2):
+        (node_ids_1, edge_ids_1), (node_ids_2, edge_ids_2) = features_1, features_2
+        size = node_ids_1.shape[0] + node_ids_2.shape[0] + edge_ids_1.shape[0] + edge_ids_2.shape[0]
+        if node_ids_1.shape[0] == 0 or node_ids_2.shape[0] == 0 or size == 0:
+            return 0.0
+        intersection_size = get_intersection_size(node_ids_1, node_ids_2) + get_intersection_size(edge_ids_1,
+                                                                                                  edge_ids_2)
+        return 2 * intersection_size / size
@@ -0,0 +1,205 @@
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from scipy import sparse
+from sklearn.preprocessing import MinMaxScaler
+
+from compare_methods.CompactGraph import CompactGraph
+from compare_methods.NodeVocabulary import NodeVocabulary
+
+
+class SparseWindowDistances:
+    """
+    Distances between arbitrary windows for the comparison methods which embed a graph as a vector. The graphs of all
+    windows are stored as one sparse window x feature matrix, the similarities of many window pairs are then computed
+    with a few sparse matrix products instead of comparing the pairs one by one.
+    The methods are the bag of nodes, where the features are the nodes, and the Weisfeiler-Lehman kernel, where the
+    features are the labels of all iterations. The distance of a pair is the distance of the TwitterGraphComparator.
+    """
+
+    methods = ['BagOfNodes', 'WeisfeleirLehmanKernel']
+
+    def __init__(self, graph_records, method: str = 'BagOfNodes', wl_iterations: int = 1):
+        """
+        :param graph_records: graph records in the order of the windows, the windows need to be consecutive
+        :param method: BagOfNodes or WeisfeleirLehmanKernel
+        :param wl_iterations: iterations of the Weisfeiler-Lehman kernel
+        """
+        if method not in self.methods:
+            raise ValueError(f"Method {method} is not one of {self.methods}")
+        self.graph_records = graph_records
+        self.method = method
+        self.wl_iterations = wl_iterations
+        self.vocabulary = None
+        self.node_sizes = np.array([record['graph'].number_of_nodes() for record in graph_records], dtype=np.int64)
+        self.feature_matrix = self.create_feature_matrix()
+        self.self_similarities = self.compute_similarities(np.arange(len(graph_records)),
+                                                           np.arange(len(graph_records)))
+
+    def get_node_ids(self, graph):
+        """
+        :param graph: networkx graph or CompactGraph
+        :return: array of the node ids in the order of the graph, the vocabulary of the first CompactGraph is used
+        """
+        if isinstance(graph, CompactGraph):
+            if self.vocabulary is None:
+                self.vocabulary = graph.vocabulary
+            if graph.vocabulary is self.vocabulary:
+                return graph.node_ids
+            return self.vocabulary.intern(graph.get_labels())
+        if self.vocabulary is None:
+            self.vocabulary = NodeVocabulary()
+        return self.vocabulary.intern(graph)
+
+    def create_feature_matrix(self):
+        """
+        Create the window x feature matrix, the node indicators for the bag of nodes and the label counts of all
+        iterations for the Weisfeiler-Lehman kernel
+        :return: sparse CSR matrix
+        """
+        if self.method == 'BagOfNodes':
+            node_ids = [self.get_node_ids(record['graph']) for record in self.graph_records]
+            indptr = np.zeros(len(node_ids) + 1, dtype=np.int64)
+            np.cumsum(self.node_sizes, out=indptr[1:])
+            indices = np.concatenate([np.empty(0, dtype=np.int32)] + node_ids)
+            features_count = len(self.vocabulary) if self.vocabulary is not None else 0
+            return sparse.csr_matrix((np.ones(indices.shape[0]), indices, indptr),
+                                     shape=(len(node_ids), features_count))
+
+        # the labels of all windows and iterations are interned to one feature id
+        label_ids = {}
+        rows = []
+        columns = []
+        for row, record in enumerate(self.graph_records):
+            node_ids, neighbors = self.get_adjacency(record['graph'])
+            labels = [label_ids.setdefault((0, node_id), len(label_ids)) for node_id in node_ids.tolist()]
+            columns.extend(labels)
+            for iteration in range(1, self.wl_iterations + 1):
+                labels = [label_ids.setdefault((iteration, labels[position],
+                                                tuple(sorted(labels[neighbor] for neighbor in neighbors[position]))),
+                                               len(label_ids)) for position in range(len(labels))]
+                columns.extend(labels)
+            rows.extend([row] * (len(labels) * (self.wl_iterations + 1)))
+        return sparse.csr_matrix((np.ones(len(columns)), (rows, columns)),
+                                 shape=(len(self.graph_records), len(label_ids)))
+
+    def get_adjacency(self, graph):
+        """
+        :param graph: networkx graph or CompactGraph
+        :return: array of the node ids and list of the positions of the neighbors of the nodes
+        """
+        node_ids = self.get_node_ids(graph)
+        if isinstance(graph, CompactGraph):
+            return node_ids, [graph.get_neighbors(position).tolist() for position in range(graph.number_of_nodes())]
+        node_positions = {node: position for position, node in enumerate(graph)}
+        return node_ids, [[node_positions[neighbor] for neighbor in graph.adj[node]] for node in graph]
+
+    def compute_similarities(self, rows_1, rows_2, block_size: int = 10000):
+        """
+        Compute the similarities of the window pairs given by two arrays of rows
+        :param rows_1: rows of the first windows
+        :param rows_2: rows of the second windows
+        :param block_size: number of pairs per block
+        :return: array of the similarities
+        """
+        similarities = np.zeros(rows_1.shape[0])
+        for start in range(0, rows_1.shape[0], block_size):
+            block = slice(start, start + block_size)
+            products = self.feature_matrix[rows_1[block]].multiply(self.feature_matrix[rows_2[block]])
+            similarities[block] = np.asarray(products.sum(axis=1)).ravel()
+        return self.to_method_similarities(similarities, rows_1, rows_2)
+
+    def to_method_similarities(self, products, rows_1, rows_2):
+        """
+        Convert the dot products of the feature vectors to the similarities of the method in place, the cosine
+        similarity for the bag of nodes and the kernel itself for the Weisfeiler-Lehman kernel. The rows are
+        broadcast, e.g. a column of rows against a row of all windows for a block of the distance matrix.
+        :param products: float array of the dot products of the pairs
+        :param rows_1: rows of the first windows
+        :param rows_2: rows of the second windows
+        :return: the products array with the similarities
+        """
+        if self.method == 'WeisfeleirLehmanKernel':
+            return products
+        norms = self.node_sizes[rows_1].astype(float) * self.node_sizes[rows_2]
+        np.sqrt(norms, out=norms)
+        # the products of an empty window are 0
+        return np.divide(products, norms, out=products, where=norms > 0)
+
+    def to_distances(self, similarities, rows_1, rows_2):
+        """
+        Convert the similarities of window pairs to distances, the maximum of the similarity matrix of the pair minus
+        the similarity, and 0 for two empty graphs. The rows are broadcast like in to_method_similarities.
+        """
+        distances = np.maximum(self.self_similarities[rows_1], self.self_similarities[rows_2])
+        np.maximum(distances, similarities, out=distances)
+        distances -= similarities
+        distances[(self.node_sizes[rows_1] == 0) & (self.node_sizes[rows_2] == 0)] = 0.0
+        return distances
+
+    def get_lag(self, time_delta):
+        """
+        :param time_delta: time between two windows e.g. '1D' for the same window of the previous day
+        :return: number of windows
+        """
+        partition = self.graph_records[0]['partition']
+        return int(pd.Timedelta(time_delta) / pd.Timedelta(to_offset(partition)))
+
+    def compute_lag_distances(self, lag: int = 1, normalized: bool = True, block_size: int = 10000):
+        """
+        Calculate the distances of every window to the window lag windows before, lag 1 are the distances of the
+        TwitterGraphComparator
+        :param lag: number of windows between the compared windows, see get_lag
+        :param normalized: Normalize calculated distances
+        :param block_size: number of pairs per block
+        :return: data frame like the results of the TwitterGraphComparator without the duration
+        """
+        rows_2 = np.arange(lag, len(self.graph_records))
+        rows_1 = rows_2 - lag
+        distances = self.to_distances(self.compute_similarities(rows_1, rows_2, block_size), rows_1, rows_2)
+        result_df = pd.DataFrame({
+            'g1_interval': [self.graph_records[row]['interval_start'] for row in rows_1],
+            'g2_interval': [self.graph_records[row]['interval_start'] for row in rows_2],
+            'date_time': [self.graph_records[row]['interval_end'] for row in rows_2],
+            'g1_node_size': self.node_sizes[rows_1],
+            'g2_node_size': self.node_sizes[rows_2],
+            'distance': distances})
+
+        # normalize distance
+        if normalized and result_df.shape[0] > 0:
+            min_max_scaler = MinMaxScaler()
+            result_df[['distance']] = min_max_scaler.fit_transform(result_df[['distance']])
+
+        # round distance to 5 digits
+        result_df['distance'] = result_df['distance'].round(5)
+        return result_df
+
+    def iter_distance_blocks(self, block_size: int = 256):
+        """
+        Calculate the distances of all window pairs block by block. The rows of a block are broadcast against all
+        windows, so a block needs about two block_size x windows float arrays.
+        :param block_size: number of windows per block
+        :return: generator of the first row of the block and the distances of its windows to all windows
+        """
+        windows_count = len(self.graph_records)
+        transposed_matrix = self.feature_matrix.T.tocsc()
+        columns = np.arange(windows_count)
+        for start in range(0, windows_count, block_size):
+            rows = np.arange(start, min(start + block_size, windows_count))[:, np.newaxis]
+            products = (self.feature_matrix[rows.ravel()] @ transposed_matrix).toarray()
+            similarities = self.to_method_similarities(products, rows, columns)
+            yield start, self.to_distances(similarities, rows, columns)
+
+    def compute_distance_matrix(self, block_size: int = 256, out=None):
+        """
+        Calculate the distances of all window pairs e.g. for a clustering of the windows
+        :param block_size: number of windows per block
+        :param out: windows x windows array to fill e.g. a numpy memmap, a float32 array is created if None
+        :return: distance matrix
+        """
+        windows_count = len(self.graph_records)
+        if out is None:
+            out = np.zeros((windows_count, windows_count), dtype=np.float32)
+        for start, distances in self.iter_distance_blocks(block_size):
+            out[start:start + distances.shape[0]] = distances
+        return out
@@ -1,10 +1,88 @@
-import gmatch4py as gm
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import os
+
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
 
+from compare_methods import OverlapMetrics as om
+from compare_methods.ApproximateGraphMatching import ApproximateGraphMatching
+from compare_methods.CompactGraph import CompactGraph
+from compare_methods.GraphFeatureCache import GraphFeatureCache
 from utils.StopWatch import StopWatch
 
+# state of a comparator worker process, set by init_comparator_worker
+comparator_worker_state = {}
+
+
+def init_comparator_worker(algorithms, graphs, networkx_cache_size, feature_cache_size, pair_time_budget):
+    """
+    Pass the algorithms and graphs once to a worker process instead of with every task
+    :param algorithms: network comparison algorithms, the tasks refer to them by index
+    :param graphs: networkx graphs or CompactGraphs in the order of the comparison
+    :param networkx_cache_size: number of graphs which are kept converted to networkx graphs
+    :param feature_cache_size: number of cached graph features, 0 to call compare of the algorithms
+    :param pair_time_budget: time budget of the approximate algorithms per pair in seconds, None for no limit
+    """
+    comparator_worker_state['algorithms'] = algorithms
+    comparator_worker_state['comp_algorithms'] = {}
+    comparator_worker_state['graphs'] = graphs
+    comparator_worker_state['networkx_graphs'] = OrderedDict()
+    comparator_worker_state['networkx_cache_size'] = networkx_cache_size
+    comparator_worker_state['feature_cache'] = TwitterGraphComparator.create_feature_cache(feature_cache_size)
+    comparator_worker_state['pair_time_budget'] = pair_time_budget
+
+
+def get_worker_networkx_graph(idx):
+    """
+    Get a graph of the worker as networkx graph, the recently used conversions are cached
+    :param idx: position of the graph
+    :return: networkx graph
+    """
+    networkx_graphs = comparator_worker_state['networkx_graphs']
+    if idx in networkx_graphs:
+        networkx_graphs.move_to_end(idx)
+        return networkx_graphs[idx]
+    G = TwitterGraphComparator.to_networkx_graph(comparator_worker_state['graphs'][idx])
+    networkx_graphs[idx] = G
+    if len(networkx_graphs) > comparator_worker_state['networkx_cache_size']:
+        networkx_graphs.popitem(last=False)
+    return G
+
+
+def compare_graph_pairs(tasks):
+    """
+    Compare graph pairs in a worker process
+    :param tasks: list of tuples of the algorithm index and the index of the second graph of the pair
+    :return: list of tuples of the algorithm index, the graph index, the distance, the duration and whether the
+    distance is exact, which is None for the algorithms which are not approximate
+    """
+    stop_watch = StopWatch()
+    results = []
+    for algorithm_idx, idx in tasks:
+        algorithm = comparator_worker_state['algorithms'][algorithm_idx]
+        comp_algorithms = comparator_worker_state['comp_algorithms']
+        if algorithm_idx not in comp_algorithms:
+            comp_algorithms[algorithm_idx] = TwitterGraphComparator.initialize_graph_matching_algorithm(algorithm)
+        if TwitterGraphComparator.is_native_algorithm(algorithm):
+            g1 = comparator_worker_state['graphs'][idx - 1]
+            g2 = comparator_worker_state['graphs'][idx]
+        else:
+            g1 = get_worker_networkx_graph(idx - 1)
+            g2 = get_worker_networkx_graph(idx)
+
+        is_approximate = TwitterGraphComparator.is_approximate_algorithm(algorithm)
+        if is_approximate:
+            comp_algorithms[algorithm_idx].start_pair(comparator_worker_state['pair_time_budget'])
+
+        stop_watch.start()
+        distance = TwitterGraphComparator.compute_distance(algorithm, comp_algorithms[algorithm_idx], g1, g2,
+                                                           comparator_worker_state['feature_cache'], idx - 1, idx)
+        exact = comp_algorithms[algorithm_idx].exact if is_approximate else None
+        results.append((algorithm_idx, idx, distance, stop_watch.get_time(), exact))
+    return results
+
 
 class TwitterGraphComparator:
     """
@@ -12,120 +90,373 @@ class TwitterGraphComparator:
     to calculate the network distances.
     """
 
-    # pre chosen algorithms to calculate the network distances
-    graph_matching_algorithms = [
-        # -- Graph Edit Distance -- #
-        # gm.GreedyEditDistance, -> commented because this method takes way to loong
-        gm.MCS,
-        # -- Iterative Methods -- #
-        gm.Jaccard,
-        gm.VertexRanking,
-        gm.VertexEdgeOverlap,
-        gm.BagOfCliques,
-        gm.BagOfNodes,
-        # -- Graph Kernels -- #
-        gm.WeisfeleirLehmanKernel
-    ]
-
-    def __init__(self, graphs_to_compare):
+    # network comparison algorithms, None for the pre chosen algorithms of get_default_algorithms
+    graph_matching_algorithms = None
+
+    # the result data frames are built from chunks of result dicts
+    result_chunk_size = 5000
+
+    # iterations of the Weisfeiler-Lehman kernel
+    wl_iterations = 1
+
+    def __init__(self, graphs_to_compare, feature_cache_size: int = 128):
+        """
+        :param graphs_to_compare: graph records in the order of the windows
+        :param feature_cache_size: number of cached graph features of the metrics of OverlapMetrics, 0 to call compare
+        of the metrics for every pair
+        """
         self.graphs_to_compare = graphs_to_compare
+        self.feature_cache_size = feature_cache_size
+        self.feature_cache = self.create_feature_cache(feature_cache_size)
+
+    @staticmethod
+    def get_default_algorithms():
+        """
+        Pre chosen algorithms to calculate the network distances. gmatch4py is only imported for them, so the
+        comparison with the algorithms of this repository e.g. of OverlapMetrics does not need it.
+        :return: list of network comparison algorithms
+        """
+        import gmatch4py as gm
+        return [
+            # -- Graph Edit Distance -- #
+            # gm.GreedyEditDistance, -> commented because this method takes way to loong
+            gm.MCS,
+            # -- Iterative Methods -- #
+            # the set based metrics of OverlapMetrics e.g. om.Jaccard can replace the gmatch4py algorithms of the same
+            # name once BenchmarkOverlapMetrics shows no distance difference on the data
+            gm.Jaccard,
+            gm.VertexRanking,
+            gm.VertexEdgeOverlap,
+            gm.BagOfCliques,
+            gm.BagOfNodes,
+            # -- Graph Kernels -- #
+            gm.WeisfeleirLehmanKernel
+        ]
+
+    def get_graph_matching_algorithms(self):
+        """
+        :return: the algorithms to calculate the network distances with
+        """
+        if self.graph_matching_algorithms is None:
+            return self.get_default_algorithms()
+        return self.graph_matching_algorithms
 
-    def compute_graph_distances(self, normalized: bool = True):
+    def compute_graph_distances(self, normalized: bool = True, processes: int = 1, time_budget: float = None):
         """
         Calculates the distances between the given networks.
         :param normalized: Normalize calculated distances
+        :param processes: number of worker processes, None for the number of cores and 1 to compare in this process
+        :param time_budget: time budget in seconds for all pairs of an approximate algorithm, None for no limit. The
+        results of the approximate algorithms have the column exact.
         :return: Calculated distances data frame
         """
+        if processes is None:
+            processes = os.cpu_count()
+        if processes > 1:
+            return self.compute_graph_distances_parallel(normalized, processes, time_budget=time_budget)
 
-        # initialize the stop watch
+        # initialize the stop watches of the pairs and of the algorithms
         stop_watch = StopWatch()
+        algorithm_stop_watch = StopWatch()
 
         # initialize result data frame list
         result_df_list = []
 
         # iterate over predefined algorithms to calculate the network distances
-        for algorithm in self.graph_matching_algorithms:
+        for algorithm in self.get_graph_matching_algorithms():
 
             # initialize algorithm
             print(f"Start computation for {algorithm.__name__}")
             comp_algorithm = self.initialize_graph_matching_algorithm(algorithm)
+            is_approximate = self.is_approximate_algorithm(algorithm)
+            algorithm_stop_watch.start()
 
-            # create result data frame
-            column_names = ["g1_interval", "g2_interval", "g1_node_size", "g2_node_size", "duration", "distance"]
-            result_df = pd.DataFrame(columns=column_names)
             counter = 0
             graphs_to_compare_size = len(self.graphs_to_compare)
             result_dict_list = []
+            previous_graph = None
 
             # iterate over the networks to compare them pairwise.
             # list of Graphs [A,B,C,D] is getting compared like A-B, B-C, C-D
             for idx in range(1, graphs_to_compare_size):
 
-                result_dict = {}
                 data_1 = self.graphs_to_compare[idx - 1]
                 data_2 = self.graphs_to_compare[idx]
-                g1 = data_1['graph']
-                g2 = data_2['graph']
-                result_dict['g1_interval'] = data_1['interval_start']
-                result_dict['g2_interval'] = data_2['interval_start']
-                result_dict['date_time'] = data_2['interval_end']
-                result_dict['g1_node_size'] = g1.number_of_nodes()
-                result_dict['g2_node_size'] = g2.number_of_nodes()
+                if self.is_native_algorithm(algorithm):
+                    # the overlap metrics compare compact graphs without converting them
+                    g1 = data_1['graph']
+                    g2 = data_2['graph']
+                else:
+                    # compact graphs are converted once, the second graph is the first graph of the next comparison
+                    g1 = previous_graph if previous_graph is not None else self.to_networkx_graph(data_1['graph'])
+                    g2 = self.to_networkx_graph(data_2['graph'])
+                    previous_graph = g2
+
+                # the remaining time budget is shared by the remaining pairs
+                if is_approximate:
+                    comp_algorithm.start_pair(self.get_pair_time_budget(
+                        time_budget, algorithm_stop_watch.get_time(), graphs_to_compare_size - idx))
 
                 # start stopwatch
                 stop_watch.start()
 
                 # calculate the distance between the graphs based on the used algorithm
-                if g1.number_of_nodes() <= 0 and g2.number_of_nodes() <= 0:
-                    result_dict['distance'] = 0.0
-                elif algorithm == gm.WeisfeleirLehmanKernel:
-                    result_dict['distance'] = \
-                        np.asarray(comp_algorithm.distance(comp_algorithm.compare([g1, g2], None)))[0][1]
-                else:
-                    result_dict['distance'] = comp_algorithm.distance(comp_algorithm.compare([g1, g2], None))[0][1]
+                distance = self.compute_distance(algorithm, comp_algorithm, g1, g2, self.feature_cache,
+                                                 data_1['interval_start'], data_2['interval_start'])
 
                 # stop stopwatch
-                result_dict['duration'] = stop_watch.get_time()
+                duration = stop_watch.get_time()
                 stop_watch.reset()
 
                 # add result dict to list
-                result_dict_list.append(result_dict)
+                result_dict_list.append(self.create_result_dict(data_1, data_2, g1.number_of_nodes(),
+                                                                g2.number_of_nodes(), distance, duration,
+                                                                comp_algorithm.exact if is_approximate else None))
                 counter = counter + 1
 
-                # after 5000 comp_results add the result dicts to data frame for better performance
-                if counter % 5000 == 0:
+                if counter % self.result_chunk_size == 0:
                     print(f"{algorithm.__name__} - compared {counter} graphs of {graphs_to_compare_size}")
-                    temp_df = pd.DataFrame.from_records(result_dict_list)
-                    result_df = pd.concat([result_df, temp_df])
-                    result_dict_list = []
 
-            # add rest of calculated distances
-            temp_df = pd.DataFrame.from_records(result_dict_list)
-            result_df = pd.concat([result_df, temp_df])
+            # append to result list
+            result_df_list.append({'algorithm': algorithm.__name__,
+                                   'data': self.create_result_df(result_dict_list, normalized)})
 
-            # normalize distance
-            if normalized:
-                min_max_scaler = MinMaxScaler()
-                result_df[['distance']] = min_max_scaler.fit_transform(result_df[['distance']])
+        return result_df_list
 
-            # round distance to 5 digits
-            result_df['distance'] = result_df['distance'].round(5)
+    def compute_graph_distances_parallel(self, normalized: bool = True, processes: int = None,
+                                         chunks_per_process: int = 16, networkx_cache_size: int = 256,
+                                         time_budget: float = None):
+        """
+        Calculates the distances between the given networks in worker processes. Every comparison of a graph pair by
+        an algorithm is a task, the tasks are ordered by their estimated cost, so the expensive comparisons are done
+        first and the cheap ones fill the idle processes at the end. The results are equal to the results of
+        compute_graph_distances apart from the durations.
+        :param normalized: Normalize calculated distances
+        :param processes: number of worker processes, None for the number of cores
+        :param chunks_per_process: the cheap tasks are grouped to chunks of about the total cost divided by the
+        number of processes and this value
+        :param networkx_cache_size: number of graphs a worker keeps converted to networkx graphs
+        :param time_budget: time budget in seconds for all pairs of an approximate algorithm, it is shared equally by
+        the pairs. The processes are shared with the other algorithms, so it is the compute time summed over the
+        processes, not the wall clock time.
+        :return: Calculated distances data frame
+        """
+        processes = processes or os.cpu_count()
+        algorithms = list(self.get_graph_matching_algorithms())
+        graphs = [data['graph'] for data in self.graphs_to_compare]
+        graph_sizes = [(graph.number_of_nodes(), graph.number_of_edges()) for graph in graphs]
 
-            # append to result list
-            result_df_list.append({'algorithm': algorithm.__name__, 'data': result_df})
+        # estimated cost of the tasks, most expensive first
+        tasks = []
+        for algorithm_idx, algorithm in enumerate(algorithms):
+            for idx in range(1, len(graphs)):
+                cost = self.estimate_comparison_cost(algorithm, *graph_sizes[idx - 1], *graph_sizes[idx])
+                tasks.append((cost, algorithm_idx, idx))
+        tasks.sort(key=lambda task: task[0], reverse=True)
+        task_chunks = self.create_task_chunks(tasks, sum(task[0] for task in tasks) / (processes * chunks_per_process))
+        print(f"Compare {len(graphs) - 1} graph pairs with {len(algorithms)} algorithms in {len(task_chunks)} chunks "
+              f"on {processes} processes")
+
+        pair_time_budget = self.get_pair_time_budget(time_budget, 0, len(graphs) - 1)
 
+        distances = np.zeros((len(algorithms), len(graphs)))
+        durations = np.zeros((len(algorithms), len(graphs)))
+        exact_flags = np.full((len(algorithms), len(graphs)), None, dtype=object)
+        compared_counts = [0] * len(algorithms)
+        with ProcessPoolExecutor(max_workers=processes, initializer=init_comparator_worker,
+                                 initargs=(algorithms, graphs, networkx_cache_size, self.feature_cache_size,
+                                           pair_time_budget)) as executor:
+            # the executor hands the chunks to the workers in the order they are submitted
+            futures = [executor.submit(compare_graph_pairs, task_chunk) for task_chunk in task_chunks]
+            for future in as_completed(futures):
+                for algorithm_idx, idx, distance, duration, exact in future.result():
+                    distances[algorithm_idx, idx] = distance
+                    durations[algorithm_idx, idx] = duration
+                    exact_flags[algorithm_idx, idx] = exact
+                    compared_counts[algorithm_idx] += 1
+                    if compared_counts[algorithm_idx] % self.result_chunk_size == 0:
+                        print(f"{algorithms[algorithm_idx].__name__} - compared {compared_counts[algorithm_idx]} "
+                              f"graphs of {len(graphs)}")
+
+        # assemble the results in the order of the graph pairs
+        result_df_list = []
+        for algorithm_idx, algorithm in enumerate(algorithms):
+            result_dict_list = [
+                self.create_result_dict(self.graphs_to_compare[idx - 1], self.graphs_to_compare[idx],
+                                        graph_sizes[idx - 1][0], graph_sizes[idx][0],
+                                        float(distances[algorithm_idx, idx]), float(durations[algorithm_idx, idx]),
+                                        exact_flags[algorithm_idx, idx])
+                for idx in range(1, len(graphs))]
+            result_df_list.append({'algorithm': algorithm.__name__,
+                                   'data': self.create_result_df(result_dict_list, normalized)})
         return result_df_list
 
     @staticmethod
-    def initialize_graph_matching_algorithm(algorithm):
+    def create_task_chunks(tasks, chunk_cost: float, max_chunk_size: int = 1000):
+        """
+        Group the tasks ordered by descending cost to chunks. Expensive tasks get a chunk of their own, cheap tasks
+        are grouped until the chunk reaches the cost, which keeps the overhead per task low.
+        :param tasks: list of tuples of the cost, the algorithm index and the graph index
+        :param chunk_cost: estimated cost of a chunk
+        :param max_chunk_size: maximum number of tasks in a chunk
+        :return: list of lists of tuples of the algorithm index and the graph index
+        """
+        task_chunks = []
+        task_chunk = []
+        task_chunk_cost = 0
+        for cost, algorithm_idx, idx in tasks:
+            task_chunk.append((algorithm_idx, idx))
+            task_chunk_cost += cost
+            if task_chunk_cost >= chunk_cost or len(task_chunk) >= max_chunk_size:
+                task_chunks.append(task_chunk)
+                task_chunk = []
+                task_chunk_cost = 0
+        if task_chunk:
+            task_chunks.append(task_chunk)
+        return task_chunks
+
+    @staticmethod
+    def estimate_comparison_cost(algorithm, g1_nodes: int, g1_edges: int, g2_nodes: int, g2_edges: int):
+        """
+        Estimate the relative cost of comparing two graphs with an algorithm from their sizes. The maximum common
+        subgraph and the edit distances grow with the product of the graph sizes, the other algorithms grow linear.
+        :return: estimated cost
+        """
+        if TwitterGraphComparator.is_approximate_algorithm(algorithm):
+            return (g1_nodes + g1_edges) * (g2_nodes + g2_edges) + 1
+        if TwitterGraphComparator.is_native_algorithm(algorithm):
+            return g1_nodes + g1_edges + g2_nodes + g2_edges + 1
+
+        import gmatch4py as gm
+        if algorithm in (gm.GraphEditDistance, gm.BP_2, gm.GreedyEditDistance, gm.HED):
+            return (g1_nodes + g2_nodes) ** 3 + 1
+        if algorithm == gm.MCS:
+            return (g1_nodes + g1_edges) * (g2_nodes + g2_edges) + 1
+        return g1_nodes + g1_edges + g2_nodes + g2_edges + 1
+
+    @staticmethod
+    def create_feature_cache( feature_cache_size: int):
+        """
+        :param feature_cache_size: number of cached graph features
+        :return: GraphFeatureCache or None if the size is 0
+        """
+        if feature_cache_size <= 0:
+            return None
+        return GraphFeatureCache(feature_cache_size)
+
+    @staticmethod
+    def compute_distance(algorithm, comp_algorithm, g1, g2, feature_cache=None, key_1=None, key_2=None):
+        """
+        Calculate the distance between two graphs
+        :param algorithm: network comparison algorithm
+        :param comp_algorithm: initialized instance of the algorithm
+        :param g1: first networkx graph
+        :param g2: second networkx graph
+        :param feature_cache: GraphFeatureCache for the algorithms with a per graph representation
+        :param key_1: cache key of the first graph
+        :param key_2: cache key of the second graph
+        :return: distance
+        """
+        if g1.number_of_nodes() <= 0 and g2.number_of_nodes() <= 0:
+            return 0.0
+        elif feature_cache is not None and feature_cache.is_supported(algorithm):
+            return feature_cache.compute_distance(algorithm, comp_algorithm, key_1, g1, key_2, g2)
+        else:
+            # the Weisfeiler-Lehman kernel returns a numpy matrix
+            return np.asarray(comp_algorithm.distance(comp_algorithm.compare([g1, g2], None)))[0][1]
+
+    @staticmethod
+    def create_result_dict(data_1, data_2, g1_node_size, g2_node_size, distance, duration, exact=None):
+        """
+        Create the result of the comparison of two graph records
+        :param exact: whether the distance of an approximate algorithm is exact, None for the other algorithms
+        :return: result dict
+        """
+        result_dict = {'g1_interval': data_1['interval_start'],
+                       'g2_interval': data_2['interval_start'],
+                       'date_time': data_2['interval_end'],
+                       'g1_node_size': g1_node_size,
+                       'g2_node_size': g2_node_size,
+                       'distance': distance,
+                       'duration': duration}
+        if exact is not None:
+            result_dict['exact'] = exact
+        return result_dict
+
+    @staticmethod
+    def get_pair_time_budget(time_budget, elapsed_time, remaining_pairs_count: int):
+        """
+        Share the remaining time budget of an approximate algorithm equally by the remaining pairs
+        :param time_budget: time budget of all pairs in seconds, None for no limit
+        :param elapsed_time: time used by the compared pairs
+        :param remaining_pairs_count: number of pairs which are not compared
+        :return: time budget of the next pair, None for no limit
+        """
+        if time_budget is None:
+            return None
+        return max(time_budget - elapsed_time, 0) / max(remaining_pairs_count, 1)
+
+    @classmethod
+    def create_result_df(cls, result_dict_list, normalized: bool):
+        """
+        Create the result data frame of an algorithm
+        :param result_dict_list: result dicts in the order of the graph pairs
+        :param normalized: Normalize calculated distances
+        :return: result data frame
+        """
+        # create result data frame, the result dicts are added in chunks for better performance
+        column_names = ["g1_interval", "g2_interval", "g1_node_size", "g2_node_size", "duration", "distance"]
+        result_df = pd.DataFrame(columns=column_names)
+        for start in range(0, len(result_dict_list), cls.result_chunk_size):
+            temp_df = pd.DataFrame.from_records(result_dict_list[start:start + cls.result_chunk_size])
+            result_df = pd.concat([result_df, temp_df])
+
+        # normalize distance
+        if normalized:
+            min_max_scaler = MinMaxScaler()
+            result_df[['distance']] = min_max_scaler.fit_transform(result_df[['distance']])
+
+        # round distance to 5 digits
+        result_df['distance'] = result_df['distance'].round(5)
+        return result_df
+
+    @staticmethod
+    def is_native_algorithm(algorithm):
+        """
+        :return: whether the algorithm is implemented in this repository and supports CompactGraphs
+        """
+        return issubclass(algorithm, om.OverlapMetric)
+
+    @staticmethod
+    def is_approximate_algorithm(algorithm):
+        """
+        :return: whether the algorithm is an approximate algorithm with a time budget and the flag exact
+        """
+        return issubclass(algorithm, ApproximateGraphMatching)
+
+    @staticmethod
+    def to_networkx_graph(graph):
+        """
+        Convert a CompactGraph to a networkx graph, which is needed by the algorithms
+        :param graph: networkx graph or CompactGraph
+        :return: networkx graph
+        """
+        return graph.to_networkx() if isinstance(graph, CompactGraph) else graph
+
+    @classmethod
+    def initialize_graph_matching_algorithm(cls, algorithm):
         """
         Initialize an instance for the given algorithm
         :param algorithm: network comparison algorithm
         :return: Instance of the given Algorithm
         """
+        if cls.is_native_algorithm(algorithm) or cls.is_approximate_algorithm(algorithm):
+            return algorithm()
+
+        import gmatch4py as gm
         if algorithm in (gm.GraphEditDistance, gm.BP_2, gm.GreedyEditDistance, gm.HED):
             return algorithm(1, 1, 1, 1)
         elif algorithm == gm.WeisfeleirLehmanKernel:
-            return algorithm(h=1)
+            return algorithm(h=cls.wl_iterations)
         else:
             return algorithm()
@@ -1,9 +1,62 @@
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import os
 
 import networkx as nx
+import numpy as np
 import pandas as pd
+from pandas.tseries.frequencies import to_offset
 
+from compare_methods.CompactGraph import CompactGraph
+from compare_methods.NodeVocabulary import NodeVocabulary
 from utils.PartitionType import PartitionType
+from utils.SharedArrays import SharedArrays
+
+
+graph_worker_state = {}
+
+
+def init_graph_worker(array_specs):
+    """
+    Attach a worker process to the shared entity arrays of the tweets
+    :param array_specs: specs of the SharedArrays created by compute_graphs_parallel
+    """
+    graph_worker_state['arrays'] = SharedArrays.attach(array_specs)
+
+
+def create_graph_range(task):
+    """
+    Create the graphs of a contiguous range of partitions in a worker process. The worker reads the entity codes of
+    the tweets of its range from shared memory and numbers the nodes of the range in order of their first occurrence,
+    so neither the tweets nor the vocabulary of the parent are passed to the workers.
+    :param task: tuple of the first tweet and the end tweet (exclusive) of the range in the order of the partitions
+    :return: first partition of the range, list of the CSR arrays of the CompactGraphs of its partitions and the label
+    code of every node id of the range
+    """
+    start, end = task
+    entity_arrays = graph_worker_state['arrays']
+    nodes_df, edges_df, label_codes = TwitterGraphCreator.create_range_tables(entity_arrays, start, end)
+    first_partition = int(entity_arrays['partitions'][start])
+    partitions_count = int(entity_arrays['partitions'][end - 1]) - first_partition + 1
+    graph_arrays = TwitterGraphCreator.create_graph_arrays(partitions_count, nodes_df, edges_df, label_codes.shape[0])
+    graphs = []
+    for partition in range(partitions_count):
+        graph = CompactGraph.from_positions(None, *get_partition_arrays(graph_arrays, partition))
+        graphs.append((graph.node_ids, graph.node_types, graph.indptr, graph.indices))
+    return first_partition, graphs, label_codes
+
+
+def get_partition_arrays(graph_arrays, partition):
+    """
+    Slice the arrays of one partition from the arrays of all partitions
+    :param graph_arrays: dict of the arrays created by create_graph_arrays
+    :param partition: index of the partition
+    :return: node ids, node types, sources and targets of the partition
+    """
+    node_slice = slice(graph_arrays['node_starts'][partition], graph_arrays['node_starts'][partition + 1])
+    edge_slice = slice(graph_arrays['edge_starts'][partition], graph_arrays['edge_starts'][partition + 1])
+    return graph_arrays['node_ids'][node_slice], graph_arrays['node_types'][node_slice], \
+        graph_arrays['sources'][edge_slice], graph_arrays['targets'][edge_slice]
 
 
 class TwitterGraphCreator:
@@ -13,6 +66,18 @@ class TwitterGraphCreator:
 
     PARSE_DATE_TIME_FORMAT: str = '%Y-%m-%d %H:%M:%S'
 
+    # columns of the tweets which are used to create the graphs
+    GRAPH_COLUMNS = ['user_screen_name', 'mentions', 'hashtags', 'domains']
+
+    # hashtags which the data was crawled for, they are not part of the graphs
+    SKIPPED_HASHTAGS = ['btc', 'bitcoin']
+
+    # node type of the tokens of a tweet by their slot: the user, the mentions, the hashtags and the domains
+    SLOT_NODE_TYPES = ('user', 'user', 'hashtag', 'domain')
+
+    # version of the rules to create the graphs, increase it on changes so cached graphs get invalidated
+    GRAPH_RULES_VERSION = 2
+
     # Twitter dataframe converters
     TWITTER_DF_CONVERTERS = {
         'created_at': pd.to_datetime,
@@ -23,8 +88,13 @@ class TwitterGraphCreator:
         'user_screen_name': str,
     }
 
-    def __init__(self, tweets_df):
+    def __init__(self, tweets_df=None, vocabulary: NodeVocabulary = None):
+        """
+        :param tweets_df: tweets data frame with created_at as index, not needed to stream graphs from tweet chunks
+        :param vocabulary: create CompactGraphs with the node ids of this vocabulary instead of networkx graphs
+        """
         self.df = tweets_df
+        self.vocabulary = vocabulary
 
     def compute_graphs(self, partition_type: PartitionType):
         """
@@ -32,21 +102,465 @@ class TwitterGraphCreator:
         :param partition_type: partition in which the tweets are getting divided
         :return: list of the created network graphs
         """
+        if self.vocabulary is not None:
+            return self.compute_compact_graphs(partition_type)
 
         # create partitioned dataframes
         partitioned_dataframe_list = [{'time_stamp': group[0], 'tweets': group[1]} for group in
-                                      self.df.resample(partition_type.value)]
+                                      self.df.resample(self.get_partition_value(partition_type))]
 
         # create partitioned graphs
         partitioned_graph_list = []
         for grouped_tweets in partitioned_dataframe_list:
             partitioned_graph_list.append(
-                {'interval_start': self.create_default_date_time(grouped_tweets['time_stamp']),
-                 'interval_end': self.create_partition_date_time(grouped_tweets['time_stamp'], partition_type),
-                 'partition': partition_type.value,
-                 'graph': self.create_twitter_graph(grouped_tweets['tweets'])})
+                self.create_graph_record(grouped_tweets['time_stamp'], grouped_tweets['tweets'], partition_type))
         return partitioned_graph_list
 
+    def compute_compact_graphs(self, partition_type: PartitionType):
+        """
+        Create the CompactGraphs of all partitions from one edge list of all tweets, so the tweets are exploded and
+        the node labels are interned once instead of per partition. The graphs are equal to create_twitter_graph.
+        :param partition_type: partition in which the tweets are getting divided
+        :return: list of the created graph records
+        """
+        return self.compute_multi_resolution_graphs([partition_type])[partition_type]
+
+    def compute_multi_resolution_graphs(self, partition_types):
+        """
+        Create the graphs of several partition types in one pass over the tweets. The tweets are exploded once into
+        the partitions of the finest partition type, the graphs of the coarser partition types are the unions of
+        their fine partitions. The graphs are equal to compute_graphs of every single partition type.
+        :param partition_types: PartitionTypes or pandas offset aliases e.g. '30Min' which are multiples of the finest
+        :return: dict of the partition types and their lists of graph records, the graphs are CompactGraphs if the
+        creator has a vocabulary otherwise networkx graphs
+        """
+        if self.df.shape[0] == 0:
+            return {partition_type: [] for partition_type in partition_types}
+        vocabulary = self.vocabulary if self.vocabulary is not None else NodeVocabulary()
+
+        partition_offsets = {partition_type: to_offset(self.get_partition_value(partition_type))
+                             for partition_type in partition_types}
+        finest_offset = min(partition_offsets.values(), key=lambda offset: offset.nanos)
+        for partition_type, partition_offset in partition_offsets.items():
+            if partition_offset.nanos % finest_offset.nanos != 0:
+                raise ValueError(f"Partition {self.get_partition_value(partition_type)} is no multiple of the finest "
+                                 f"partition {finest_offset.freqstr}")
+
+        fine_time_stamps, nodes_df, edges_df = self.create_partition_tables(finest_offset, vocabulary)
+
+        graph_records = {}
+        for partition_type, partition_offset in partition_offsets.items():
+
+            # union of the fine partitions of a coarse partition, both are anchored at the first day of the tweets
+            time_stamps, partition_map = self.assign_partitions(fine_time_stamps, partition_offset,
+                                                                fine_time_stamps[0].normalize())
+            coarse_nodes_df, coarse_edges_df = self.reduce_partitions(
+                nodes_df.assign(partition=partition_map[nodes_df['partition'].to_numpy()]),
+                edges_df.assign(partition=partition_map[edges_df['partition'].to_numpy()]), len(vocabulary))
+
+            graph_records[partition_type] = self.create_compact_graph_records(
+                time_stamps, coarse_nodes_df, coarse_edges_df, partition_type, vocabulary)
+        return graph_records
+
+    def compute_sliding_graphs(self, window_type, step_type, as_view: bool = False):
+        """
+        Create the graphs of overlapping windows e.g. a 1 hour window every 5 minutes. One live graph counts for every
+        edge the steps of the window it occurs in, so per step only the edges of the incoming and the expiring step
+        are added or removed and nodes without edges are dropped. The graphs have the same nodes, node types and edges
+        as create_twitter_graph of the tweets of the window.
+        :param window_type: PartitionType or pandas offset alias of the window length, a multiple of the step
+        :param step_type: PartitionType or pandas offset alias of the step between two windows
+        :param as_view: yield read only views of the live graph which are only valid till the next step instead of
+        frozen copies, with a vocabulary CompactGraphs are yielded
+        :return: generator of graph records, one per step once the first window is complete
+        """
+        if self.df.shape[0] == 0:
+            return
+        window_offset = to_offset(self.get_partition_value(window_type))
+        step_offset = to_offset(self.get_partition_value(step_type))
+        if window_offset.nanos % step_offset.nanos != 0:
+            raise ValueError(f"Window {window_offset.freqstr} is no multiple of the step {step_offset.freqstr}")
+        window_steps = window_offset.nanos // step_offset.nanos
+
+        vocabulary = self.vocabulary if self.vocabulary is not None else NodeVocabulary()
+        time_stamps, nodes_df, edges_df = self.create_partition_tables(step_offset, vocabulary)
+        step_bounds = np.arange(time_stamps.shape[0] + 1)
+        node_starts = np.searchsorted(nodes_df['partition'].to_numpy(), step_bounds)
+        edge_starts = np.searchsorted(edges_df['partition'].to_numpy(), step_bounds)
+        node_ids = nodes_df['node_id'].tolist()
+        type_codes = nodes_df['type_code'].tolist()
+        edges = list(zip(edges_df['user_id'].tolist(), edges_df['node_id'].tolist()))
+
+        G = nx.Graph()
+        edge_counts = {}
+        # node id -> type code of the node in every step of the window in which it occurs
+        node_step_types = {}
+
+        for step, time_stamp in enumerate(time_stamps):
+
+            # add the edges of the incoming step
+            for user_id, node_id in edges[edge_starts[step]:edge_starts[step + 1]]:
+                edge_key = (user_id, node_id) if user_id <= node_id else (node_id, user_id)
+                edge_count = edge_counts.get(edge_key, 0)
+                if edge_count == 0:
+                    G.add_edge(vocabulary.labels[user_id], vocabulary.labels[node_id])
+                edge_counts[edge_key] = edge_count + 1
+            for node_id, type_code in zip(node_ids[node_starts[step]:node_starts[step + 1]],
+                                          type_codes[node_starts[step]:node_starts[step + 1]]):
+                node_step_types.setdefault(node_id, {})[step] = type_code
+
+            # remove the edges of the expiring step and the nodes without edges
+            expired_step = step - window_steps
+            if expired_step >= 0:
+                for user_id, node_id in edges[edge_starts[expired_step]:edge_starts[expired_step + 1]]:
+                    edge_key = (user_id, node_id) if user_id <= node_id else (node_id, user_id)
+                    edge_counts[edge_key] -= 1
+                    if edge_counts[edge_key] == 0:
+                        del edge_counts[edge_key]
+                        user_node, node = vocabulary.labels[user_id], vocabulary.labels[node_id]
+                        G.remove_edge(user_node, node)
+                        G.remove_nodes_from([n for n in {user_node, node} if G.degree(n) == 0])
+                for node_id in node_ids[node_starts[expired_step]:node_starts[expired_step + 1]]:
+                    step_types = node_step_types[node_id]
+                    del step_types[expired_step]
+                    if not step_types:
+                        del node_step_types[node_id]
+
+            # a node has the type of its last occurrence in the window
+            changed_node_ids = set(node_ids[node_starts[step]:node_starts[step + 1]])
+            if expired_step >= 0:
+                changed_node_ids.update(node_ids[node_starts[expired_step]:node_starts[expired_step + 1]])
+            for node_id in changed_node_ids:
+                label = vocabulary.labels[node_id]
+                if label in G:
+                    step_types = node_step_types[node_id]
+                    G.nodes[label]['type'] = vocabulary.NODE_TYPES[step_types[next(reversed(step_types))]]
+
+            # emit once the first window is complete, or the only window if there are fewer steps
+            window_start = time_stamps[max(step - window_steps + 1, 0)]
+            if step >= window_steps - 1 or step == time_stamps.shape[0] - 1:
+                if self.vocabulary is not None:
+                    graph = CompactGraph.from_networkx(G, self.vocabulary)
+                else:
+                    graph = G.copy(as_view=True) if as_view else nx.freeze(G.copy())
+                yield self.create_record(window_start, graph, window_type)
+
+    def create_partition_tables(self, partition_offset, vocabulary: NodeVocabulary, origin=None):
+        """
+        Explode the tweets into the distinct nodes and edges of their partitions
+        :param partition_offset: offset of the partitions
+        :param vocabulary: vocabulary to intern the node labels
+        :param origin: time the partitions are anchored at, the midnight of the first tweet like resample if None
+        :return: start of every partition like resample including the partitions without tweets, nodes with the
+        partition, node_id and type_code column and edges with the partition, user_id and node_id column, both
+        ordered by partition
+        """
+        time_stamps, entity_arrays, labels = self.create_partitioned_entity_arrays(partition_offset, origin)
+        nodes_df, edges_df, label_codes = self.create_range_tables(entity_arrays, 0,
+                                                                   entity_arrays['partitions'].shape[0])
+
+        # the nodes are numbered in order of their first occurrence like the vocabulary interns them
+        node_id_map = vocabulary.intern(labels[label_codes])
+        nodes_df['node_id'] = node_id_map[nodes_df['node_id'].to_numpy()]
+        edges_df['user_id'] = node_id_map[edges_df['user_id'].to_numpy()]
+        edges_df['node_id'] = node_id_map[edges_df['node_id'].to_numpy()]
+        return time_stamps, nodes_df, edges_df
+
+    def create_partitioned_entity_arrays(self, partition_offset, origin=None):
+        """
+        Factorize the entities of the tweets in the order of their partitions, the order of the tweets within a
+        partition is kept
+        :param partition_offset: offset of the partitions
+        :param origin: time the partitions are anchored at, the midnight of the first tweet like resample if None
+        :return: start of every partition, dict of the entity arrays created by create_entity_arrays with the
+        partition of every tweet and the labels of the entity codes
+        """
+        if origin is None:
+            origin = self.df.index.min().normalize()
+        time_stamps, partitions = self.assign_partitions(self.df.index, partition_offset, origin)
+        tweets_df = self.df
+        if np.any(partitions[1:] < partitions[:-1]):
+            tweet_order = np.argsort(partitions, kind='stable')
+            tweets_df, partitions = tweets_df.iloc[tweet_order], partitions[tweet_order]
+
+        entity_arrays, labels = self.create_entity_arrays(tweets_df)
+        entity_arrays['partitions'] = partitions.astype(np.int32)
+        return time_stamps, entity_arrays, labels
+
+    @classmethod
+    def create_range_tables(cls, entity_arrays, start, end):
+        """
+        Create the distinct nodes and edges of the partitions of a contiguous range of tweets
+        :param entity_arrays: dict or SharedArrays of the entity arrays and the partitions of the tweets ordered by
+        partition
+        :param start: first tweet of the range
+        :param end: end tweet of the range (exclusive)
+        :return: nodes with the partition, node_id and type_code column and edges with the partition, user_id and
+        node_id column, both ordered by partition counted from the first partition of the range, and the label code
+        of every node id, the node ids are numbered in order of their first occurrence
+        """
+        rows, slots, codes = cls.create_token_arrays(entity_arrays, start, end)
+        node_ids, label_codes = pd.factorize(codes)
+        node_ids = node_ids.astype(np.int32)
+        slot_type_codes = np.array([NodeVocabulary.NODE_TYPES.index(node_type) for node_type in cls.SLOT_NODE_TYPES],
+                                   dtype=np.int8)
+        partitions = entity_arrays['partitions'][rows] - entity_arrays['partitions'][start]
+
+        # the user of a tweet is its token in slot 0, every other token is an edge to the user
+        is_user = slots == 0
+        user_ids = np.empty(end - start, dtype=np.int32)
+        user_ids[rows[is_user] - start] = node_ids[is_user]
+        nodes_df = pd.DataFrame({'partition': partitions, 'node_id': node_ids, 'type_code': slot_type_codes[slots]})
+        edges_df = pd.DataFrame({'partition': partitions[~is_user],
+                                 'user_id': user_ids[rows[~is_user] - start],
+                                 'node_id': node_ids[~is_user]})
+        nodes_df, edges_df = cls.reduce_partitions(nodes_df, edges_df, label_codes.shape[0])
+        return nodes_df, edges_df, label_codes
+
+    @staticmethod
+    def assign_partitions(time_index, partition_offset, origin):
+        """
+        Assign times to partitions which are anchored at an origin like resample anchors them at the midnight of the
+        first tweet, so also offsets which do not divide a day e.g. '35Min' get the partitions of resample
+        :param time_index: DatetimeIndex of the times
+        :param partition_offset: offset of the partitions
+        :param origin: time the partitions are anchored at
+        :return: start of every partition from the first to the last one of the times and the partition of every time
+        """
+        positions = ((time_index - origin) // pd.Timedelta(partition_offset)).to_numpy()
+        first_position = positions.min()
+        time_stamps = pd.date_range(origin + first_position * pd.Timedelta(partition_offset),
+                                    periods=positions.max() - first_position + 1, freq=partition_offset)
+        return time_stamps, positions - first_position
+
+    @staticmethod
+    def reduce_partitions(nodes_df, edges_df, vocabulary_size):
+        """
+        Reduce node occurrences to the distinct nodes of every partition with the position of their first and the type
+        of their last occurrence, and the edges to the distinct edges of every partition in order of occurrence
+        :param nodes_df: node occurrences ordered by partition with partition, node_id and type_code column
+        :param edges_df: edges ordered by partition with partition, user_id and node_id column
+        :param vocabulary_size: number of node ids
+        :return: reduced nodes and edges
+        """
+        keys = nodes_df['partition'].to_numpy(dtype=np.int64) * np.int64(vocabulary_size) + \
+            nodes_df['node_id'].to_numpy()
+        last_type_codes = pd.Series(nodes_df['type_code'].to_numpy(), index=keys)
+        last_type_codes = last_type_codes[~last_type_codes.index.duplicated(keep='last')]
+        is_first = ~pd.Index(keys).duplicated(keep='first')
+        nodes_df = pd.DataFrame({'partition': nodes_df['partition'].to_numpy()[is_first],
+                                 'node_id': nodes_df['node_id'].to_numpy()[is_first],
+                                 'type_code': last_type_codes.reindex(keys[is_first]).to_numpy(dtype=np.int8)})
+        return nodes_df, edges_df.drop_duplicates(ignore_index=True)
+
+    def create_compact_graph_records(self, time_stamps, nodes_df, edges_df, partition_type, vocabulary):
+        """
+        Create the graph records of reduced partitions, nodes without edges are not added
+        :param time_stamps: start of every partition
+        :param nodes_df: distinct nodes of every partition ordered by partition
+        :param edges_df: distinct edges of every partition ordered by partition
+        :param partition_type: partition in which the tweets are getting divided
+        :param vocabulary: vocabulary of the node ids
+        :return: list of the graph records
+        """
+        graph_arrays = self.create_graph_arrays(time_stamps.shape[0], nodes_df, edges_df, len(vocabulary))
+        graph_records = []
+        for partition, time_stamp in enumerate(time_stamps):
+            graph = CompactGraph.from_positions(vocabulary, *get_partition_arrays(graph_arrays, partition))
+            if self.vocabulary is None:
+                graph = graph.to_networkx()
+            graph_records.append(self.create_record(time_stamp, graph, partition_type))
+        return graph_records
+
+    def compute_graphs_parallel(self, partition_type: PartitionType, processes: int = None,
+                                ranges_per_process: int = 4):
+        """
+        Create the graphs of the partitions in a pool of worker processes. The entities of the tweets are factorized
+        once into arrays which are shared with the workers, every worker creates the nodes and edges of contiguous
+        ranges of partitions with about the same number of tweets and returns the CSR arrays of their graphs. The node
+        ids of the workers are mapped to the vocabulary of the creator and the networkx graphs are converted in this
+        process.
+        :param partition_type: partition in which the tweets are getting divided
+        :param processes: number of worker processes, defaults to the number of cores
+        :param ranges_per_process: number of partition ranges per worker process
+        :return: list of the created graph records in order of the partitions, like compute_graphs
+        """
+        if self.df.shape[0] == 0:
+            return []
+        processes = processes or os.cpu_count()
+        vocabulary = self.vocabulary if self.vocabulary is not None else NodeVocabulary()
+        partition_offset = to_offset(self.get_partition_value(partition_type))
+        time_stamps, entity_arrays, labels = self.create_partitioned_entity_arrays(partition_offset)
+
+        # contiguous partition ranges with about the same number of tweets
+        partitions_count = time_stamps.shape[0]
+        tweet_starts = np.searchsorted(entity_arrays['partitions'], np.arange(partitions_count + 1))
+        range_bounds = np.searchsorted(tweet_starts,
+                                       np.linspace(0, tweet_starts[-1], processes * ranges_per_process + 1))
+        range_bounds = np.unique(np.concatenate([[0], range_bounds.clip(0, partitions_count), [partitions_count]]))
+        tweet_bounds = tweet_starts[range_bounds]
+        tasks = [(int(start), int(end)) for start, end in zip(tweet_bounds[:-1], tweet_bounds[1:]) if end > start]
+
+        graphs = [None] * partitions_count
+        shared_arrays = SharedArrays.create(entity_arrays)
+        try:
+            with ProcessPoolExecutor(max_workers=processes, initializer=init_graph_worker,
+                                     initargs=(shared_arrays.get_specs(),)) as executor:
+                for first_partition, range_graphs, label_codes in executor.map(create_graph_range, tasks):
+                    # the ranges are interned in order, so the node ids are the ids of the sequential creation
+                    node_id_map = vocabulary.intern(labels[label_codes])
+                    for partition, (node_ids, node_types, indptr, indices) in enumerate(range_graphs,
+                                                                                        first_partition):
+                        graphs[partition] = CompactGraph(vocabulary, node_id_map[node_ids], node_types, indptr,
+                                                         indices)
+        finally:
+            shared_arrays.close()
+
+        # partitions without tweets have empty graphs
+        graphs = [graph if graph is not None else CompactGraph.create_empty(vocabulary) for graph in graphs]
+        if self.vocabulary is None:
+            graphs = [graph.to_networkx() for graph in graphs]
+        return [self.create_record(time_stamp, graph, partition_type) for time_stamp, graph in zip(time_stamps, graphs)]
+
+    @staticmethod
+    def create_graph_arrays(partitions_count, nodes_df, edge_df, vocabulary_size):
+        """
+        Create the node and edge arrays of all partitions, only the nodes of edges are kept and the edges refer to the
+        local node positions within their partition
+        :param partitions_count: number of partitions
+        :param nodes_df: distinct nodes of every partition ordered by partition
+        :param edge_df: distinct edges of every partition ordered by partition
+        :param vocabulary_size: number of node ids
+        :return: dict of the arrays, the nodes and edges of partition i start at node_starts[i] and edge_starts[i]
+        """
+        vocabulary_size = np.int64(vocabulary_size)
+        node_keys = nodes_df['partition'].to_numpy(dtype=np.int64) * vocabulary_size + nodes_df['node_id'].to_numpy()
+        edge_partitions = edge_df['partition'].to_numpy()
+        source_keys = edge_partitions.astype(np.int64) * vocabulary_size + edge_df['user_id'].to_numpy()
+        target_keys = edge_partitions.astype(np.int64) * vocabulary_size + edge_df['node_id'].to_numpy()
+        is_connected = np.isin(node_keys, np.concatenate([source_keys, target_keys]))
+        node_keys = node_keys[is_connected]
+        node_partitions = nodes_df['partition'].to_numpy()[is_connected]
+
+        # local node positions of the edges within their partition
+        partition_bounds = np.arange(partitions_count + 1)
+        node_starts = np.searchsorted(node_partitions, partition_bounds)
+        edge_starts = np.searchsorted(edge_partitions, partition_bounds)
+        key_index = pd.Index(node_keys)
+        return {'node_ids': nodes_df['node_id'].to_numpy(dtype=np.int32)[is_connected],
+                'node_types': nodes_df['type_code'].to_numpy(dtype=np.int8)[is_connected],
+                'sources': (key_index.get_indexer(source_keys) - node_starts[edge_partitions]).astype(np.int32),
+                'targets': (key_index.get_indexer(target_keys) - node_starts[edge_partitions]).astype(np.int32),
+                'node_starts': node_starts,
+                'edge_starts': edge_starts}
+
+    def stream_graphs(self, tweet_chunks, partition_type: PartitionType):
+        """
+        Create Graphs from time ordered chunks of tweets. Every graph is yielded as soon as its partition is closed,
+        so only the tweets of the open partition are kept in memory. The graphs are equal to compute_graphs.
+        :param tweet_chunks: iterable of tweet data frames (or arrow record batches) ordered by created_at
+        :param partition_type: partition in which the tweets are getting divided
+        :return: generator of the created network graphs
+        """
+        partition_offset = to_offset(self.get_partition_value(partition_type))
+        open_tweets_df = None
+        next_time_stamp = None
+
+        for chunk_df in tweet_chunks:
+            chunk_df = self.prepare_tweet_chunk(chunk_df)
+            if chunk_df.shape[0] == 0:
+                continue
+
+            if open_tweets_df is not None:
+                chunk_df = pd.concat([open_tweets_df, chunk_df]).sort_index(kind='mergesort')
+            open_tweets_df = chunk_df
+            time_stamps = open_tweets_df.index.floor(partition_offset)
+            if next_time_stamp is not None and time_stamps[0] < next_time_stamp:
+                raise ValueError("Tweet chunks have to be ordered by created_at")
+
+            # all partitions before the partition of the latest tweet are closed
+            is_closed = time_stamps < time_stamps[-1]
+            for time_stamp, tweets_df in open_tweets_df[is_closed].groupby(time_stamps[is_closed]):
+                yield from self.create_empty_graph_records(next_time_stamp, time_stamp, partition_type)
+                yield self.create_graph_record(time_stamp, tweets_df, partition_type)
+                next_time_stamp = time_stamp + partition_offset
+            open_tweets_df = open_tweets_df[~is_closed]
+
+        # create the graph of the last partition
+        if open_tweets_df is not None:
+            time_stamp = open_tweets_df.index[0].floor(partition_offset)
+            yield from self.create_empty_graph_records(next_time_stamp, time_stamp, partition_type)
+            yield self.create_graph_record(time_stamp, open_tweets_df, partition_type)
+
+    def create_empty_graph_records(self, next_time_stamp, time_stamp, partition_type: PartitionType):
+        """
+        Create the graphs of the partitions without tweets between two partitions like resample does
+        :param next_time_stamp: start of the partition following the last created partition, None for the first one
+        :param time_stamp: start of the next partition containing tweets
+        :param partition_type: partition in which the tweets are getting divided
+        :return: generator of empty network graphs
+        """
+        if next_time_stamp is None:
+            return
+        partition_offset = to_offset(self.get_partition_value(partition_type))
+        empty_tweets_df = pd.DataFrame(columns=self.GRAPH_COLUMNS)
+        while next_time_stamp < time_stamp:
+            yield self.create_graph_record(next_time_stamp, empty_tweets_df, partition_type)
+            next_time_stamp = next_time_stamp + partition_offset
+
+    def create_graph_record(self, time_stamp, tweets_df, partition_type: PartitionType):
+        """
+        Create the network graph of one partition
+        :param time_stamp: start of the partition
+        :param tweets_df: tweets of the partition
+        :param partition_type: partition in which the tweets are getting divided
+        :return: dict with the interval, the partition and the graph
+        """
+        if self.vocabulary is None:
+            graph = self.create_twitter_graph(tweets_df)
+        else:
+            graph = self.create_compact_twitter_graph(tweets_df, self.vocabulary)
+        return self.create_record(time_stamp, graph, partition_type)
+
+    def create_record(self, time_stamp, graph, partition_type: PartitionType):
+        """
+        :param time_stamp: start of the partition
+        :param graph: graph of the partition
+        :param partition_type: partition in which the tweets are getting divided
+        :return: dict with the interval, the partition and the graph
+        """
+        return {'interval_start': self.create_default_date_time(time_stamp),
+                'interval_end': self.create_partition_date_time(time_stamp, partition_type),
+                'partition': self.get_partition_value(partition_type),
+                'graph': graph}
+
+    @staticmethod
+    def prepare_tweet_chunk(chunk_df):
+        """
+        Convert a chunk of tweets to a data frame with created_at as sorted datetime index
+        :param chunk_df: data frame or arrow record batch
+        :return: prepared data frame
+        """
+        if hasattr(chunk_df, 'to_pandas'):
+            chunk_df = chunk_df.to_pandas()
+        if 'created_at' in chunk_df.columns:
+            chunk_df = chunk_df.set_index('created_at')
+        chunk_df.index = pd.to_datetime(chunk_df.index)
+        return chunk_df.sort_index()
+
+    @classmethod
+    def read_csv_chunks(cls, file_paths, chunk_size: int = 100000):
+        """
+        Read prepared tweets csv files in chunks
+        :param file_paths: time ordered list of csv files
+        :param chunk_size: number of tweets per chunk
+        :return: generator of tweet data frames
+        """
+        for file_path in file_paths:
+            for chunk_df in pd.read_csv(file_path, converters=cls.TWITTER_DF_CONVERTERS, header=0,
+                                        chunksize=chunk_size):
+                yield chunk_df
+
     def create_default_date_time(self, time_stamp):
         """
         Create default formatted date time string
@@ -62,62 +576,172 @@ class TwitterGraphCreator:
         :param partition_type: partition for which the time string should get created
         :return: formatted time string
         """
-        if partition_type is PartitionType.FIVE_MINUTES:
-            return f"{datetime.strftime(time_stamp + timedelta(minutes=5), self.PARSE_DATE_TIME_FORMAT)}"
-        elif partition_type is PartitionType.FIFTEEN_MINUTES:
-            return f"{datetime.strftime(time_stamp + timedelta(minutes=15), self.PARSE_DATE_TIME_FORMAT)}"
-        elif partition_type is PartitionType.ONE_HOUR:
-            return f"{datetime.strftime(time_stamp + timedelta(hours=1), self.PARSE_DATE_TIME_FORMAT)}"
+        partition_offset = to_offset(self.get_partition_value(partition_type))
+        return f"{datetime.strftime(time_stamp + partition_offset, self.PARSE_DATE_TIME_FORMAT)}"
+
+    @classmethod
+    def get_graph_options(cls):
+        """
+        Get the options of the graph creation which are part of the fingerprint of cached graphs
+        :return: dict of the options
+        """
+        return {'graph_rules_version': cls.GRAPH_RULES_VERSION,
+                'graph_columns': cls.GRAPH_COLUMNS,
+                'skipped_hashtags': cls.SKIPPED_HASHTAGS,
+                'node_types': list(NodeVocabulary.NODE_TYPES)}
 
     @staticmethod
-    def create_twitter_graph(df):
+    def get_partition_value(partition_type):
         """
-        Create a network graph from given twitter data frame
+        :param partition_type: PartitionType or pandas offset alias e.g. '30Min'
+        :return: pandas offset alias of the partition
+        """
+        return partition_type.value if isinstance(partition_type, PartitionType) else partition_type
+
+    @classmethod
+    def create_twitter_graph(cls, df):
+        """
+        Create a network graph from given twitter data frame. The mentions, hashtags and domains are exploded into one
+        typed edge list and the graph is built in bulk. Nodes, node types and edges are added in the order of the
+        tweets, so the graph is equal to adding the entities tweet by tweet.
         :param df: data frame containing tweets to generate the network
         :return: Twitter-Graph
         """
         # create new empty Graph
         G = nx.Graph()
+        if df.shape[0] == 0:
+            return G
+
+        nodes, node_types, edges_df = cls.create_edge_list(df)
+        G.add_nodes_from((node, {'type': node_type}) for node, node_type in zip(nodes, node_types))
+        G.add_edges_from(zip(edges_df['user'], edges_df['node']))
+
+        return G
+
+    @classmethod
+    def create_compact_twitter_graph(cls, df, vocabulary: NodeVocabulary):
+        """
+        Create a compact graph with interned node ids from given twitter data frame, without a networkx graph
+        :param df: data frame containing tweets to generate the network
+        :param vocabulary: vocabulary of the node labels shared by all graphs
+        :return: CompactGraph which is equal to create_twitter_graph
+        """
+        if df.shape[0] == 0:
+            return CompactGraph.create_empty(vocabulary)
+
+        nodes, node_types, edges_df = cls.create_edge_list(df)
+        return CompactGraph.from_edge_list(vocabulary, nodes, node_types, edges_df['user'], edges_df['node'])
+
+    @classmethod
+    def create_edge_list(cls, df):
+        """
+        Create the typed nodes and the deduplicated edge list of the tweets
+        :param df: data frame containing tweets to generate the network
+        :return: nodes in insertion order, their types and data frame of the edges with user and node column
+        """
+        tokens_df = cls.create_tokens(df)
 
-        # iterate over rows to add nodes to network
-        for idx, row in df.iterrows():
+        # every entity is connected to the user of its tweet
+        users = df['user_screen_name'].to_numpy()
+        edges_df = tokens_df[tokens_df['slot'] > 0]
+        edges_df = pd.DataFrame({'user': users[edges_df['row'].to_numpy()], 'node': edges_df['node'].to_numpy()})
+        edges_df = edges_df.drop_duplicates()
 
-            # add user
-            user_node = row['user_screen_name']
-            G.add_nodes_from([(user_node, {'type': 'user'})])
+        # nodes without edges are not added, a node keeps the position of its first and the type of its last occurrence
+        connected_nodes = set(edges_df['user']).union(edges_df['node'])
+        last_node_types = dict(zip(tokens_df['node'], tokens_df['type']))
+        nodes = [node for node in tokens_df['node'].drop_duplicates() if node in connected_nodes]
+        return nodes, [last_node_types[node] for node in nodes], edges_df
 
-            # add user mentions
-            for user_mention_node in row['mentions']:
+    @classmethod
+    def create_tokens(cls, df):
+        """
+        Explode the users, mentions, hashtags and domains of the tweets into one typed node table
+        :param df: data frame containing tweets to generate the network
+        :return: data frame with the tweet position, the slot, the node and its type ordered like the tweets
+        """
+        entity_arrays, labels = cls.create_entity_arrays(df)
+        rows, slots, codes = cls.create_token_arrays(entity_arrays, 0, df.shape[0])
+        return pd.DataFrame({'row': rows, 'slot': slots, 'node': labels[codes],
+                             'type': np.array(cls.SLOT_NODE_TYPES, dtype=object)[slots]})
 
-                # handle self mined tweets mentions format
-                if not isinstance(user_mention_node, str):
-                    user_mention_node = user_mention_node['screen_name']
+    @classmethod
+    def create_entity_arrays(cls, df):
+        """
+        Explode the users, mentions, hashtags and domains of the tweets and factorize them into the codes of one label
+        table, so they can be shared with worker processes as numpy arrays. The hashtags and domains are lowered once
+        per distinct entity.
+        :param df: data frame containing tweets to generate the network
+        :return: dict of the user code of every tweet and the tweet positions and codes of the mentions, hashtags and
+        domains ordered like the tweets, and the object array of the labels of the codes
+        """
+        users = df['user_screen_name'].to_numpy()
 
-                # skip self mentions
-                if user_mention_node is user_node:
-                    continue
+        # user mentions, handle self mined tweets mentions format
+        mentions = cls.explode_entities(df['mentions'])
+        mentions = mentions.map(lambda mention: mention if isinstance(mention, str) else mention['screen_name'])
 
-                G.add_nodes_from(
-                    [(user_mention_node, {'type': 'user'})])
-                G.add_edge(user_node, user_mention_node)
+        # skip self mentions, compared by identity like the former tweet by tweet implementation
+        is_self_mention = np.fromiter((mention is user for mention, user in
+                                       zip(mentions.to_numpy(), users[mentions.index.to_numpy()])),
+                                      dtype=bool, count=mentions.shape[0])
+        mentions = mentions[~is_self_mention]
+        hashtags = cls.explode_entities(df['hashtags'])
+        domains = cls.explode_entities(df['domains'])
 
-            # add hashtags
-            for hashtag in row['hashtags']:
+        user_codes, user_labels = pd.factorize(users, use_na_sentinel=False)
+        mention_codes, mention_labels = pd.factorize(mentions.to_numpy(), use_na_sentinel=False)
+        hashtag_codes, hashtag_labels = pd.factorize(hashtags.to_numpy(), use_na_sentinel=False)
+        hashtag_labels = pd.Series(hashtag_labels, dtype=object).str.lower().to_numpy()
+        domain_codes, domain_labels = pd.factorize(domains.to_numpy(), use_na_sentinel=False)
+        domain_labels = pd.Series(domain_labels, dtype=object).str.lower().to_numpy()
 
-                # skip crawled hashtags which the data was crawled for
-                if hashtag.lower() in ['btc', 'bitcoin']:
-                    continue
-                hashtag_node = hashtag.lower()
-                G.add_nodes_from([(hashtag_node, {'type': 'hashtag'})])
-                G.add_edge(user_node, hashtag_node)
+        # skip crawled hashtags which the data was crawled for
+        is_kept_hashtag = ~np.isin(hashtag_labels, cls.SKIPPED_HASHTAGS)[hashtag_codes]
 
-            # add domains
-            for domain in row['domains']:
-                domain_node = domain.lower()
-                G.add_nodes_from([(domain_node, {'type': 'domain'})])
-                G.add_edge(user_node, domain_node)
+        # one label table for all entities, equal labels are one node like in the graph
+        label_codes, labels = pd.factorize(np.concatenate([user_labels, mention_labels, hashtag_labels, domain_labels]),
+                                           use_na_sentinel=False)
+        label_codes = label_codes.astype(np.int32)
+        label_starts = np.cumsum([0, user_labels.shape[0], mention_labels.shape[0], hashtag_labels.shape[0]])
+        return {'user_codes': label_codes[label_starts[0] + user_codes],
+                'mention_rows': mentions.index.to_numpy(dtype=np.int32),
+                'mention_codes': label_codes[label_starts[1] + mention_codes],
+                'hashtag_rows': hashtags.index.to_numpy(dtype=np.int32)[is_kept_hashtag],
+                'hashtag_codes': label_codes[label_starts[2] + hashtag_codes[is_kept_hashtag]],
+                'domain_rows': domains.index.to_numpy(dtype=np.int32),
+                'domain_codes': label_codes[label_starts[3] + domain_codes]}, np.asarray(labels, dtype=object)
 
-        # remove nodes with 0 degree
-        G.remove_nodes_from([n for (n, deg) in G.degree() if deg == 0])
+    @staticmethod
+    def create_token_arrays(entity_arrays, start, end):
+        """
+        Create the tokens of a contiguous range of tweets from their entity arrays, the user of a tweet comes before
+        its mentions, hashtags and domains
+        :param entity_arrays: dict or SharedArrays created by create_entity_arrays
+        :param start: first tweet of the range
+        :param end: end tweet of the range (exclusive)
+        :return: tweet position, slot and label code of the tokens ordered like the tweets
+        """
+        rows = [np.arange(start, end, dtype=np.int32)]
+        slots = [np.zeros(end - start, dtype=np.int8)]
+        codes = [entity_arrays['user_codes'][start:end]]
+        for slot, entity in enumerate(['mention', 'hashtag', 'domain'], 1):
+            entity_rows = entity_arrays[f"{entity}_rows"]
+            entity_start, entity_end = np.searchsorted(entity_rows, [start, end])
+            rows.append(entity_rows[entity_start:entity_end])
+            slots.append(np.full(entity_end - entity_start, slot, dtype=np.int8))
+            codes.append(entity_arrays[f"{entity}_codes"][entity_start:entity_end])
 
-        return G
+        rows = np.concatenate(rows)
+        token_order = np.argsort(rows, kind='stable')
+        return rows[token_order], np.concatenate(slots)[token_order], np.concatenate(codes)[token_order]
+
+    @staticmethod
+    def explode_entities(entities_column):
+        """
+        Explode a list column to one entity per row
+        :param entities_column: series of entity lists
+        :return: object series of entities indexed by the position of their tweet
+        """
+        entities = pd.Series(entities_column.to_numpy(), index=np.arange(entities_column.shape[0]), dtype=object)
+        return entities.explode().dropna().astype(object)
@@ -0,0 +1,131 @@
+import calendar
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from get_data.CandleFetcher import CandleFetcher
+from get_data.FetchBtcPriceData import fetch_data
+from utils.StopWatch import StopWatch
+
+
+class StubCandleServer:
+    """
+    Local http server which mimics the coinbase candles endpoint. The candles are generated from the requested time
+    range, so every response is deterministic.
+    """
+
+    def __init__(self, latency: float = 0.05, max_candles: int = 300, error_every: int = 0):
+        """
+        :param latency: seconds every response is delayed like a round trip to the real api
+        :param max_candles: max number of candles per response, more candles are answered with status 400
+        :param error_every: answer every n-th request with status 429, 0 to disable
+        """
+        stub = self
+        self.request_count = 0
+        self.lock = threading.Lock()
+
+        class CandleRequestHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                with stub.lock:
+                    stub.request_count += 1
+                    request_number = stub.request_count
+                time.sleep(latency)
+
+                if error_every and request_number % error_every == 0:
+                    self.send_response(429)
+                    self.end_headers()
+                    return
+
+                params = parse_qs(urlparse(self.path).query)
+                granularity = int(params['granularity'][0])
+                start = calendar.timegm(datetime.strptime(params['start'][0], CandleFetcher.api_date_time_format)
+                                        .timetuple())
+                end = calendar.timegm(datetime.strptime(params['end'][0], CandleFetcher.api_date_time_format)
+                                      .timetuple())
+                first_candle = start + (-start % granularity)
+                candle_times = list(range(first_candle, end + 1, granularity))
+                if len(candle_times) > max_candles:
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+
+                # coinbase returns the candles in descending order [time, low, high, open, close, volume]
+                candles = [[t, t % 997, t % 997 + 10, t % 997 + 2, t % 997 + 5, 1.5] for t in reversed(candle_times)]
+                body = json.dumps(candles).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), CandleRequestHandler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.server_thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def fetch_hourly_windows(base_url, symbol_pair, start_date_time, end_date_time, granularity):
+    """
+    Fetch the candles like the former main loop with one sequential request per hour
+    :return: candles sorted by date
+    """
+    window_dfs = []
+    fetch_start_date_time = start_date_time
+    while fetch_start_date_time <= end_date_time:
+        fetch_end_date_time = fetch_start_date_time + timedelta(hours=1) - timedelta(seconds=1)
+        window_df = fetch_data(symbol_pair, fetch_start_date_time.strftime(CandleFetcher.api_date_time_format),
+                               fetch_end_date_time.strftime(CandleFetcher.api_date_time_format), granularity,
+                               coinbase_api_base_url=base_url)
+        window_dfs.append(window_df.sort_values('date', ascending=True))
+        fetch_start_date_time = fetch_end_date_time + timedelta(seconds=1)
+    return pd.concat(window_dfs, ignore_index=True)
+
+
+if __name__ == '__main__':
+    """
+    Benchmark the concurrent candle fetcher against hourly sequential requests on a local stub server
+    """
+    ################################################ configuration #####################################################
+
+    datetime_start = datetime(2022, 1, 1)
+    datetime_end = datetime(2022, 1, 7, 23, 59, 59)
+    granularity = 300  # 5 minutes
+    latency = 0.05
+
+    ####################################################################################################################
+
+    stop_watch = StopWatch()
+
+    with StubCandleServer(latency=latency) as stub_server:
+        stop_watch.start()
+        hourly_df = fetch_hourly_windows(stub_server.base_url, "BTC-USD", datetime_start, datetime_end, granularity)
+        print(f"hourly requests: {stub_server.request_count} requests, {hourly_df.shape[0]} candles, "
+              f"took {stop_watch.get_time()}[s]")
+
+    with StubCandleServer(latency=latency, error_every=7) as stub_server:
+        candle_fetcher = CandleFetcher(base_url=stub_server.base_url, max_workers=4, requests_per_second=50.0,
+                                       backoff_factor=0.05)
+        stop_watch.start()
+        fetched_df = candle_fetcher.fetch("BTC-USD", datetime_start, datetime_end, granularity)
+        print(f"candle fetcher: {stub_server.request_count} requests (every 7th answered with 429), "
+              f"{fetched_df.shape[0]} candles, took {stop_watch.get_time()}[s]")
+
+    # both fetch methods have to return the same candles
+    hourly_df = hourly_df.astype(fetched_df.dtypes.to_dict())
+    print(f"equal candles: {hourly_df[CandleFetcher.candle_columns].equals(fetched_df[CandleFetcher.candle_columns])}")
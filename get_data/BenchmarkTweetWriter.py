@@ -0,0 +1,71 @@
+from get_data.BufferedTweetWriter import BufferedTweetWriter
+from utils.FakeMongoCollection import FakeMongoCollection
+from utils.StopWatch import StopWatch
+
+
+def create_fake_tweet(tweet_id):
+    """
+    Create a minimal tweet json object
+    :param tweet_id: id of the tweet
+    :return: tweet as dict
+    """
+    return {'id': tweet_id, 'text': f"#btc fake tweet number {tweet_id}", 'retweeted': False,
+            'created_at': 'Sat Jan 01 00:00:00 +0000 2022', 'user': {'screen_name': f"user_{tweet_id % 1000}"},
+            'entities': {'hashtags': [{'text': 'btc'}], 'user_mentions': [], 'urls': []}}
+
+
+def run_insert_one_benchmark(tweets_count, collection):
+    """
+    Write the tweets with one synchronous insert_one call per tweet like the former stream listener
+    :return: seconds the stream thread was blocked, total seconds till all tweets are stored
+    """
+    stop_watch = StopWatch()
+    stop_watch.start()
+    for tweet_id in range(tweets_count):
+        collection.insert_one(document=create_fake_tweet(tweet_id))
+    duration = stop_watch.get_time()
+    return duration, duration
+
+
+def run_buffered_benchmark(tweets_count, collection, batch_size, max_queue_size):
+    """
+    Write the tweets with the buffered background writer
+    :return: seconds the stream thread was blocked, total seconds till all tweets are stored, writer statistics
+    """
+    stop_watch = StopWatch()
+    stop_watch.start()
+    tweet_writer = BufferedTweetWriter(collection, batch_size=batch_size, max_queue_size=max_queue_size)
+    for tweet_id in range(tweets_count):
+        tweet_writer.write(create_fake_tweet(tweet_id))
+    enqueue_duration = stop_watch.get_time()
+    tweet_writer.close()
+    return enqueue_duration, stop_watch.get_time(), tweet_writer.get_statistics()
+
+
+if __name__ == '__main__':
+    """
+    Benchmark the buffered tweet writer against per tweet insert_one calls on a local fake collection
+    """
+    ################################################ configuration #####################################################
+
+    tweets_count = 20000
+    round_trip_latency = 0.001  # 1ms per call like a mongo db on the local network
+    per_document_latency = 0.00001
+    batch_size = 500
+    max_queue_size = 50000
+
+    ####################################################################################################################
+
+    sync_collection = FakeMongoCollection(round_trip_latency, per_document_latency)
+    sync_stream_time, sync_total_time = run_insert_one_benchmark(tweets_count, sync_collection)
+    print(f"insert_one: stream thread {sync_stream_time}[s] "
+          f"({round(tweets_count / sync_stream_time, 2)} tweets/s), stored {len(sync_collection.documents)} tweets "
+          f"after {sync_total_time}[s]")
+
+    buffered_collection = FakeMongoCollection(round_trip_latency, per_document_latency)
+    buffered_stream_time, buffered_total_time, statistics = run_buffered_benchmark(
+        tweets_count, buffered_collection, batch_size, max_queue_size)
+    print(f"buffered insert_many: stream thread {buffered_stream_time}[s] "
+          f"({round(tweets_count / max(buffered_stream_time, 1e-9), 2)} tweets/s), stored "
+          f"{len(buffered_collection.documents)} tweets after {buffered_total_time}[s]")
+    print(f"buffered writer statistics: {statistics}")
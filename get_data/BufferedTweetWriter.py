@@ -0,0 +1,173 @@
+import logging
+import queue
+import threading
+import time
+
+from pymongo.errors import BulkWriteError
+
+from utils.TweetTimestamps import add_timestamp
+
+
+class BufferedTweetWriter:
+    """
+    Writes crawled tweets in batches to a mongo database collection. The tweets are getting buffered in a bounded
+    queue which is drained by a background thread with unordered insert_many calls.
+    """
+
+    # marker which tells the background thread to flush the last batch and stop
+    _STOP = object()
+
+    def __init__(self, mongo_db_collection, batch_size: int = 500, flush_interval: float = 1.0,
+                 max_queue_size: int = 50000, log_interval: float = 60.0):
+        """
+        :param mongo_db_collection: the mongo database collection to store the crawled tweets, or another sink with
+        insert_many e.g. a TweetFileStore
+        :param batch_size: max number of tweets which are getting inserted with one insert_many call
+        :param flush_interval: max seconds a tweet stays in the buffer before the batch is getting written
+        :param max_queue_size: max number of buffered tweets, write() blocks if the queue is full (backpressure)
+        :param log_interval: seconds between two throughput log entries
+        """
+        self.mongo_db_collection = mongo_db_collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.log_interval = log_interval
+        self.queue = queue.Queue(maxsize=max_queue_size)
+
+        # statistics
+        self.enqueued_count = 0
+        self.written_count = 0
+        self.failed_count = 0
+        self.batch_count = 0
+        self.max_queue_depth = 0
+        self.blocked_time = 0.0
+        self.start_time = time.monotonic()
+
+        self.closed = False
+        self.writer_thread = threading.Thread(target=self._run, name="BufferedTweetWriter", daemon=True)
+        self.writer_thread.start()
+
+    def write(self, document):
+        """
+        Enqueue a tweet to get written by the background thread. Blocks if the queue is full.
+        :param document: the tweet as json object
+        """
+        if self.closed:
+            raise RuntimeError("Writer is already closed")
+
+        try:
+            self.queue.put_nowait(document)
+        except queue.Full:
+            # apply backpressure to the stream thread till the writer has caught up
+            blocked_start = time.monotonic()
+            self.queue.put(document)
+            self.blocked_time += time.monotonic() - blocked_start
+
+        self.enqueued_count += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+
+    def close(self):
+        """
+        Flush all buffered tweets and stop the background thread.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(self._STOP)
+        self.writer_thread.join()
+        self.log_statistics()
+
+    def get_statistics(self):
+        """
+        Get the current throughput and queue statistics of the writer
+        :return: statistics as dict
+        """
+        elapsed_time = time.monotonic() - self.start_time
+        return {'enqueued': self.enqueued_count,
+                'written': self.written_count,
+                'failed': self.failed_count,
+                'batches': self.batch_count,
+                'queue_depth': self.queue.qsize(),
+                'max_queue_depth': self.max_queue_depth,
+                'blocked_time': round(self.blocked_time, 5),
+                'tweets_per_second': round(self.written_count / elapsed_time, 2) if elapsed_time > 0 else 0.0}
+
+    def log_statistics(self):
+        """
+        Log the current throughput and queue statistics of the writer
+        """
+        statistics = self.get_statistics()
+        logging.info("Tweet writer: written {} tweets ({} tweets/s) in {} batches, failed {}, queue depth {} "
+                     "(max {})".format(statistics['written'], statistics['tweets_per_second'], statistics['batches'],
+                                       statistics['failed'], statistics['queue_depth'],
+                                       statistics['max_queue_depth']))
+
+    def _run(self):
+        """
+        Background thread which drains the queue and writes the tweets in batches to the collection
+        """
+        batch = []
+        last_flush_time = time.monotonic()
+        last_log_time = last_flush_time
+
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush_time))
+            try:
+                document = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                document = None
+
+            if document is self._STOP:
+                self._flush(batch)
+                return
+
+            if document is not None:
+                batch.append(document)
+
+            # flush if either the batch is full or the oldest buffered tweet waited long enough
+            now = time.monotonic()
+            if len(batch) >= self.batch_size or (batch and now - last_flush_time >= self.flush_interval):
+                self._flush(batch)
+                batch = []
+                last_flush_time = now
+            elif not batch:
+                last_flush_time = now
+
+            if now - last_log_time >= self.log_interval:
+                self.log_statistics()
+                last_log_time = now
+
+    def _flush(self, batch):
+        """
+        Write a batch of tweets to the collection. Duplicates or invalid documents do not stop the other inserts.
+        :param batch: list of tweets to write
+        """
+        if not batch:
+            return
+
+        # add the parsed created_at date time which is indexed to query time ranges, a malformed tweet is skipped
+        # instead of stopping the background thread
+        valid_batch = []
+        for document in batch:
+            try:
+                valid_batch.append(add_timestamp(document))
+            except Exception as e:
+                self.failed_count += 1
+                logging.error("Skipped tweet with invalid created_at: {}".format(repr(e)))
+        batch = valid_batch
+        if not batch:
+            return
+
+        try:
+            self.mongo_db_collection.insert_many(batch, ordered=False)
+            self.written_count += len(batch)
+        except BulkWriteError as e:
+            inserted_count = e.details.get('nInserted', 0)
+            self.written_count += inserted_count
+            self.failed_count += len(batch) - inserted_count
+            logging.error("Bulk write of {} tweets partially failed: {} errors".format(
+                len(batch), len(e.details.get('writeErrors', []))))
+        except Exception as e:
+            self.failed_count += len(batch)
+            logging.error("Bulk write of {} tweets failed: {}".format(len(batch), str(e)))
+
+        self.batch_count += 1
@@ -0,0 +1,145 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import threading
+import time
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class RateLimiter:
+    """
+    Thread safe rate limiter which spaces the requests evenly to the given rate
+    """
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self.next_request_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """
+        Block till the next request is allowed
+        """
+        with self.lock:
+            now = time.monotonic()
+            request_time = max(now, self.next_request_time)
+            self.next_request_time = request_time + self.interval
+        if request_time > now:
+            time.sleep(request_time - now)
+
+
+class CandleFetcher:
+    """
+    Fetches historical candles from the coinbase api. Every request is filled up to the max number of candles the
+    api returns, the windows are fetched concurrently over a pooled session and reassembled in order.
+    """
+
+    candle_columns = ['unix', 'low', 'high', 'open', 'close', 'volume']
+    api_date_time_format = "%Y-%m-%dT%H:%M:%S"  # start -> 2021-07-17T23:59:59
+
+    def __init__(self, base_url: str = "https://api.pro.coinbase.com/", max_candles_per_request: int = 300,
+                 max_workers: int = 4, requests_per_second: float = 8.0, max_retries: int = 5,
+                 backoff_factor: float = 0.5, timeout: float = 10.0):
+        """
+        :param base_url: base url of the api
+        :param max_candles_per_request: max number of candles the api returns per request
+        :param max_workers: number of windows which are fetched concurrently
+        :param requests_per_second: max number of requests per second over all workers
+        :param max_retries: number of retries of a failed request
+        :param backoff_factor: seconds to wait before the first retry, doubled for every further retry
+        :param timeout: timeout of a request in seconds
+        """
+        self.base_url = base_url
+        self.max_candles_per_request = max_candles_per_request
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.failed_windows = []
+
+        # reuse the connections of all workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def create_windows(self, start_date_time, end_date_time, granularity):
+        """
+        Divide the time range into windows containing the max number of candles per request
+        :param start_date_time: start date time of the range
+        :param end_date_time: end date time of the range (inclusive)
+        :param granularity: granularity of the candles in seconds
+        :return: list of (start, end) tuples
+        """
+        window_size = timedelta(seconds=granularity * self.max_candles_per_request)
+        windows = []
+        window_start = start_date_time
+        while window_start <= end_date_time:
+            window_end = min(window_start + window_size - timedelta(seconds=1), end_date_time)
+            windows.append((window_start, window_end))
+            window_start = window_start + window_size
+        return windows
+
+    def fetch_window(self, symbol_pair, start_date_time, end_date_time, granularity):
+        """
+        Fetch the candles of one window, failed requests are retried with exponential backoff
+        :return: candles as data frame or None if the window could not be fetched
+        """
+        params = {'start': start_date_time.strftime(self.api_date_time_format),
+                  'end': end_date_time.strftime(self.api_date_time_format),
+                  'granularity': granularity}
+        url = f"{self.base_url}products/{symbol_pair}/candles"
+
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait()
+            retry_after = None
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                if response.status_code == 200:
+                    return pd.DataFrame(response.json(), columns=self.candle_columns)
+                if response.status_code != 429 and response.status_code < 500:
+                    print(f"Did not receive OK response from API: {response.status_code} for {params}")
+                    return None
+                retry_after = response.headers.get('Retry-After')
+            except requests.RequestException as e:
+                print(f"Request failed for {params}: {str(e)}")
+
+            if attempt < self.max_retries:
+                backoff_time = self.backoff_factor * (2 ** attempt)
+                if retry_after is not None and retry_after.isdigit():
+                    backoff_time = max(backoff_time, float(retry_after))
+                time.sleep(backoff_time)
+
+        print(f"Giving up fetching candles for {params} after {self.max_retries} retries")
+        return None
+
+    def fetch(self, symbol_pair, start_date_time, end_date_time, granularity):
+        """
+        Fetch the candles of the time range
+        :param symbol_pair: the symbol pair to fetch e.g. BTC-USD
+        :param start_date_time: start date time of the range
+        :param end_date_time: end date time of the range (inclusive)
+        :param granularity: granularity of the candles in seconds
+        :return: candles sorted by date, None if no candles could be fetched
+        """
+        windows = self.create_windows(start_date_time, end_date_time, granularity)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            window_dfs = list(executor.map(
+                lambda window: self.fetch_window(symbol_pair, window[0], window[1], granularity), windows))
+
+        self.failed_windows = [window for window, window_df in zip(windows, window_dfs) if window_df is None]
+        if self.failed_windows:
+            print(f"Failed to fetch {len(self.failed_windows)} of {len(windows)} windows")
+
+        window_dfs = [window_df for window_df in window_dfs if window_df is not None]
+        if not window_dfs:
+            return None
+
+        price_df = pd.concat(window_dfs, ignore_index=True)
+        price_df = price_df.drop_duplicates('unix').sort_values('unix', ignore_index=True)
+        price_df['date'] = pd.to_datetime(price_df['unix'], unit='s')  # convert to readable date
+        return price_df
@@ -4,24 +4,13 @@ import json
 import requests
 import pandas as pd
 
-from utils.PartitionType import PartitionType
+from get_data.CandleFetcher import CandleFetcher
+from utils.CandleStore import CandleStore
+from utils.PartitionType import PartitionType, get_seconds_for_partition_type
 
 
-def get_seconds_for_partition_type(partition_type):
-    """
-    Converts a give partition type to its corresponding amount of seconds
-    :param partition_type: partition type to transform
-    :return: seconds:int
-    """
-    if partition_type == PartitionType.FIVE_MINUTES:
-        return 60 * 5
-    if partition_type == PartitionType.FIFTEEN_MINUTES:
-        return 60 * 15
-    if partition_type == PartitionType.ONE_HOUR:
-        return 60 * 60
-
-
-def fetch_data(symbol_pair, start_date_time, end_date_time, granularity):
+def fetch_data(symbol_pair, start_date_time, end_date_time, granularity,
+               coinbase_api_base_url="https://api.pro.coinbase.com/"):
     """
     Fetch historical price date from the coinbase api.
 
@@ -29,12 +18,9 @@ def fetch_data(symbol_pair, start_date_time, end_date_time, granularity):
     :param start_date_time: start date time for which teh data is getting fetched
     :param end_date_time: end date time for which the data is getting fetched
     :param granularity: the granularity in which the data is getting fetched
+    :param coinbase_api_base_url: base url of the coinbase api
     :return: fetched price data
     """
-    # create result dataframe
-    price_df = pd.DataFrame(columns=['unix', 'low', 'high', 'open', 'close', 'volume'])
-
-    coinbase_api_base_url = "https://api.pro.coinbase.com/"
     hist_data_api_endpoint = f"products/{symbol_pair}/candles?start={start_date_time}&end={end_date_time}&" \
                              f"granularity={granularity}"
 
@@ -50,8 +36,8 @@ def fetch_data(symbol_pair, start_date_time, end_date_time, granularity):
             print("Did not return any data from Coinbase for this symbol")
             return None
         else:
-            for d in data:
-                price_df.loc[len(price_df)] = d
+            # create result dataframe
+            price_df = pd.DataFrame(data, columns=['unix', 'low', 'high', 'open', 'close', 'volume'])
             price_df['date'] = pd.to_datetime(price_df['unix'], unit='s')  # convert to readable date
             return price_df
     else:
@@ -74,7 +60,7 @@ if __name__ == "__main__":
     '''
     ################################################ configuration #####################################################
 
-    result_file_path = "../data/btc_price_data/"  # path where the file with the fetched prices ist getting stored
+    candle_store_path = "../data/btc_price_data/store/"  # path where the fetched prices are getting stored
 
     # start and end time where the data is getting fetched
     datetime_start = create_date_time("2022-01-01 00:00:00")
@@ -84,50 +70,40 @@ if __name__ == "__main__":
     symbol_pair = "BTC-USD"
     ####################################################################################################################
 
-    coinbase_api_date_time_format = "%Y-%m-%dT%H:%M:%S"  # start -> 2021-07-17T23:59:59
-
-    # fetch bitcoin prices for every partition type
-    for partition_type in PartitionType:
-
-        print(
-            f"Start fetching data for symbol pair {symbol_pair} for partition type {partition_type} from "
-            f"{datetime_start} to {datetime_end}")
+    # fetch windows of 300 candles with 4 concurrent workers
+    candle_fetcher = CandleFetcher(max_candles_per_request=300, max_workers=4, requests_per_second=8.0)
 
-        # set start and end time to fetch
-        fetch_start_date_time = datetime_start
-        fetch_end_date_time = fetch_start_date_time + timedelta(hours=1) - timedelta(seconds=1)
+    # only the candles which are not stored yet are getting fetched
+    candle_store = CandleStore(candle_store_path)
 
-        # also write header on writing first data
-        write_header = True
+    # only the finest partition type is fetched, the coarser ones are derived from its candles
+    finest_partition_type = min(PartitionType, key=get_seconds_for_partition_type)
+    finest_granularity = get_seconds_for_partition_type(finest_partition_type)
 
-        granularity = get_seconds_for_partition_type(partition_type)
-
-        file_name = f"{symbol_pair}_" + partition_type.value + ".csv"
-
-        # start fetching data
-        while True:
-
-            # fetch data
-            data_df = fetch_data(
-                symbol_pair=symbol_pair, start_date_time=fetch_start_date_time.strftime(coinbase_api_date_time_format),
-                end_date_time=fetch_end_date_time.strftime(coinbase_api_date_time_format), granularity=granularity)
+    print(
+        f"Start fetching data for symbol pair {symbol_pair} for partition type {finest_partition_type} from "
+        f"{datetime_start} to {datetime_end}")
 
-            # if data is successfully fetched write data to file in append mode
-            if data_df is not None:
+    # fetch the missing intervals and add them to the store
+    fetched_count = candle_store.top_up(candle_fetcher, symbol_pair=symbol_pair, granularity=finest_granularity,
+                                        start_date_time=datetime_start, end_date_time=datetime_end)
+    print(f"{symbol_pair} {finest_partition_type.value} - fetched {fetched_count} missing candles from "
+          f"{datetime_start} to {datetime_end}")
 
-                data_df = data_df.sort_values('date', ascending=True)
-                data_df.to_csv(result_file_path + file_name, mode='a',
-                               index=False, header=write_header)
-
-                # after writing first entry set write header to false
-                write_header = False
-
-                print(f"{file_name} - fetched data for start:{fetch_start_date_time} end:{fetch_end_date_time}")
+    # derive the coarser partition types and check them against the candles of the provider on a sample day
+    sample_date_time_end = datetime_start + timedelta(days=1) - timedelta(seconds=1)
+    for partition_type in PartitionType:
+        if partition_type == finest_partition_type:
+            continue
 
-                # set new start and end time
-                fetch_start_date_time = fetch_end_date_time + timedelta(seconds=1)
-                fetch_end_date_time = fetch_start_date_time + timedelta(hours=1) - timedelta(seconds=1)
-                if fetch_end_date_time > datetime_end:
-                    break
-            else:
-                break
+        granularity = get_seconds_for_partition_type(partition_type)
+        derived_count = candle_store.derive(symbol_pair, finest_granularity, granularity, datetime_start,
+                                            datetime_end)
+        print(f"{symbol_pair} {partition_type.value} - derived {derived_count} candles from "
+              f"{finest_partition_type.value} candles")
+
+        provider_df = candle_fetcher.fetch(symbol_pair, datetime_start, sample_date_time_end, granularity)
+        if provider_df is not None:
+            derived_df = candle_store.get_range(symbol_pair, granularity, datetime_start, sample_date_time_end)
+            print(f"{symbol_pair} {partition_type.value} - consistency check against provider candles: "
+                  f"{CandleStore.compare_candles(derived_df, provider_df)}")
@@ -0,0 +1,51 @@
+import datetime
+import logging
+
+
+class TweetStreamHandler:
+    """
+    Filters the tweets of a stream and passes them to a tweet writer till the end date time is reached. It works on the
+    tweet json objects and does not depend on tweepy, so the live stream listener and the replay of recorded tweets
+    share the same filtering and end date time logic.
+    """
+
+    def __init__(self, end_date_time, tweet_writer, clock=datetime.datetime.now):
+        """
+        :param end_date_time: date time when the stream gets terminated
+        :param tweet_writer: the writer which stores the crawled tweets e.g. a BufferedTweetWriter
+        :param clock: function which returns the current date time, replaying tweets uses the time of the tweet
+        """
+        self.end_date_time = end_date_time
+        self.tweet_writer = tweet_writer
+        self.clock = clock
+        self.log_counter = 0
+
+    def on_tweet(self, tweet_json):
+        """
+        This Function gets called everytime the stream receives a Tweet
+        :param tweet_json: the received tweet as json object
+        :return: False if the end date time is reached and the stream ends, otherwise True
+        """
+
+        # check if end date time of crawling is reached
+        if self.clock() > self.end_date_time:
+            return False  # stream ends
+        else:
+            if not self.is_retweet(tweet_json):  # filter retweets
+                if self.log_counter % 5000 == 0:  # log after 5000 tweets
+                    logging.info("Crawled {} tweets so far".format(str(self.log_counter)))
+                    self.tweet_writer.log_statistics()
+
+                # enqueue the tweet as json object, it is getting stored by the writer in the background
+                self.tweet_writer.write(tweet_json)
+                self.log_counter += 1
+            return True  # continue receive tweets
+
+    @staticmethod
+    def is_retweet(tweet_json):
+        """
+        Check if the given tweet is a retweet
+        :param tweet_json: the received tweet as json object
+        :return: True if the tweet is a retweet
+        """
+        return tweet_json.get('retweeted', False) or 'RT @' in tweet_json['text']
@@ -5,52 +5,48 @@ import logging
 import tweepy
 from pathlib import Path
 
+from get_data.BufferedTweetWriter import BufferedTweetWriter
+from get_data.TweetStreamHandler import TweetStreamHandler
 from utils.MongoDB import MongoDB
+from utils.TweetFileStore import TweetFileStore
+from utils.TweetTimestamps import create_timestamp_index
 
 
-class TwitterStreamListener(tweepy.StreamListener):
+class TwitterStreamListener(tweepy.Stream):
     """
-    A class used to initialize a twitter stream and react to its status updates.
+    A class used to initialize a twitter stream and react to its status updates. The tweets are filtered and stored
+    by a TweetStreamHandler which is also used to replay recorded tweets.
     """
 
-    def __init__(self, end_date_time, mongo_db_collection):
+    def __init__(self, consumer_key, consumer_secret, access_token, access_token_secret, end_date_time,
+                 tweet_writer):
         """
+        :param consumer_key: consumer key of the twitter api
+        :param consumer_secret: consumer secret of the twitter api
+        :param access_token: access token of the twitter api
+        :param access_token_secret: access token secret of the twitter api
         :param end_date_time: date time when the stream gets terminated
-        :param mongo_db_collection: the mongo database collection to store the crawled tweets
+        :param tweet_writer: the writer which stores the crawled tweets e.g. a BufferedTweetWriter
         """
-        self.end_date_time = end_date_time
-        self.mongo_db_collection = mongo_db_collection
-        self.log_counter = 0
-        super(TwitterStreamListener, self).__init__()
+        super(TwitterStreamListener, self).__init__(consumer_key, consumer_secret, access_token, access_token_secret)
+        self.tweet_handler = TweetStreamHandler(end_date_time, tweet_writer)
 
-    def on_status(self, tweet):
+    def on_status(self, status):
         """
         This Function gets called everytime the stream receives a Tweet
         """
+        if not self.tweet_handler.on_tweet(status._json):
+            self.disconnect()  # stream ends
 
-        # check if end date time of crawling is reached
-        if datetime.datetime.now() > self.end_date_time:
-            return False  # stream ends
-        else:
-            if (not tweet.retweeted) and ('RT @' not in tweet.text):  # filter retweets
-                if self.log_counter % 5000 == 0:  # log after 5000 tweets
-                    logging.info("Crawled {} tweets so far".format(str(self.log_counter)))
-
-                # store the tweet as json object in the mongo db collection
-                self.mongo_db_collection.insert_one(document=tweet._json)
-                print(tweet._json)
-                self.log_counter += 1
-            return True  # continue receive tweets
-
-    def on_error(self, status_code):
+    def on_request_error(self, status_code):
         """
         This funtion gets called if an error happens during crawling
         :param status_code: the error code which is getting returned form the API
-        :return: Fals to stop streaming
         """
+        super(TwitterStreamListener, self).on_request_error(status_code)
         if status_code == 420:  # 420 -> api rate limit reached
             time.sleep(60)
-            return False
+            self.disconnect()
 
 
 def initialized_logging():
@@ -92,28 +88,38 @@ if __name__ == '__main__':
     # define mongo database collection name to store crawled tweets
     mongo_db_collection_name = "someName"
 
+    # path to store the tweets in hourly rotated compressed files instead of the mongo database collection
+    tweet_file_store_path = None  # e.g. "../data/raw/2022/"
+
     while datetime.datetime.now() < stop_crawl:  # crawl till end date time is reached
         if datetime.datetime.now() > start_crawl:  # start crawling if when start date time es reached
+            tweet_writer = None
+            tweet_file_store = None
             try:
                 logging.info("Start crawling tweets now")
 
-                # connect to db and create collection
-                mongo_db = MongoDB(db_name="TCNA")
-                collection = mongo_db.get_create_collection(mongo_db_collection_name)
+                if tweet_file_store_path is None:
+                    # connect to db and create collection
+                    mongo_db = MongoDB(db_name="TCNA")
+                    collection = mongo_db.get_create_collection(mongo_db_collection_name)
+                    create_timestamp_index(collection)
 
-                # initialize stream
-                myStreamListener = TwitterStreamListener(stop_crawl, collection)
+                    # the writer stores the tweets in batches in the background to keep the stream thread responsive
+                    tweet_writer = BufferedTweetWriter(collection)
+                else:
+                    # store the tweets in hourly files partitioned by their creation time, the compression and the
+                    # manifest updates are also done by the background thread of the writer
+                    tweet_file_store = TweetFileStore(tweet_file_store_path)
+                    tweet_writer = BufferedTweetWriter(tweet_file_store)
 
                 '''
                 Connect to twitter streaming API. To obtain the needed API keys please see:
                 https://developer.twitter.com/en/docs/twitter-api/getting-started/getting-access-to-the-twitter-api
                 '''
-                auth = tweepy.OAuthHandler(TWITTER_TCNA_CONSUMER_KEY, TWITTER_TCNA_CONSUMER_SECRET)
-                auth.set_access_token(TWITTER_TCNA_ACCESS_TOKEN, TWITTER_TCNA_ACCESS_TOKEN_SECRET)
-                api = tweepy.API(auth)
-
                 # create Stream listener and start crawling
-                myStream = tweepy.Stream(auth=api.auth, listener=myStreamListener)
+                myStream = TwitterStreamListener(TWITTER_TCNA_CONSUMER_KEY, TWITTER_TCNA_CONSUMER_SECRET,
+                                                 TWITTER_TCNA_ACCESS_TOKEN, TWITTER_TCNA_ACCESS_TOKEN_SECRET,
+                                                 stop_crawl, tweet_writer)
 
                 # set filter for tweets containing hashtags #btc and/or #bitcoin
                 myStream.filter(track=['#btc', '#bitcoin'])
@@ -121,6 +127,12 @@ if __name__ == '__main__':
             except Exception as e:
                 logging.error("Something went wrong initializing the Crawler and stuff error: {}".format(str(e)))
                 time.sleep(60)
+            finally:
+                # flush the buffered tweets before reconnecting or finishing
+                if tweet_writer is not None:
+                    tweet_writer.close()
+                if tweet_file_store is not None:
+                    tweet_file_store.close()
         else:
             logging.info("Waiting for the definitive start of crawling, sleep 30s")
             time.sleep(30)
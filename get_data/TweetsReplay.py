@@ -0,0 +1,182 @@
+from datetime import datetime, timedelta
+import gzip
+import json
+import time
+
+import numpy as np
+
+from get_data.BufferedTweetWriter import BufferedTweetWriter
+from get_data.TweetStreamHandler import TweetStreamHandler
+from utils.FakeMongoCollection import FakeMongoCollection
+
+
+class TimedTweetWriter:
+    """
+    Wraps a tweet writer and records the latency of every write call
+    """
+
+    def __init__(self, tweet_writer):
+        self.tweet_writer = tweet_writer
+        self.latencies = []
+
+    def write(self, document):
+        start_time = time.perf_counter()
+        self.tweet_writer.write(document)
+        self.latencies.append(time.perf_counter() - start_time)
+
+    def log_statistics(self):
+        self.tweet_writer.log_statistics()
+
+
+class TweetsReplayDriver:
+    """
+    Replays recorded tweets from a JSONL file (optionally gzipped) into a TweetStreamHandler. The handler is driven
+    exactly like by the live stream listener, so the retweet filter and the end date time logic are the same as in
+    production.
+    """
+
+    twitter_date_time_format = '%a %b %d %H:%M:%S +0000 %Y'
+
+    def __init__(self, file_path, end_date_time, tweet_writer, speed: float = 0.0, utc_hour_delta: int = 0):
+        """
+        :param file_path: path to the recorded tweets, one tweet json object per line, '.gz' files are decompressed
+        :param end_date_time: date time when the replayed stream gets terminated
+        :param tweet_writer: the writer which stores the replayed tweets
+        :param speed: 0 replays as fast as possible, 1 in real time and N in N times real time
+        :param utc_hour_delta: hours which are added to the utc tweet time to get the local time of the handler clock
+        """
+        self.file_path = file_path
+        self.speed = speed
+        self.utc_hour_delta = utc_hour_delta
+        self.replay_date_time = None
+
+        self.timed_tweet_writer = TimedTweetWriter(tweet_writer)
+        self.tweet_handler = TweetStreamHandler(end_date_time, self.timed_tweet_writer,
+                                                clock=self.get_replay_date_time)
+
+        # measure the cost of the retweet filter of the handler
+        self.filter_durations = []
+        self.filtered_count = 0
+        self.tweet_handler.is_retweet = self.timed_is_retweet
+
+    def get_replay_date_time(self):
+        """
+        Clock of the replayed stream
+        :return: local date time of the tweet which is currently replayed
+        """
+        return self.replay_date_time
+
+    def timed_is_retweet(self, tweet_json):
+        start_time = time.perf_counter()
+        result = TweetStreamHandler.is_retweet(tweet_json)
+        self.filter_durations.append(time.perf_counter() - start_time)
+        if result:
+            self.filtered_count += 1
+        return result
+
+    def read_recorded_tweets(self):
+        """
+        Read the recorded tweets line by line
+        :return: generator of tweet json objects
+        """
+        open_file = gzip.open if self.file_path.endswith('.gz') else open
+        with open_file(self.file_path, 'rt', encoding='utf-8') as tweets_file:
+            for line in tweets_file:
+                line = line.strip()
+                if line:
+                    tweet_json = json.loads(line)
+                    tweet_json.pop('_id', None)  # drop the id of tweets exported from mongo db
+                    yield tweet_json
+
+    def get_tweet_date_time(self, tweet_json):
+        """
+        Get the utc date time of a tweet
+        :param tweet_json: tweet json object
+        :return: datetime
+        """
+        if 'timestamp_ms' in tweet_json:
+            return datetime.utcfromtimestamp(int(tweet_json['timestamp_ms']) / 1000)
+        return datetime.strptime(tweet_json['created_at'], self.twitter_date_time_format)
+
+    def replay(self):
+        """
+        Replay the recorded tweets into the handler till the file or the end date time is reached
+        :return: replay statistics as dict
+        """
+        replayed_count = 0
+        first_tweet_date_time = None
+        start_time = time.perf_counter()
+
+        for tweet_json in self.read_recorded_tweets():
+            tweet_date_time = self.get_tweet_date_time(tweet_json)
+            self.replay_date_time = tweet_date_time + timedelta(hours=self.utc_hour_delta)
+
+            # wait till the tweet is due if the tweets are not replayed as fast as possible
+            if self.speed > 0:
+                if first_tweet_date_time is None:
+                    first_tweet_date_time = tweet_date_time
+                due_time = start_time + (tweet_date_time - first_tweet_date_time).total_seconds() / self.speed
+                wait_time = due_time - time.perf_counter()
+                if wait_time > 0:
+                    time.sleep(wait_time)
+
+            replayed_count += 1
+            if not self.tweet_handler.on_tweet(tweet_json):
+                break  # end date time is reached, the stream ends
+
+        return self.create_statistics(replayed_count, time.perf_counter() - start_time)
+
+    def create_statistics(self, replayed_count, duration):
+        """
+        Create the statistics of the replay
+        :param replayed_count: number of tweets passed to the handler
+        :param duration: seconds the replay took
+        :return: statistics as dict
+        """
+        sink_latencies = np.asarray(self.timed_tweet_writer.latencies) * 1000000  # micro seconds
+        filter_durations = np.asarray(self.filter_durations) * 1000000
+
+        statistics = {'replayed': replayed_count,
+                      'stored': len(self.timed_tweet_writer.latencies),
+                      'filtered_retweets': self.filtered_count,
+                      'duration': round(duration, 5),
+                      'tweets_per_second': round(replayed_count / duration, 2) if duration > 0 else 0.0,
+                      'filter_mean_us': round(float(filter_durations.mean()), 3) if filter_durations.size else 0.0,
+                      'filter_total_s': round(float(filter_durations.sum()) / 1000000, 5)}
+        for percentile in [50, 90, 99, 100]:
+            statistics[f"sink_p{percentile}_us"] = round(float(np.percentile(sink_latencies, percentile)), 3) \
+                if sink_latencies.size else 0.0
+        return statistics
+
+
+def create_date_time(date_time_string):
+    """
+    Converts String to python date time
+    :param date_time_string: date time as string has to be in Format '%Y-%m-%d %H:%M:%S'
+    :return: datetime
+    """
+    return datetime.strptime(date_time_string, '%Y-%m-%d %H:%M:%S')
+
+
+if __name__ == '__main__':
+    """
+    Replay recorded tweets into the stream handler to benchmark the ingestion throughput without Twitter.
+    """
+    ################################################ configuration #####################################################
+
+    recorded_tweets_path = '../data/raw/2022/tweets.jsonl.gz'
+    stop_replay = create_date_time("2022-01-16 00:00:01")
+    speed = 0.0  # 0 -> as fast as possible, 1 -> real time, N -> N times real time
+    utc_hour_delta = 1  # Summer +2 / Winter + 1
+
+    ####################################################################################################################
+
+    # replay into the buffered writer on a local fake collection to measure the handler and not the database
+    tweet_writer = BufferedTweetWriter(FakeMongoCollection())
+    driver = TweetsReplayDriver(recorded_tweets_path, stop_replay, tweet_writer, speed=speed,
+                                utc_hour_delta=utc_hour_delta)
+    replay_statistics = driver.replay()
+    tweet_writer.close()
+
+    print(f"Replay statistics: {replay_statistics}")
+    print(f"Writer statistics: {tweet_writer.get_statistics()}")
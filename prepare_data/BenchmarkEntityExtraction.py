@@ -0,0 +1,86 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from prepare_data.EntityExtraction import extract_domains, extract_hashtags, extract_mentions
+from utils.StopWatch import StopWatch
+
+
+def get_base_domain_from_url(url):
+    """
+    Former per url domain normalization of the kaggle preparation
+    """
+    if url:
+        try:
+            url = url.replace("https://", "")
+            url = url.replace("http://", "")
+            plain_url = url.split("/")[0]
+            if plain_url.startswith("www."):
+                plain_url = plain_url.replace("www.", "")
+            return plain_url
+        except:
+            return
+    else:
+        return url
+
+
+def extract_entities_per_row(df):
+    """
+    Former entity extraction of the kaggle preparation with list comprehensions and a regex per row
+    :return: hashtags, mentions and domains list columns
+    """
+    hashtags = [[s for s in l if s] for l in df['hashtags'].str.split('#')]
+    mentions = [[s for s in l if s] for l in df['mentions'].str.split('@')]
+    pattern = r'(https?:\/\/(?:www\.)?[-a-zA-Z0-9@:%._+~#=]{1,256}\.[a-zA-Z0-9()]{1,' \
+              r'6}[-a-zA-Z0-9()@:%_+.~#?&/=]*) '
+    domains = df.text.apply(lambda x: re.findall(pattern, str(x)))
+    domains = [[get_base_domain_from_url(url) for url in urls if url] for urls in domains]
+    return hashtags, mentions, domains
+
+
+def extract_entities_vectorized(df):
+    """
+    Entity extraction of the shared entity extraction module
+    :return: hashtags, mentions and domains list columns
+    """
+    return extract_hashtags(df['hashtags']), extract_mentions(df['mentions']), extract_domains(df['text'])
+
+
+def create_raw_tweets(rows_count, seed=0):
+    """
+    Create raw kaggle like tweets, a few domains are shared by most tweets
+    """
+    rng = np.random.default_rng(seed)
+    domains = ['https://www.youtube.com/watch?v=', 'https://coindesk.com/news/', 'http://bit.ly/', 'https://t.co/']
+    hashtags = ['#Bitcoin', '#crypto', '#BTC', '#blockchain', '#ETH']
+    texts = [f"Tweet {idx} about {domains[idx % 4]}{idx % 997} and more " +
+             (f"{domains[(idx + 1) % 4]}{idx % 13} end" if idx % 3 == 0 else "end") for idx in range(rows_count)]
+    return pd.DataFrame({
+        'hashtags': [''.join(rng.choice(hashtags, size=idx % 4)) for idx in range(rows_count)],
+        'mentions': ['@'.join([''] + [f"user{(idx * 7 + k) % 500}" for k in range(idx % 3)]) for idx in
+                     range(rows_count)],
+        'text': texts})
+
+
+if __name__ == '__main__':
+    """
+    Benchmark the vectorized entity extraction against the former per row extraction of the kaggle preparation
+    """
+    ################################################ configuration #####################################################
+
+    rows_count = 200000
+
+    ####################################################################################################################
+
+    raw_df = create_raw_tweets(rows_count)
+    stop_watch = StopWatch()
+
+    results = {}
+    for name, extract_entities in [('per row', extract_entities_per_row), ('vectorized', extract_entities_vectorized)]:
+        stop_watch.start()
+        results[name] = extract_entities(raw_df)
+        duration = stop_watch.get_time()
+        print(f"{name}: {rows_count} rows took {duration}[s] ({round(rows_count / duration, 2)} rows/s)")
+
+    print(f"equal entities: {results['per row'] == results['vectorized']}")
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+import json
+
+import mongomock
+
+from prepare_data.TweetParser import TweetParser
+from utils.StopWatch import StopWatch
+from utils.TweetTimestamps import TWITTER_DATE_TIME_FORMAT, migrate_collection
+
+
+def create_raw_tweet(tweet_id, created_at, retweeted):
+    """
+    Create a raw tweet with the fields of a crawled tweet which are not needed to prepare it
+    """
+    return {'id': tweet_id, 'created_at': datetime.strftime(created_at, TWITTER_DATE_TIME_FORMAT),
+            'retweeted': retweeted, 'text': f"#btc tweet number {tweet_id}", 'lang': 'en', 'source': 'web' * 20,
+            'user': {'screen_name': f"user_{tweet_id % 1000}", 'description': 'crypto enthusiast ' * 10,
+                     'followers_count': tweet_id % 5000, 'location': 'somewhere'},
+            'entities': {'hashtags': [{'text': 'btc', 'indices': [0, 4]}], 'user_mentions': [], 'urls': [],
+                         'symbols': []}}
+
+
+def consume_raw_tweets(tweets):
+    """
+    Iterate over the raw tweets like the parser does
+    :return: number of transferred tweets and their json size in bytes
+    """
+    transferred_count = 0
+    transferred_bytes = 0
+    for tweet in tweets:
+        transferred_count += 1
+        transferred_bytes += len(json.dumps(tweet, default=str))
+    return transferred_count, transferred_bytes
+
+
+if __name__ == '__main__':
+    """
+    Benchmark the number of transferred tweets and the wall time of the full collection scan against the filtered
+    and projected query of the parser. mongomock is used as local stand-in, so the wall time does not include the
+    network transfer which is saved on a real server.
+    """
+    ################################################ configuration #####################################################
+
+    tweets_count = 5000
+    crawl_start = datetime(2022, 1, 1)
+    crawl_days = 15
+    parse_start = datetime(2022, 1, 5)
+    parse_end = datetime(2022, 1, 6, 23, 59, 59)
+
+    ####################################################################################################################
+
+    collection = mongomock.MongoClient().TCNA.tweets
+    seconds_per_tweet = crawl_days * 24 * 60 * 60 / tweets_count
+    collection.insert_many([create_raw_tweet(idx, crawl_start + timedelta(seconds=idx * seconds_per_tweet),
+                                             idx % 4 == 0) for idx in range(tweets_count)])
+    migrate_collection(collection)
+
+    stop_watch = StopWatch()
+    for query_by_timestamp in [False, True]:
+        parser = TweetParser(mongo_collection=collection, date_time_start=parse_start, date_time_end=parse_end,
+                             resolve_tco_urls=False, allow_retweets=False, query_by_timestamp=query_by_timestamp)
+        stop_watch.start()
+        transferred_count, transferred_bytes = consume_raw_tweets(parser.get_raw_tweets())
+        print(f"{'filtered query' if query_by_timestamp else 'full scan'}: transferred {transferred_count} tweets "
+              f"({round(transferred_bytes / 1024 / 1024, 2)} MB) took {stop_watch.get_time()}[s]")
@@ -0,0 +1,85 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import tempfile
+import threading
+import time
+
+from prepare_data.TweetParser import TweetParser
+from prepare_data.UrlResolver import UrlResolver
+from utils.StopWatch import StopWatch
+
+
+class RedirectServer:
+    """
+    Local http server which mimics t.co: every /t/<id> url redirects to /target/<id>, every /broken/<id> url fails
+    """
+
+    def __init__(self, latency: float = 0.02):
+        """
+        :param latency: seconds every redirect is delayed like a round trip to t.co
+        """
+        class RedirectRequestHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path.startswith('/t/'):
+                    time.sleep(latency)
+                    self.send_response(301)
+                    self.send_header('Location', f"http://localhost:{self.server.server_address[1]}/target/"
+                                                 f"{self.path[3:]}")
+                    self.end_headers()
+                elif self.path.startswith('/target/'):
+                    self.send_response(200)
+                    self.send_header('Content-Length', '2')
+                    self.end_headers()
+                    self.wfile.write(b'ok')
+                else:
+                    self.server.shutdown_request(self.request)  # close the connection without a response
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), RedirectRequestHandler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.server_thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == '__main__':
+    """
+    Benchmark the concurrent cached url resolution against resolving every url of every tweet sequentially
+    """
+    ################################################ configuration #####################################################
+
+    urls_count = 400  # urls of all tweets
+    unique_urls_count = 100  # a few links are shared by many tweets
+    broken_urls_count = 5
+    latency = 0.02
+
+    ####################################################################################################################
+
+    stop_watch = StopWatch()
+    cache_path = os.path.join(tempfile.mkdtemp(), 'tco_domain_cache.sqlite')
+
+    with RedirectServer(latency=latency) as redirect_server:
+        urls = [f"{redirect_server.base_url}t/{idx % unique_urls_count}" for idx in range(urls_count)]
+        urls += [f"{redirect_server.base_url}broken/{idx}" for idx in range(broken_urls_count)]
+
+        stop_watch.start()
+        sequential_domains = [TweetParser.get_domain_from_tco_url(url) for url in urls]
+        print(f"sequential requests: {len(urls)} urls took {stop_watch.get_time()}[s]")
+
+        for run in ['cold cache', 'warm cache']:
+            url_resolver = UrlResolver(cache_path=cache_path, max_workers=32)
+            stop_watch.start()
+            domains = url_resolver.resolve(urls)
+            print(f"url resolver {run}: {len(urls)} urls took {stop_watch.get_time()}[s] - "
+                  f"{url_resolver.get_statistics()}")
+            print(f"equal domains: {sequential_domains == [domains[url] for url in urls]}")
+            url_resolver.close()
@@ -0,0 +1,90 @@
+from ast import literal_eval
+import os
+import time
+
+import pandas as pd
+
+from utils.ParquetTweetStore import ParquetTweetStore
+from utils.TweetLoader import TweetLoader
+from utils.TweetReaders import get_year_range, read_monthly_data, read_tweets_store
+
+# the list columns of the prepared csv files are stored as python literals
+tweets_csv_converters = {
+    'text': str,
+    'user_screen_name': str,
+    'hashtags': literal_eval,
+    'mentions': literal_eval,
+    'domains': literal_eval,
+}
+
+
+def convert_csv_file(file_path, tweet_store, chunk_size):
+    """
+    Convert a prepared tweets csv file in chunks to the parquet tweet store
+    :param file_path: path of the prepared csv file
+    :param tweet_store: the ParquetTweetStore to write to
+    :param chunk_size: number of rows per chunk
+    :return: number of converted tweets
+    """
+    file_stem = os.path.splitext(os.path.basename(file_path))[0]
+    converted_count = 0
+    for chunk_idx, chunk_df in enumerate(pd.read_csv(file_path, converters=tweets_csv_converters, header=0,
+                                                     chunksize=chunk_size)):
+        chunk_df['created_at'] = pd.to_datetime(chunk_df['created_at'])
+        chunk_df.set_index('created_at', inplace=True)
+        tweet_store.write(chunk_df, f"{file_stem}_{chunk_idx:05d}")
+        converted_count += chunk_df.shape[0]
+    return converted_count
+
+
+def get_directory_size(path, file_ending):
+    """
+    Sum the size of all files with the given ending below a directory
+    :return: size in bytes
+    """
+    return sum(os.path.getsize(os.path.join(root, file)) for root, dirs, files in os.walk(path)
+               for file in files if file.endswith(file_ending))
+
+
+if __name__ == '__main__':
+    """
+    One-shot conversion of the prepared tweets csv files to the parquet tweet store. Afterwards the load time and
+    the size of both formats are compared.
+    """
+    ################################################ configuration #####################################################
+
+    tweets_data_path = '../data/tweets/'
+    tweets_store_path = '../data/tweets_parquet/'
+    years = ['2018', '2022']
+    chunk_size = 100000
+
+    ####################################################################################################################
+
+    tweet_store = ParquetTweetStore(tweets_store_path)
+    for year in years:
+        for root, dirs, files in os.walk(tweets_data_path + year + '/'):
+            for file in sorted(files):
+                if not file.endswith(".csv"):
+                    continue
+                start_time = time.time()
+                converted_count = convert_csv_file(os.path.join(root, file), tweet_store, chunk_size)
+                print(f"Converted {converted_count} tweets of file: {file} took: "
+                      f"{round(float(time.time() - start_time), 2)}[s]")
+
+    # compare the load time and size of both formats
+    for year in years:
+        start_time = time.time()
+        csv_df = read_monthly_data(tweets_data_path, year)
+        csv_load_time = time.time() - start_time
+
+        start_time = time.time()
+        store_df = read_tweets_store(TweetLoader(tweet_store), year)
+        store_load_time = time.time() - start_time
+
+        csv_size = get_directory_size(tweets_data_path + year + '/', '.csv')
+        store_size = sum(os.path.getsize(file_path) for file_path in
+                         tweet_store.get_file_paths(*get_year_range(year)))
+        print(f"Year {year}: csv {csv_df.shape[0]} tweets in {round(csv_load_time, 2)}[s] "
+              f"{round(csv_size / 1024 ** 2, 2)}[MB] - parquet {store_df.shape[0]} tweets in "
+              f"{round(store_load_time, 2)}[s] {round(store_size / 1024 ** 2, 2)}[MB] - speedup "
+              f"{round(csv_load_time / store_load_time, 2) if store_load_time > 0 else 0.0}x")
@@ -0,0 +1,68 @@
+from functools import lru_cache
+from itertools import chain
+import re
+
+# compiled once, the patterns are applied to whole columns
+URL_PATTERN = re.compile(r'(https?:\/\/(?:www\.)?[-a-zA-Z0-9@:%._+~#=]{1,256}\.[a-zA-Z0-9()]{1,'
+                         r'6}[-a-zA-Z0-9()@:%_+.~#?&/=]*) ')
+HASHTAG_PATTERN = re.compile(r'[^#]+')
+MENTION_PATTERN = re.compile(r'[^@]+')
+
+
+@lru_cache(maxsize=100000)
+def get_base_domain(url):
+    """
+    Extracts the base domain of a url. Memoized, as a small set of domains is shared by most tweets.
+    :param url: url e.g. https://www.youtube.com/watch
+    :return: base domain of the given url e.g. youtube.com
+    """
+    if not url:
+        return url
+    url = url.replace("https://", "")
+    url = url.replace("http://", "")
+    plain_url = url.split("/")[0]
+    if plain_url.startswith("www."):
+        plain_url = plain_url.replace("www.", "")
+    return plain_url
+
+
+def extract_hashtags(hashtags_column):
+    """
+    Split a column of concatenated hashtags e.g. '#Cryptocurrency#crypto' to lists without the # symbol
+    :param hashtags_column: series of hashtag strings
+    :return: list column e.g. ['Cryptocurrency', 'crypto']
+    """
+    return extract_split_entities(hashtags_column, HASHTAG_PATTERN)
+
+
+def extract_mentions(mentions_column):
+    """
+    Split a column of concatenated mentions e.g. '@alice@bob' to lists of user screen names
+    :param mentions_column: series of mention strings
+    :return: list column e.g. ['alice', 'bob']
+    """
+    return extract_split_entities(mentions_column, MENTION_PATTERN)
+
+
+def extract_split_entities(column, pattern):
+    """
+    Find all non empty parts between the separators of a string column
+    :param column: series of strings
+    :param pattern: compiled pattern matching the parts
+    :return: list column
+    """
+    entity_lists = column.fillna('').astype(str).str.findall(pattern)
+    return entity_lists.tolist()
+
+
+def extract_domains(text_column):
+    """
+    Extract the urls of a text column and normalize them to their base domain. Every distinct url is normalized once.
+    :param text_column: series of tweet texts
+    :return: list column of base domains
+    """
+    url_lists = text_column.astype(str).str.findall(URL_PATTERN).tolist()
+
+    # normalize the distinct urls only
+    base_domains = {url: get_base_domain(url) for url in set(chain.from_iterable(url_lists))}
+    return [[base_domains[url] for url in urls] for urls in url_lists]
@@ -0,0 +1,105 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time, timedelta
+import os
+
+from prepare_data.TweetParser import TweetParser
+from prepare_data.UrlResolver import UrlResolver
+from utils.MongoDB import MongoDB
+from utils.TweetFileStore import TweetFileStore
+
+
+def prepare_day(task):
+    """
+    Prepare the crawled tweets of one day in a worker process. Every worker opens its own connections.
+    :param task: dict with the source, the day and the options of the ParallelTweetParser
+    :return: day and list of the written chunk files
+    """
+    day = task['day']
+    mongo_collection = None
+    tweet_file_store = None
+    if task['tweet_file_store_path'] is not None:
+        tweet_file_store = TweetFileStore(task['tweet_file_store_path'])
+    else:
+        mongo_db = MongoDB(host=task['host'], port=task['port'], db_name=task['db_name'])
+        mongo_collection = mongo_db.get_create_collection(task['collection_name'])
+
+    url_resolver = UrlResolver(cache_path=task['url_cache_path']) if task['resolve_tco_urls'] else None
+    parser = TweetParser(mongo_collection=mongo_collection, date_time_start=datetime.combine(day, time.min),
+                         date_time_end=datetime.combine(day, time.max), resolve_tco_urls=task['resolve_tco_urls'],
+                         allow_retweets=task['allow_retweets'], tweet_file_store=tweet_file_store,
+                         url_resolver=url_resolver)
+    file_paths = parser.write_prepared_chunks(task['dest_path'], f"{day:%Y-%m-%d}", chunk_size=task['chunk_size'])
+
+    if url_resolver is not None:
+        url_resolver.close()
+    if mongo_collection is not None:
+        mongo_db.client.close()
+    return day, file_paths, parser.processed_tweets_count
+
+
+class ParallelTweetParser:
+    """
+    Prepares the crawled tweets of a time range in a pool of worker processes. The time range is split into days,
+    every worker prepares the tweets of a day in chunks and writes each chunk directly to a parquet tweet store.
+    """
+
+    def __init__(self, date_time_start: datetime, date_time_end: datetime, dest_path: str,
+                 collection_name: str = None, db_name: str = 'TCNA', host: str = 'localhost', port: int = 27017,
+                 tweet_file_store_path: str = None, resolve_tco_urls: bool = True, allow_retweets: bool = False,
+                 url_cache_path: str = ':memory:', processes: int = None, chunk_size: int = 50000):
+        """
+        :param date_time_start: start of the time range of the tweets to prepare (utc)
+        :param date_time_end: end of the time range of the tweets to prepare (utc)
+        :param dest_path: root directory of the ParquetTweetStore where the chunk files are getting stored
+        :param collection_name: name of the mongo database collection containing the crawled tweets
+        :param db_name: name of the mongo database
+        :param host: host of the mongo database
+        :param port: port of the mongo database
+        :param tweet_file_store_path: path of a TweetFileStore which is read instead of the mongo database collection
+        :param resolve_tco_urls: resolve the t.co urls of the tweets to their domains
+        :param allow_retweets: also prepare retweets
+        :param url_cache_path: path of the sqlite cache of the resolved urls which is shared by the workers
+        :param processes: number of worker processes, defaults to the number of cores
+        :param chunk_size: number of prepared tweets per chunk file
+        """
+        self.date_time_start = date_time_start
+        self.date_time_end = date_time_end
+        self.dest_path = dest_path
+        self.processes = processes or os.cpu_count()
+        self.task_options = {'collection_name': collection_name,
+                             'db_name': db_name,
+                             'host': host,
+                             'port': port,
+                             'tweet_file_store_path': tweet_file_store_path,
+                             'resolve_tco_urls': resolve_tco_urls,
+                             'allow_retweets': allow_retweets,
+                             'url_cache_path': url_cache_path,
+                             'dest_path': dest_path,
+                             'chunk_size': chunk_size}
+
+    def create_days(self):
+        """
+        Split the time range into days
+        :return: list of dates
+        """
+        day = self.date_time_start.date()
+        days = []
+        while day <= self.date_time_end.date():
+            days.append(day)
+            day = day + timedelta(days=1)
+        return days
+
+    def prepare_crawled_tweets(self):
+        """
+        Prepare the tweets of all days in the worker pool
+        :return: list of the written chunk files ordered by time
+        """
+        os.makedirs(self.dest_path, exist_ok=True)
+        tasks = [dict(self.task_options, day=day) for day in self.create_days()]
+
+        file_paths = []
+        with ProcessPoolExecutor(max_workers=self.processes) as executor:
+            for day, day_file_paths, prepared_count in executor.map(prepare_day, tasks):
+                print(f"Prepared {prepared_count} tweets of {day} in {len(day_file_paths)} chunk files")
+                file_paths.extend(day_file_paths)
+        return file_paths
@@ -1,8 +1,9 @@
 from datetime import datetime, timedelta
 
 
-from prepare_data.TweetParser import TweetParser
+from prepare_data.ParallelTweetParser import ParallelTweetParser
 from utils.MongoDB import MongoDB
+from utils.TweetTimestamps import migrate_collection
 
 
 def create_date_time(date_time_string):
@@ -17,15 +18,23 @@ def create_date_time(date_time_string):
 if __name__ == '__main__':
     ################################################ configuration #####################################################
 
-    # initialize MongoDB connection and fetch collection
-    db = MongoDB(db_name='TCNA')
-    tweet_collection = db.get_create_collection("tweets_2022")
-    dest_path = '../data/tweets/2022/'
-    file_name = '2022_01-1.csv'
+    # path of the tweet file store written by the crawler, if None the tweets are read from the MongoDB collection
+    tweet_file_store_path = None
+    mongo_db_name = 'TCNA'
+    mongo_collection_name = "tweets_2022"
+
+    # the prepared tweets are written in chunk files to this parquet tweet store
+    dest_path = '../data/tweets_parquet/'
     # define start and end date and time to ensure only tweets in this range are getting processed
     date_time_start = create_date_time("2022-01-01 00:00:00")
     date_time_end = create_date_time("2022-01-15 23:59:59")
 
+    # persistent cache of the resolved tco urls, so already seen urls are not resolved again
+    url_cache_path = '../data/tweets/tco_domain_cache.sqlite'
+
+    # number of worker processes, None to use all cores
+    processes = None
+
     # the utc time delta is used as the system time is created including utc and the crawled tweets have utc=0
     utc_hour_delta = 1  # Summer +2 / Winter + 1
 
@@ -33,10 +42,18 @@ if __name__ == '__main__':
     utc_zero_date_time_start = date_time_start - timedelta(hours=utc_hour_delta)
     utc_zero_date_time_end = date_time_end - timedelta(hours=utc_hour_delta)
 
-    # initialize TweetParser
-    parser = TweetParser(mongo_collection=tweet_collection, date_time_start=utc_zero_date_time_start,
-                         date_time_end=utc_zero_date_time_end, resolve_tco_urls=True, allow_retweets=False)
+    if tweet_file_store_path is None:
+        # add the parsed and indexed created_at date time to tweets stored before it was added by the crawler
+        db = MongoDB(host='localhost', port=27017, db_name=mongo_db_name)
+        migrate_collection(db.get_create_collection(mongo_collection_name))
+        db.client.close()
+
+    # initialize the parallel TweetParser which prepares every day in a worker process
+    parser = ParallelTweetParser(date_time_start=utc_zero_date_time_start, date_time_end=utc_zero_date_time_end,
+                                 dest_path=dest_path, collection_name=mongo_collection_name, db_name=mongo_db_name,
+                                 tweet_file_store_path=tweet_file_store_path, resolve_tco_urls=True,
+                                 allow_retweets=False, url_cache_path=url_cache_path, processes=processes)
 
     # parse and save tweets
-    data_df = parser.get_parsed_tweets(save_to_csv=True)
-    data_df.to_csv(dest_path + file_name)
+    chunk_file_paths = parser.prepare_crawled_tweets()
+    print(f"Prepared tweets written to {len(chunk_file_paths)} chunk files in {dest_path}")
@@ -1,102 +1,207 @@
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import heapq
 import os
-import re
+import shutil
 
 import pandas as pd
 
+from prepare_data.EntityExtraction import extract_domains, extract_hashtags, extract_mentions
+from utils.ParquetTweetStore import ParquetTweetStore
 
-def get_base_domain_from_url(url):
+# define converters for reading data
+data_converters_map = {
+    'hashtags': str,
+    'mentions': str,
+}
+
+# columns of the prepared tweets, the index created_at is written as first column
+prepared_columns = ['id', 'user_screen_name', 'text', 'hashtags', 'mentions', 'domains']
+
+
+def prepare_chunk(df):
     """
-    Extracts the base domain of a plain url
-    :param url: url
-    :return: base domain of the given url
+    Prepare a chunk of raw kaggle tweets
+    :param df: raw tweets
+    :return: prepared tweets with created_at as index
     """
-    if url:
-        try:
-            url = url.replace("https://", "")
-            url = url.replace("http://", "")
-            plain_url = url.split("/")[0]
-            if plain_url.startswith("www."):
-                plain_url = plain_url.replace("www.", "")
-            return plain_url
-        except:
-            return
-    else:
-        return url
+    # rename the username column
+    df = df.rename(columns={'username': 'user_screen_name'})
 
+    # parse date time and set as index
+    df['created_at'] = pd.to_datetime(df['date'])
+    df.set_index('created_at', inplace=True)
 
-if __name__ == '__main__':
+    # parse hashtags to list without #simbyol e.g. ['Cryptocurrency', 'crypto', 'bitcoin']
+    df['hashtags'] = extract_hashtags(df['hashtags'])
+
+    # cast mentions to list with user screen names (we don't use ID anymore as usernames are unique)
+    df['mentions'] = extract_mentions(df['mentions'])
+
+    # extract links from text and only keep domain
+    df['domains'] = extract_domains(df['text'])
+
+    # drop rows where id is nan
+    df.dropna(subset=['id'])
+
+    # drop unnamed rows
+    df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
+
+    # select only necessary rows to keep file size small
+    return df[prepared_columns]
+
+
+def prepare_daily_file(task):
     """
-    Start preparing the raw data consisting of the tweets from kaggle.
-    https://www.kaggle.com/jaimebadiola/177-million-bitcoin-tweets
+    Prepare a daily file in chunks and write it sorted by created_at. If the day does not fit into one chunk, every
+    chunk is written as sorted run and the runs are merged.
+    :param task: tuple of the source file path, the destination file path and the chunk size
+    :return: destination file path, None if the file has no tweets, and number of prepared tweets
     """
-    ################################################ configuration #####################################################
+    source_file_path, dest_file_path, chunk_size = task
+    print(f"Start preparing daily file: {source_file_path}")
+
+    seen_ids = set()
+    run_file_paths = []
+    prepared_count = 0
+
+    # read csv file in chunks with the c engine
+    for chunk_idx, df in enumerate(pd.read_csv(source_file_path, sep=";", on_bad_lines='skip', header=0,
+                                               converters=data_converters_map, engine='c', chunksize=chunk_size)):
+        df = prepare_chunk(df)
+
+        # drop rows with duplicate id, also over the chunks of the day
+        df = df.drop_duplicates('id')
+        df = df[~df['id'].isin(seen_ids)]
+        seen_ids.update(df['id'])
+        prepared_count += df.shape[0]
+
+        run_file_path = f"{dest_file_path}.run{chunk_idx:05d}"
+        df.sort_index(kind='mergesort').to_csv(run_file_path)
+        run_file_paths.append(run_file_path)
+
+    if not run_file_paths:
+        return None, prepared_count
+    if len(run_file_paths) == 1:
+        os.replace(run_file_paths[0], dest_file_path)
+    else:
+        merge_sorted_files(run_file_paths, dest_file_path)
+        for run_file_path in run_file_paths:
+            os.remove(run_file_path)
 
-    source_path = '../data/raw/2018/'
-    dest_path = '../data/prepared/2018/'
+    return dest_file_path, prepared_count
 
-    ####################################################################################################################
 
-    # define converters for reading data
-    data_converters_map = {
-        'hashtags': str,
-        'mentions': str,
-    }
+def prepare_daily_file_to_store(task):
+    """
+    Prepare a daily file in chunks and write every chunk to the day partitions of a parquet tweet store. The store
+    sorts the tweets of every file by created_at, so no merge is needed.
+    :param task: tuple of the source file path, the root path of the store and the chunk size
+    :return: list of the written file paths and number of prepared tweets
+    """
+    source_file_path, store_path, chunk_size = task
+    print(f"Start preparing daily file: {source_file_path}")
 
-    for root, monthly_dirs, root_files in os.walk(source_path):
+    tweet_store = ParquetTweetStore(store_path)
+    file_stem = os.path.splitext(os.path.basename(source_file_path))[0]
+    seen_ids = set()
+    file_paths = []
+    prepared_count = 0
 
-        # iterate over monthly directories
-        for month_dir in monthly_dirs:
+    for chunk_idx, df in enumerate(pd.read_csv(source_file_path, sep=";", on_bad_lines='skip', header=0,
+                                               converters=data_converters_map, engine='c', chunksize=chunk_size)):
+        df = prepare_chunk(df)
 
-            daily_df_list = []  # create list to store the prepared daily data frames
+        # drop rows with duplicate id, also over the chunks of the day
+        df = df.drop_duplicates('id')
+        df = df[~df['id'].isin(seen_ids)]
+        seen_ids.update(df['id'])
+        prepared_count += df.shape[0]
 
-            # iterate over files per month
-            for sub_root, dirs, files in os.walk(source_path + month_dir + "/"):
-                for file in files:
-                    if file.endswith(".csv"):
-                        print(f"Start preparing daily file: {file}")
+        file_paths += tweet_store.write(df, f"{file_stem}_{chunk_idx:05d}")
 
-                        # read csv file
-                        df = pd.read_csv(sub_root + file, sep=";", error_bad_lines=False, header=0,
-                                         converters=data_converters_map)
+    return file_paths, prepared_count
 
-                        # rename the username column
-                        df = df.rename(columns={'username': 'user_screen_name'})
 
-                        # parse date time and set as index
-                        df['created_at'] = pd.to_datetime(df['date'])
-                        df.set_index('created_at', inplace=True)
+def merge_sorted_files(file_paths, dest_file_path):
+    """
+    K-way merge of csv files which are sorted by their first column, only one row per file is kept in memory.
+    The created_at strings have the same format in all files, so they are sorted in lexical order.
+    :param file_paths: sorted csv files with the same header
+    :param dest_file_path: path of the merged file, it is not written if no file has a header
+    :return: number of merged rows
+    """
+    source_files = [open(file_path, 'r', newline='', encoding='utf-8') for file_path in file_paths]
+    merged_count = 0
+    try:
+        readers = [csv.reader(source_file) for source_file in source_files]
+        headers = [header for header in (next(reader, None) for reader in readers) if header is not None]
+        if not headers:
+            return merged_count
+        with open(dest_file_path, 'w', newline='', encoding='utf-8') as dest_file:
+            writer = csv.writer(dest_file)
+            writer.writerow(headers[0])
+            for row in heapq.merge(*readers, key=lambda r: r[0]):
+                writer.writerow(row)
+                merged_count += 1
+    finally:
+        for source_file in source_files:
+            source_file.close()
+    return merged_count
 
-                        # parse hashtags to list without #simbyol e.g. ['Cryptocurrency', 'crypto', 'bitcoin']
-                        df['hashtags'] = [[s for s in l if s] for l in df['hashtags'].str.split('#')]
 
-                        # cast mentions to list with user screen names (we don't use ID anymore as usernames are unique)
-                        df['mentions'] = [[s for s in l if s] for l in df['mentions'].str.split('@')]
+if __name__ == '__main__':
+    """
+    Start preparing the raw data consisting of the tweets from kaggle.
+    https://www.kaggle.com/jaimebadiola/177-million-bitcoin-tweets
+    """
+    ################################################ configuration #####################################################
 
-                        # extract links from text and only keep domain
-                        pattern = r'(https?:\/\/(?:www\.)?[-a-zA-Z0-9@:%._+~#=]{1,256}\.[a-zA-Z0-9()]{1,' \
-                                  r'6}[-a-zA-Z0-9()@:%_+.~#?&/=]*) '
-                        df['domains'] = df.text.apply(lambda x: re.findall(pattern, str(x)))
-                        df['domains'] = [[get_base_domain_from_url(url) for url in urls if url] for urls in
-                                         df['domains']]
+    source_path = '../data/raw/2018/'
+    dest_path = '../data/prepared/2018/'
 
-                        # drop rows where id is nan
-                        df.dropna(subset=['id'])
+    # 'parquet' writes the prepared tweets to a parquet tweet store, 'csv' to one merged csv file per month
+    output_format = 'parquet'
+    tweet_store_path = '../data/tweets_parquet/'
 
-                        # drop rows with duplicate id
-                        df = df.drop_duplicates('id')
+    # peak memory is bounded by the number of processes times the rows per chunk, independent of the month size
+    processes = os.cpu_count()
+    chunk_size = 100000
 
-                        # drop unnamed rows
-                        df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
+    ####################################################################################################################
 
-                        # select only necessary rows to keep file size small
-                        df = df[['id', 'user_screen_name', 'text', 'hashtags', 'mentions', 'domains']]
+    for root, monthly_dirs, root_files in os.walk(source_path):
 
-                        # append to monthly df
-                        daily_df_list.append(df)
+        # iterate over monthly directories
+        for month_dir in monthly_dirs:
 
-                # concat the daily dataframes to one complete monthly dataframe
-                final_df = pd.concat(daily_df_list, axis=0)
-                final_df = final_df.sort_index()
-                print(f"End prepare month: {month_dir} - df_size: {final_df.shape[0]}")
-                # save data to csv file
-                final_df.to_csv(dest_path + month_dir + ".csv")
+            # collect the daily files of the month
+            daily_file_paths = []
+            for sub_root, dirs, files in os.walk(source_path + month_dir + "/"):
+                for file in files:
+                    if file.endswith(".csv"):
+                        daily_file_paths.append(sub_root + file)
+
+            if output_format == 'parquet':
+                # the workers write their chunks directly to the day partitions of the store
+                tasks = [(daily_file_path, tweet_store_path, chunk_size) for daily_file_path in daily_file_paths]
+                with ProcessPoolExecutor(max_workers=processes) as executor:
+                    daily_results = list(executor.map(prepare_daily_file_to_store, tasks))
+                print(f"End prepare month: {month_dir} - df_size: {sum(count for _, count in daily_results)}")
+                continue
+
+            # sorted daily files are written to a temporary directory per month
+            daily_dest_path = dest_path + month_dir + "_days/"
+            os.makedirs(daily_dest_path, exist_ok=True)
+            tasks = [(daily_file_path, daily_dest_path + os.path.basename(daily_file_path), chunk_size)
+                     for daily_file_path in daily_file_paths]
+
+            # prepare the daily files in worker processes
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                daily_results = list(executor.map(prepare_daily_file, tasks))
+
+            # merge the sorted daily files to one complete monthly file
+            merged_count = merge_sorted_files([daily_file_path for daily_file_path, _ in daily_results
+                                               if daily_file_path is not None], dest_path + month_dir + ".csv")
+            shutil.rmtree(daily_dest_path)
+            print(f"End prepare month: {month_dir} - df_size: {merged_count}")
@@ -1,8 +1,14 @@
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
+
 import requests
 
 import pandas as pd
 
+from prepare_data.EntityExtraction import get_base_domain
+from prepare_data.UrlResolver import UrlResolver
+from utils.ParquetTweetStore import ParquetTweetStore
+from utils.TweetTimestamps import TIMESTAMP_FIELD
+
 
 class TweetParser:
     """
@@ -18,14 +24,44 @@ class TweetParser:
                          'domains',
                          'user_screen_name']
 
+    # fields of the raw tweets which are needed to prepare them
+    raw_tweet_projection = {'_id': 0,
+                            'id': 1,
+                            'created_at': 1,
+                            TIMESTAMP_FIELD: 1,
+                            'retweeted': 1,
+                            'text': 1,
+                            'entities': 1,
+                            'extended_tweet.full_text': 1,
+                            'extended_tweet.entities': 1,
+                            'user.screen_name': 1}
+
     def __init__(self, mongo_collection, date_time_start: datetime, date_time_end: datetime,
-                 resolve_tco_urls: bool = True, allow_retweets: bool = False):
+                 resolve_tco_urls: bool = True, allow_retweets: bool = False, tweet_file_store=None,
+                 url_resolver: UrlResolver = None, query_by_timestamp: bool = True, cursor_batch_size: int = 5000):
+        """
+        :param mongo_collection: the mongo database collection containing the crawled tweets
+        :param date_time_start: start of the time range of the tweets to prepare (utc)
+        :param date_time_end: end of the time range of the tweets to prepare (utc)
+        :param resolve_tco_urls: resolve the t.co urls of the tweets to their domains
+        :param allow_retweets: also prepare retweets
+        :param tweet_file_store: optional TweetFileStore which is read instead of the mongo database collection
+        :param url_resolver: UrlResolver to resolve the t.co urls, an in memory cached resolver is used by default
+        :param query_by_timestamp: filter the time range and retweets in the mongo database query, the collection
+                                   has to be migrated with utils.TweetTimestamps.migrate_collection otherwise all
+                                   tweets are read
+        :param cursor_batch_size: number of tweets the mongo database cursor fetches per round trip
+        """
 
         self.mongo_collection = mongo_collection
+        self.tweet_file_store = tweet_file_store
         self.time_range_start = date_time_start.date()
         self.time_range_end = date_time_end.date()
         self.resolve_tco_urls = resolve_tco_urls
+        self.url_resolver = url_resolver if url_resolver is not None or not resolve_tco_urls else UrlResolver()
         self.allow_retweets = allow_retweets
+        self.query_by_timestamp = query_by_timestamp
+        self.cursor_batch_size = cursor_batch_size
         self.processed_tweets_count = 0
 
     def prepare_crawled_tweets(self):
@@ -33,83 +69,182 @@ class TweetParser:
         Iterates over the crawled tweets in the given mongo database collection and prepares the data.
         :return: the prepared data as dataframe
         """
+        prepared_dfs = list(self.iterate_prepared_chunks())
+        if not prepared_dfs:
+            return pd.DataFrame(columns=self.result_df_columns).set_index('created_at')
 
-        # log
-        print(f"Start parsing raw tweets data for {self.mongo_collection.name}")
-
-        # create empty result dataframe
-        result_df = pd.DataFrame(columns=self.result_df_columns)
+        # concat the chunks once at the end
+        return pd.concat(prepared_dfs)
 
-        # create empty list to temporary save process tweets as dicts
-        temp_tweet_dict_list = []
+    def write_prepared_chunks(self, dest_path, file_prefix, chunk_size: int = 50000):
+        """
+        Prepares the crawled tweets and writes every chunk to the day partitions of a parquet tweet store, so only
+        one chunk is kept in memory.
+        :param dest_path: root directory of the ParquetTweetStore
+        :param file_prefix: prefix of the chunk file names
+        :param chunk_size: number of prepared tweets per chunk file
+        :return: list of the written file paths
+        """
+        tweet_store = ParquetTweetStore(dest_path)
+        file_paths = []
+        for chunk_idx, prepared_df in enumerate(self.iterate_prepared_chunks(chunk_size)):
+            file_paths += tweet_store.write(prepared_df, f"{file_prefix}_{chunk_idx:05d}")
+        return file_paths
 
-        # iterate over tweets in collection
-        for tweet in self.mongo_collection.find():
+    def iterate_prepared_chunks(self, chunk_size: int = 2000):
+        """
+        Iterates over the crawled tweets and prepares them in chunks. Every chunk is built column by column.
+        :param chunk_size: number of prepared tweets per chunk
+        :return: generator of prepared data frames with created_at as index
+        """
 
-            # check for retweets
-            if not self.allow_retweets and tweet['retweeted']:
-                continue
+        # log
+        source_name = self.tweet_file_store.root_path if self.tweet_file_store else self.mongo_collection.name
+        print(f"Start parsing raw tweets data for {source_name}")
 
-            # ---------------- id ----------------
-            # create tweet with id
-            tweet_dict = {'id': tweet['id']}
+        # create empty columns to temporary save the prepared tweets
+        columns = {column: [] for column in self.result_df_columns}
 
-            # ---------------- created_at ----------------
-            tweet_datetime = datetime.strptime(tweet['created_at'], self.twitter_date_time_format)
+        # iterate over raw tweets
+        for tweet in self.get_raw_tweets():
 
-            # skip tweet if is not in defined date time range
-            if not self.is_in_time_range(tweet_datetime.date()):
+            tweet_dict = self.prepare_tweet(tweet)
+            if tweet_dict is None:
                 continue
 
-            # format date time as desired
-            tweet_dict['created_at'] = datetime.strftime(tweet_datetime, '%Y-%m-%d %H:%M:%S')
-
-            # ---------------- entities ----------------
-            if 'extended_tweet' not in tweet:
-                entities_data = tweet['entities']
-                tweet_dict['text'] = tweet['text']  # maybe utf-8 encoding needed ?
-            else:
-                extended_data = tweet['extended_tweet']
-                tweet_dict['text'] = extended_data['full_text']  # maybe utf-8 encoding needed ?
-                entities_data = extended_data['entities']
-
-            tweet_dict['hashtags'] = [h['text'] for h in entities_data['hashtags']]
-            tweet_dict['mentions'] = [{'id': m['id'], 'screen_name': m['screen_name']}
-                                      for m in
-                                      entities_data['user_mentions']]
-
-            # ---------------- entities ----------------
-            tweet_dict['domains'] = [d['url'] for d in entities_data['urls']]
-            if self.resolve_tco_urls:
-                # as Twitter only stores the tco urls as entities in the raw tweets, they have to be resolved first
-                tweet_dict['domains'] = self.resolve_tco_url_list(tweet_dict['domains'])
-
-            # ---------------- user screen name ----------------
-            user = tweet['user']
-            tweet_dict['user_screen_name'] = user['screen_name']
-
-            # append dict to list
-            temp_tweet_dict_list.append(tweet_dict)
+            for column in self.result_df_columns:
+                columns[column].append(tweet_dict[column])
             self.processed_tweets_count += 1  # increase counter
 
-            # append to df all 2000 tweets to get best performance
-            if self.processed_tweets_count % 2000 == 0 or ():
-                # append to df
-                result_df = result_df.append(temp_tweet_dict_list, ignore_index=True, sort=False)
-                # reset tweet_dict
-                temp_tweet_dict_list = []
-                # print
+            # create a data frame of the chunk
+            if len(columns['id']) >= chunk_size:
+                yield self.create_chunk_df(columns)
+                columns = {column: [] for column in self.result_df_columns}
                 print(f"Prepared tweets: {str(self.processed_tweets_count)}")
 
-        # append the last tweets
-        if len(tweet_dict) != 0:
-            result_df = result_df.append(temp_tweet_dict_list, ignore_index=True, sort=False)
+        # create the chunk of the last tweets
+        if len(columns['id']) != 0:
+            yield self.create_chunk_df(columns)
+
+        if self.resolve_tco_urls:
+            print(f"Resolved tco urls: {self.url_resolver.get_statistics()}")
+
+    def prepare_tweet(self, tweet):
+        """
+        Prepare a single raw tweet
+        :param tweet: raw tweet
+        :return: prepared tweet as dict, None if the tweet is skipped
+        """
+
+        # check for retweets
+        if not self.allow_retweets and tweet['retweeted']:
+            return None
+
+        # ---------------- id ----------------
+        # create tweet with id
+        tweet_dict = {'id': tweet['id']}
+
+        # ---------------- created_at ----------------
+        if TIMESTAMP_FIELD in tweet:  # already parsed when the tweet was stored
+            tweet_datetime = tweet[TIMESTAMP_FIELD]
+        else:
+            tweet_datetime = datetime.strptime(tweet['created_at'], self.twitter_date_time_format)
+
+        # skip tweet if is not in defined date time range
+        if not self.is_in_time_range(tweet_datetime.date()):
+            return None
 
-        # set created at column to index
-        result_df.set_index('created_at', inplace=True)
+        # format date time as desired
+        tweet_dict['created_at'] = datetime.strftime(tweet_datetime, '%Y-%m-%d %H:%M:%S')
+
+        # ---------------- entities ----------------
+        if 'extended_tweet' not in tweet:
+            entities_data = tweet['entities']
+            tweet_dict['text'] = tweet['text']  # maybe utf-8 encoding needed ?
+        else:
+            extended_data = tweet['extended_tweet']
+            tweet_dict['text'] = extended_data['full_text']  # maybe utf-8 encoding needed ?
+            entities_data = extended_data['entities']
+
+        tweet_dict['hashtags'] = [h['text'] for h in entities_data['hashtags']]
+        tweet_dict['mentions'] = [{'id': m['id'], 'screen_name': m['screen_name']}
+                                  for m in
+                                  entities_data['user_mentions']]
+
+        # ---------------- entities ----------------
+        # the tco urls are resolved concurrently for all tweets of a chunk
+        tweet_dict['domains'] = [d['url'] for d in entities_data['urls']]
+
+        # ---------------- user screen name ----------------
+        user = tweet['user']
+        tweet_dict['user_screen_name'] = user['screen_name']
+
+        return tweet_dict
+
+    def create_chunk_df(self, columns):
+        """
+        Resolve the tco urls of a chunk and create its data frame
+        :param columns: dict column name -> list of values
+        :return: prepared data frame with created_at as index
+        """
+        columns['domains'] = self.resolve_domains(columns['domains'])
+        chunk_df = pd.DataFrame(columns, columns=self.result_df_columns)
+        return chunk_df.set_index('created_at')
+
+    def get_raw_tweets(self):
+        """
+        Get the raw tweets either from the tweet file store or from the mongo database collection. The file store
+        only reads the files which overlap the days of the time range, the mongo database collection only returns
+        the tweets of the time range with the fields needed to prepare them.
+        :return: iterable of raw tweets
+        """
+        date_time_start = datetime.combine(self.time_range_start, time.min)
+        date_time_end = datetime.combine(self.time_range_end, time.max)
+
+        if self.tweet_file_store is not None:
+            return self.tweet_file_store.read_tweets(date_time_start, date_time_end)
+
+        if not self.query_by_timestamp:
+            return self.mongo_collection.find()
+        if not self.has_timestamps():
+            print(f"Warning: {self.mongo_collection.name} is not migrated with "
+                  f"utils.TweetTimestamps.migrate_collection, all tweets are read")
+            return self.mongo_collection.find()
+
+        # filter the tweets on the server with the indexed parsed created_at date time, the retweeted condition is the
+        # prefix of the index
+        query = {'retweeted': False if not self.allow_retweets else {'$in': [False, True]}}
+        if self.time_range_start <= self.time_range_end:
+            query[TIMESTAMP_FIELD] = {'$gte': date_time_start, '$lte': date_time_end}
+        return self.mongo_collection.find(query, self.raw_tweet_projection).batch_size(self.cursor_batch_size)
+
+    def has_timestamps(self):
+        """
+        Check whether the tweets can be queried by the parsed created_at date time, which needs its index and the
+        field in every tweet
+        :return: True if the collection is migrated
+        """
+        is_indexed = any(TIMESTAMP_FIELD in dict(index['key'])
+                         for index in self.mongo_collection.index_information().values())
+        if not is_indexed:
+            return False
+
+        # a tweet without the field is indexed as null, the retweeted condition uses the index prefix
+        query = {'retweeted': {'$in': [False, True]}, TIMESTAMP_FIELD: None}
+        return self.mongo_collection.find_one(query, {'_id': 1}) is None
+
+    def resolve_domains(self, domains_column):
+        """
+        Replace the tco urls of a chunk of prepared tweets with their resolved domains
+        :param domains_column: list of tco url lists
+        :return: list of domain lists
+        """
+        if not self.resolve_tco_urls:
+            return domains_column
 
-        # finally return the dataframe
-        return result_df
+        # as Twitter only stores the tco urls as entities in the raw tweets, they have to be resolved first
+        domains = self.url_resolver.resolve(url for urls in domains_column for url in urls)
+        return [[domains[url] for url in urls] for urls in domains_column]
 
     def is_in_time_range(self, x):
         """Return true if x is in the range [start, end]"""
@@ -139,11 +274,6 @@ class TweetParser:
         """
         try:
             r = requests.get(url, timeout=3)  # resolve tco.url
-            url = r.url.replace("https://", "")
-            url = url.replace("http://", "")
-            plain_url = url.split("/")[0]
-            if plain_url.startswith("www."):
-                plain_url = plain_url.replace("www.", "")
-            return plain_url
+            return get_base_domain(r.url)
         except:
             return
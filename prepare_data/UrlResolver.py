@@ -0,0 +1,134 @@
+from concurrent.futures import ThreadPoolExecutor
+import sqlite3
+import time
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+from prepare_data.EntityExtraction import get_base_domain
+
+
+class UrlResolver:
+    """
+    Resolves urls e.g. t.co urls to their base domain with a bounded pool of workers. Resolved domains and failed
+    resolutions are kept in a persistent sqlite cache, so already seen urls never hit the network again.
+    """
+
+    def __init__(self, cache_path: str = ':memory:', max_workers: int = 32, timeout: float = 3.0,
+                 ttl: float = 30 * 24 * 60 * 60, negative_ttl: float = 24 * 60 * 60):
+        """
+        :param cache_path: path of the sqlite cache file, ':memory:' to not persist the cache
+        :param max_workers: max number of concurrent requests
+        :param timeout: timeout of a request in seconds
+        :param ttl: seconds a resolved domain is valid
+        :param negative_ttl: seconds a failed resolution is cached before it is retried
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+        self.cache_connection = sqlite3.connect(cache_path, timeout=60)  # the cache file may be shared by processes
+        self.cache_connection.execute("CREATE TABLE IF NOT EXISTS url_domains "
+                                      "(url TEXT PRIMARY KEY, domain TEXT, resolved_at REAL NOT NULL)")
+        self.cache_connection.commit()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # statistics
+        self.hit_count = 0
+        self.negative_hit_count = 0
+        self.miss_count = 0
+        self.failed_count = 0
+        self.latencies = []
+
+    def resolve(self, urls):
+        """
+        Resolve urls to their base domain
+        :param urls: iterable of urls, duplicates are resolved once
+        :return: dict url -> base domain, None if the url could not be resolved
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        domains = self.lookup_cache(unique_urls)
+        missing_urls = [url for url in unique_urls if url not in domains]
+        self.miss_count += len(missing_urls)
+
+        if missing_urls:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing_urls))) as executor:
+                resolved_domains = list(executor.map(self.resolve_url, missing_urls))
+            self.failed_count += sum(domain is None for domain in resolved_domains)
+            self.store_cache(zip(missing_urls, resolved_domains))
+            domains.update(zip(missing_urls, resolved_domains))
+
+        return domains
+
+    def resolve_url(self, url):
+        """
+        Resolve a single url by following its redirects
+        :param url: url to resolve e.g. a tco url
+        :return: base domain of the resolved url, None if the resolution failed
+        """
+        start_time = time.perf_counter()
+        try:
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:  # body is not needed
+                return get_base_domain(response.url)
+        except Exception:
+            return None
+        finally:
+            self.latencies.append(time.perf_counter() - start_time)
+
+    def lookup_cache(self, urls):
+        """
+        Get the cached domains of the urls which are not expired
+        :param urls: list of urls
+        :return: dict url -> base domain of the cached urls
+        """
+        now = time.time()
+        domains = {}
+        for offset in range(0, len(urls), 500):  # stay below the sqlite variable limit
+            url_chunk = urls[offset:offset + 500]
+            rows = self.cache_connection.execute(
+                f"SELECT url, domain, resolved_at FROM url_domains WHERE url IN ({','.join('?' * len(url_chunk))})",
+                url_chunk).fetchall()
+            for url, domain, resolved_at in rows:
+                if domain is not None and now - resolved_at < self.ttl:
+                    domains[url] = domain
+                    self.hit_count += 1
+                elif domain is None and now - resolved_at < self.negative_ttl:
+                    domains[url] = None
+                    self.negative_hit_count += 1
+        return domains
+
+    def store_cache(self, url_domains):
+        """
+        Store resolved domains and failed resolutions in the cache
+        :param url_domains: iterable of (url, domain) tuples
+        """
+        now = time.time()
+        self.cache_connection.executemany("INSERT OR REPLACE INTO url_domains (url, domain, resolved_at) "
+                                          "VALUES (?, ?, ?)",
+                                          [(url, domain, now) for url, domain in url_domains])
+        self.cache_connection.commit()
+
+    def get_statistics(self):
+        """
+        Get the cache and latency statistics of the resolver
+        :return: statistics as dict
+        """
+        latencies = np.asarray(self.latencies) * 1000  # milli seconds
+        statistics = {'hits': self.hit_count,
+                      'negative_hits': self.negative_hit_count,
+                      'misses': self.miss_count,
+                      'failed': self.failed_count}
+        for percentile in [50, 90, 99]:
+            statistics[f"latency_p{percentile}_ms"] = round(float(np.percentile(latencies, percentile)), 3) \
+                if latencies.size else 0.0
+        return statistics
+
+    def close(self):
+        self.session.close()
+        self.cache_connection.close()
@@ -0,0 +1,299 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+
+class CandleStore:
+    """
+    Persistent local store of price candles keyed by symbol pair and granularity. Candles are deduplicated by their
+    unix time, so only the missing intervals of a requested range have to be fetched. The fetched ranges are stored
+    as well, so ranges in which the provider has no candles are not fetched again.
+    """
+
+    candle_columns = ['unix', 'low', 'high', 'open', 'close', 'volume']
+    covered_columns = ['start_unix', 'end_unix']
+
+    def __init__(self, root_path: str):
+        """
+        :param root_path: directory where the candle files are stored
+        """
+        self.root_path = root_path
+        self.candles = {}  # loaded candles per (symbol pair, granularity)
+        self.covered_ranges = {}  # loaded fetched ranges per (symbol pair, granularity)
+
+    def get_file_path(self, symbol_pair, granularity):
+        return os.path.join(self.root_path, f"{symbol_pair}_{granularity}.csv")
+
+    def get_covered_file_path(self, symbol_pair, granularity):
+        return os.path.join(self.root_path, f"{symbol_pair}_{granularity}_covered.csv")
+
+    def load(self, symbol_pair, granularity):
+        """
+        Load all stored candles of a symbol pair and granularity
+        :param symbol_pair: the symbol pair e.g. BTC-USD
+        :param granularity: granularity of the candles in seconds
+        :return: candles sorted by unix time
+        """
+        key = (symbol_pair, granularity)
+        if key not in self.candles:
+            file_path = self.get_file_path(symbol_pair, granularity)
+            if os.path.exists(file_path):
+                candles_df = pd.read_csv(file_path, usecols=self.candle_columns, header=0)
+            else:
+                candles_df = pd.DataFrame(columns=self.candle_columns)
+            self.candles[key] = self.prepare_candles(candles_df)
+        return self.candles[key]
+
+    def ingest(self, symbol_pair, granularity, candles_df):
+        """
+        Add candles to the store, already stored candles with the same unix time are replaced
+        :param symbol_pair: the symbol pair e.g. BTC-USD
+        :param granularity: granularity of the candles in seconds
+        :param candles_df: candles with at least the candle columns
+        :return: number of stored candles
+        """
+        stored_df = self.load(symbol_pair, granularity)
+        candles_df = pd.concat([stored_df, self.prepare_candles(candles_df)], ignore_index=True)
+        candles_df = self.prepare_candles(candles_df.drop_duplicates('unix', keep='last'))
+        self.candles[(symbol_pair, granularity)] = candles_df
+
+        self.write_csv(self.get_file_path(symbol_pair, granularity), candles_df)
+        return candles_df.shape[0]
+
+    def load_covered(self, symbol_pair, granularity):
+        """
+        Load the fetched ranges of a symbol pair and granularity
+        :param symbol_pair: the symbol pair e.g. BTC-USD
+        :param granularity: granularity of the candles in seconds
+        :return: disjoint ranges with inclusive start and end unix time sorted by start
+        """
+        key = (symbol_pair, granularity)
+        if key not in self.covered_ranges:
+            file_path = self.get_covered_file_path(symbol_pair, granularity)
+            if os.path.exists(file_path):
+                covered_df = pd.read_csv(file_path, usecols=self.covered_columns, header=0)
+            else:
+                covered_df = pd.DataFrame(columns=self.covered_columns)
+            self.covered_ranges[key] = covered_df.astype('int64')
+        return self.covered_ranges[key]
+
+    def add_covered(self, symbol_pair, granularity, ranges):
+        """
+        Add fetched ranges to the store, also the ranges in which the provider returned no candles
+        :param symbol_pair: the symbol pair e.g. BTC-USD
+        :param granularity: granularity of the candles in seconds
+        :param ranges: list of (start, end) tuples (utc, inclusive)
+        :return: number of stored disjoint ranges
+        """
+        new_df = pd.DataFrame([(self.to_unix(start), self.to_unix(end)) for start, end in ranges],
+                              columns=self.covered_columns)
+        covered_df = pd.concat([self.load_covered(symbol_pair, granularity), new_df], ignore_index=True)
+        covered_df = covered_df.astype('int64').sort_values('start_unix', ignore_index=True)
+
+        # merge overlapping and adjacent ranges
+        merged_ranges = []
+        for start_unix, end_unix in covered_df.itertuples(index=False):
+            if merged_ranges and start_unix <= merged_ranges[-1][1] + 1:
+                merged_ranges[-1][1] = max(merged_ranges[-1][1], end_unix)
+            else:
+                merged_ranges.append([start_unix, end_unix])
+        covered_df = pd.DataFrame(merged_ranges, columns=self.covered_columns, dtype='int64')
+        self.covered_ranges[(symbol_pair, granularity)] = covered_df
+
+        self.write_csv(self.get_covered_file_path(symbol_pair, granularity), covered_df)
+        return covered_df.shape[0]
+
+    def write_csv(self, file_path, df):
+        """
+        Replace a file of the store atomically
+        """
+        os.makedirs(self.root_path, exist_ok=True)
+        df.to_csv(file_path + '.tmp', index=False)
+        os.replace(file_path + '.tmp', file_path)
+
+    def import_csv(self, symbol_pair, granularity, file_path):
+        """
+        Import a csv file of fetched candles e.g. the former yearly price data files
+        :return: number of stored candles
+        """
+        return self.ingest(symbol_pair, granularity, pd.read_csv(file_path, usecols=self.candle_columns, header=0))
+
+    def get_range(self, symbol_pair, granularity, start_date_time, end_date_time):
+        """
+        Get the stored candles of a time range
+        :param symbol_pair: the symbol pair e.g. BTC-USD
+        :param granularity: granularity of the candles in seconds
+        :param start_date_time: start of the range (utc)
+        :param end_date_time: end of the range (utc, inclusive)
+        :return: candles sorted by date
+        """
+        candles_df = self.load(symbol_pair, granularity)
+        start_unix, end_unix = self.to_unix(start_date_time), self.to_unix(end_date_time)
+        unix_values = candles_df['unix'].to_numpy()
+        start_idx = np.searchsorted(unix_values, start_unix, side='left')
+        end_idx = np.searchsorted(unix_values, end_unix, side='right')
+        return candles_df.iloc[start_idx:end_idx].reset_index(drop=True)
+
+    def find_gaps(self, symbol_pair, granularity, start_date_time, end_date_time):
+        """
+        Find the intervals of a time range which have neither stored candles nor were fetched before
+        :param symbol_pair: the symbol pair e.g. BTC-USD
+        :param granularity: granularity of the candles in seconds
+        :param start_date_time: start of the range (utc)
+        :param end_date_time: end of the range (utc, inclusive)
+        :return: list of (start, end) tuples of the missing intervals
+        """
+        start_unix, end_unix = self.to_unix(start_date_time), self.to_unix(end_date_time)
+        first_candle_unix = start_unix + (-start_unix % granularity)  # candles are aligned to the granularity
+        expected_unix = np.arange(first_candle_unix, end_unix + 1, granularity, dtype=np.int64)
+        stored_unix = self.load(symbol_pair, granularity)['unix'].to_numpy()
+        missing_unix = expected_unix[~np.isin(expected_unix, stored_unix)]
+
+        # the candles in fetched ranges are missing at the provider as well
+        covered_df = self.load_covered(symbol_pair, granularity)
+        if covered_df.shape[0] > 0:
+            covered_start_unix = covered_df['start_unix'].to_numpy()
+            covered_end_unix = covered_df['end_unix'].to_numpy()
+            range_idx = np.maximum(np.searchsorted(covered_start_unix, missing_unix, side='right') - 1, 0)
+            is_covered = (missing_unix >= covered_start_unix[range_idx]) & (missing_unix <= covered_end_unix[range_idx])
+            missing_unix = missing_unix[~is_covered]
+        if missing_unix.size == 0:
+            return []
+
+        # split the missing candles into consecutive intervals
+        gap_groups = np.split(missing_unix, np.flatnonzero(np.diff(missing_unix) != granularity) + 1)
+        return [(self.to_date_time(gap[0]), self.to_date_time(gap[-1] + granularity - 1)) for gap in gap_groups]
+
+    def top_up(self, candle_fetcher, symbol_pair, granularity, start_date_time, end_date_time):
+        """
+        Fetch only the missing intervals of a time range and add them to the store. The successfully fetched windows
+        are stored as covered, failed windows and candles which are not completed yet are fetched again in the next run.
+        :param candle_fetcher: CandleFetcher to fetch the missing candles
+        :param symbol_pair: the symbol pair e.g. BTC-USD
+        :param granularity: granularity of the candles in seconds
+        :param start_date_time: start of the range (utc)
+        :param end_date_time: end of the range (utc, inclusive)
+        :return: number of fetched candles
+        """
+        gaps = self.find_gaps(symbol_pair, granularity, start_date_time, end_date_time)
+        print(f"Found {len(gaps)} gaps for {symbol_pair} with granularity {granularity}")
+
+        # the candles of the current interval are not completed yet
+        now_unix = int(time.time())
+        completed_end = self.to_date_time(now_unix - now_unix % granularity - 1)
+
+        fetched_dfs = []
+        covered_ranges = []
+        for gap_start, gap_end in gaps:
+            candles_df = candle_fetcher.fetch(symbol_pair, gap_start, gap_end, granularity)
+            if candles_df is not None and candles_df.shape[0] > 0:
+                fetched_dfs.append(candles_df)
+            covered_ranges += [(window_start, min(window_end, completed_end)) for window_start, window_end in
+                               candle_fetcher.create_windows(gap_start, gap_end, granularity)
+                               if (window_start, window_end) not in candle_fetcher.failed_windows
+                               and window_start <= completed_end]
+
+        # write the store once for all fetched gaps, the candles before their ranges
+        fetched_count = 0
+        if fetched_dfs:
+            fetched_df = pd.concat(fetched_dfs, ignore_index=True)
+            self.ingest(symbol_pair, granularity, fetched_df)
+            fetched_count = fetched_df.shape[0]
+        if covered_ranges:
+            self.add_covered(symbol_pair, granularity, covered_ranges)
+        return fetched_count
+
+    def derive(self, symbol_pair, source_granularity, granularity, start_date_time, end_date_time):
+        """
+        Build the candles of a coarser granularity from the stored finer candles and add them to the store. Only the
+        coarser candles of which all finer candles are stored are derived and stored as covered, the others are derived
+        again once the gaps of the finer candles are filled.
+        :param symbol_pair: the symbol pair e.g. BTC-USD
+        :param source_granularity: granularity of the stored candles in seconds
+        :param granularity: coarser granularity in seconds, has to be a multiple of the source granularity
+        :param start_date_time: start of the range (utc)
+        :param end_date_time: end of the range (utc, inclusive)
+        :return: number of derived candles
+        """
+        if granularity % source_granularity != 0:
+            raise ValueError(f"Granularity {granularity} is not a multiple of {source_granularity}")
+
+        # extend the range to whole coarser candles
+        start_unix, end_unix = self.to_unix(start_date_time), self.to_unix(end_date_time)
+        start_unix = start_unix - start_unix % granularity
+        end_unix = end_unix - end_unix % granularity + granularity - 1
+        source_df = self.get_range(symbol_pair, source_granularity, self.to_date_time(start_unix),
+                                   self.to_date_time(end_unix))
+        if source_df.shape[0] == 0:
+            return 0
+
+        # a coarser candle is complete if all of its finer candles are stored
+        source_unix = source_df['unix'].to_numpy()
+        candle_unix, source_counts = np.unique(source_unix - source_unix % granularity, return_counts=True)
+        complete_unix = candle_unix[source_counts == granularity // source_granularity]
+        if complete_unix.size == 0:
+            return 0
+
+        derived_df = self.aggregate_candles(source_df, granularity)
+        derived_df = derived_df[derived_df['unix'].isin(complete_unix)]
+        self.ingest(symbol_pair, granularity, derived_df)
+        self.add_covered(symbol_pair, granularity, [(self.to_date_time(unix), self.to_date_time(unix + granularity - 1))
+                                                    for unix in complete_unix])
+        return derived_df.shape[0]
+
+    @classmethod
+    def aggregate_candles(cls, candles_df, granularity):
+        """
+        Aggregate candles to a coarser granularity: first open, max high, min low, last close and summed volume
+        :param candles_df: candles of a finer granularity
+        :param granularity: coarser granularity in seconds
+        :return: aggregated candles
+        """
+        candles_df = candles_df.sort_values('unix')
+        candle_unix = (candles_df['unix'] - candles_df['unix'] % granularity).rename('candle_unix')
+        aggregated_df = candles_df.groupby(candle_unix).agg(low=('low', 'min'), high=('high', 'max'),
+                                                             open=('open', 'first'), close=('close', 'last'),
+                                                             volume=('volume', 'sum'))
+        aggregated_df = aggregated_df.rename_axis('unix').reset_index()
+        return cls.prepare_candles(aggregated_df)
+
+    @classmethod
+    def compare_candles(cls, derived_df, reference_df, relative_tolerance: float = 1e-6):
+        """
+        Compare derived candles with reference candles e.g. the coarser candles of the provider
+        :param derived_df: derived candles
+        :param reference_df: reference candles
+        :param relative_tolerance: relative tolerance of equal values
+        :return: comparison result as dict
+        """
+        merged_df = pd.merge(derived_df[cls.candle_columns], reference_df[cls.candle_columns], on='unix',
+                             how='outer', suffixes=('_derived', '_reference'), indicator=True)
+        both_df = merged_df[merged_df['_merge'] == 'both']
+        result = {'compared': both_df.shape[0],
+                  'only_derived': int((merged_df['_merge'] == 'left_only').sum()),
+                  'only_reference': int((merged_df['_merge'] == 'right_only').sum())}
+        for column in cls.candle_columns[1:]:
+            derived_values = both_df[column + '_derived'].to_numpy(dtype='float64')
+            reference_values = both_df[column + '_reference'].to_numpy(dtype='float64')
+            result[f"{column}_mismatches"] = int((~np.isclose(derived_values, reference_values,
+                                                              rtol=relative_tolerance)).sum())
+        return result
+
+    @classmethod
+    def prepare_candles(cls, candles_df):
+        """
+        Cast the candle columns, add the date column and sort the candles by unix time
+        """
+        candles_df = candles_df[cls.candle_columns].astype('float64').astype({'unix': 'int64'})
+        candles_df['date'] = pd.to_datetime(candles_df['unix'], unit='s')
+        return candles_df.sort_values('unix', ignore_index=True)
+
+    @staticmethod
+    def to_unix(date_time):
+        return int(pd.Timestamp(date_time).value // 10 ** 9)
+
+    @staticmethod
+    def to_date_time(unix):
+        return pd.Timestamp(int(unix), unit='s').to_pydatetime()
@@ -0,0 +1,24 @@
+import time
+
+
+class FakeMongoCollection:
+    """
+    Local stand-in for a mongo database collection which simulates the round trip latency of a real server
+    """
+
+    def __init__(self, round_trip_latency: float = 0.001, per_document_latency: float = 0.00001):
+        """
+        :param round_trip_latency: seconds every insert call takes regardless of the number of documents
+        :param per_document_latency: additional seconds every inserted document takes
+        """
+        self.round_trip_latency = round_trip_latency
+        self.per_document_latency = per_document_latency
+        self.documents = []
+
+    def insert_one(self, document):
+        time.sleep(self.round_trip_latency + self.per_document_latency)
+        self.documents.append(document)
+
+    def insert_many(self, documents, ordered=True):
+        time.sleep(self.round_trip_latency + self.per_document_latency * len(documents))
+        self.documents.extend(documents)
@@ -0,0 +1,206 @@
+from datetime import datetime
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+class ParquetTweetStore:
+    """
+    Stores prepared tweets as compressed parquet files partitioned by year, month and day. The entities are stored as
+    list columns and created_at as typed timestamp, so no per cell parsing is needed to load them.
+    """
+
+    schema = pa.schema([('created_at', pa.timestamp('ns')),
+                        ('id', pa.int64()),
+                        ('user_screen_name', pa.string()),
+                        ('text', pa.string()),
+                        ('hashtags', pa.list_(pa.string())),
+                        ('mentions', pa.list_(pa.string())),
+                        ('domains', pa.list_(pa.string()))])
+
+    def __init__(self, root_path: str, compression: str = 'zstd', row_group_size: int = 10000):
+        """
+        :param root_path: directory of the store e.g. ../data/tweets_parquet/
+        :param compression: compression codec of the parquet files
+        :param row_group_size: max number of tweets per row group, row groups outside of a time range are skipped
+        """
+        self.root_path = root_path
+        self.compression = compression
+        self.row_group_size = row_group_size
+
+    def write(self, tweets_df, file_name):
+        """
+        Write prepared tweets to the day partitions they were created in. An existing file with the same name in a
+        partition is replaced, so a preparation can be rerun.
+        :param tweets_df: prepared tweets with created_at as index
+        :param file_name: name of the file in every partition e.g. the name of the source chunk
+        :return: list of the written file paths
+        """
+        tweets_df = self.normalize_tweets(tweets_df)
+        file_paths = []
+        for day, day_df in tweets_df.groupby(tweets_df['created_at'].dt.normalize(), sort=True):
+            day_path = self.get_day_path(day)
+            os.makedirs(day_path, exist_ok=True)
+            file_path = os.path.join(day_path, f"{file_name}.parquet")
+            table = pa.Table.from_pandas(day_df.sort_values('created_at', kind='mergesort'), schema=self.schema,
+                                         preserve_index=False)
+            pq.write_table(table, file_path, compression=self.compression, row_group_size=self.row_group_size)
+            file_paths.append(file_path)
+        return file_paths
+
+    def read(self, date_time_start: datetime = None, date_time_end: datetime = None, columns=None):
+        """
+        Read the tweets of a time range, only the day partitions and row groups of the range are read
+        :param date_time_start: start of the time range, None to read from the first tweet
+        :param date_time_end: end of the time range (inclusive), None to read till the last tweet
+        :param columns: columns to read, None to read all columns
+        :return: tweets data frame with created_at as index sorted by time
+        """
+        read_columns = self.get_read_columns(columns)
+        tables = [self.read_file(file_path, date_time_start, date_time_end, read_columns)
+                  for file_path in self.get_file_paths(date_time_start, date_time_end)]
+        table = pa.concat_tables(tables) if tables else self.schema.empty_table().select(read_columns)
+        return self.to_tweets_df(table, date_time_start, date_time_end)
+
+    def iter_batches(self, date_time_start: datetime = None, date_time_end: datetime = None, columns=None,
+                     batch_size: int = 100000):
+        """
+        Lazily read the tweets of a time range day by day, e.g. to stream graphs with TwitterGraphCreator
+        :param date_time_start: start of the time range, None to read from the first tweet
+        :param date_time_end: end of the time range (inclusive), None to read till the last tweet
+        :param columns: columns to read, None to read all columns
+        :param batch_size: max number of tweets per batch
+        :return: generator of tweet data frames with created_at as index ordered by time
+        """
+        read_columns = self.get_read_columns(columns)
+        for day in self.get_days(date_time_start, date_time_end):
+            tables = [self.read_file(file_path, date_time_start, date_time_end, read_columns)
+                      for file_path in self.get_day_file_paths(day)]
+            if not tables:
+                continue
+            day_df = self.to_tweets_df(pa.concat_tables(tables), date_time_start, date_time_end)
+            for offset in range(0, day_df.shape[0], batch_size):
+                yield day_df.iloc[offset:offset + batch_size]
+
+    def read_file(self, file_path, date_time_start: datetime = None, date_time_end: datetime = None, columns=None):
+        """
+        Read the row groups of a memory mapped file which overlap the time range
+        :param file_path: path of the parquet file
+        :param date_time_start: start of the time range, None for no lower bound
+        :param date_time_end: end of the time range (inclusive), None for no upper bound
+        :param columns: columns to read
+        :return: arrow table
+        """
+        parquet_file = pq.ParquetFile(file_path, memory_map=True)
+        row_groups = self.get_row_groups(parquet_file.metadata, date_time_start, date_time_end)
+        return parquet_file.read_row_groups(row_groups, columns=columns)
+
+    @staticmethod
+    def get_row_groups(metadata, date_time_start: datetime = None, date_time_end: datetime = None):
+        """
+        Select the row groups of a file by the min and max created_at statistics
+        :param metadata: parquet file metadata
+        :param date_time_start: start of the time range, None for no lower bound
+        :param date_time_end: end of the time range (inclusive), None for no upper bound
+        :return: list of row group indices
+        """
+        row_groups = []
+        for row_group_idx in range(metadata.num_row_groups):
+            statistics = metadata.row_group(row_group_idx).column(0).statistics
+            if statistics is not None and statistics.has_min_max:
+                if date_time_start is not None and pd.Timestamp(statistics.max) < pd.Timestamp(date_time_start):
+                    continue
+                if date_time_end is not None and pd.Timestamp(statistics.min) > pd.Timestamp(date_time_end):
+                    continue
+            row_groups.append(row_group_idx)
+        return row_groups
+
+    def get_read_columns(self, columns=None):
+        """
+        :param columns: requested columns, None for all columns
+        :return: columns to read including created_at
+        """
+        if columns is None:
+            return self.schema.names
+        return ['created_at'] + [column for column in columns if column != 'created_at']
+
+    def to_tweets_df(self, table, date_time_start: datetime = None, date_time_end: datetime = None):
+        """
+        Convert an arrow table of the store to a tweets data frame of a time range
+        :param table: arrow table containing created_at
+        :param date_time_start: start of the time range, None for no lower bound
+        :param date_time_end: end of the time range (inclusive), None for no upper bound
+        :return: tweets data frame with created_at as index sorted by time
+        """
+        tweets_df = table.to_pandas()
+
+        # list columns as python lists like the csv loader, instead of numpy arrays
+        for column in table.column_names:
+            if pa.types.is_list(self.schema.field(column).type):
+                tweets_df[column] = table.column(column).to_pylist()
+
+        if date_time_start is not None:
+            tweets_df = tweets_df[tweets_df['created_at'] >= pd.Timestamp(date_time_start)]
+        if date_time_end is not None:
+            tweets_df = tweets_df[tweets_df['created_at'] <= pd.Timestamp(date_time_end)]
+        return tweets_df.set_index('created_at').sort_index(kind='mergesort')
+
+    def get_file_paths(self, date_time_start: datetime = None, date_time_end: datetime = None):
+        """
+        Get the files of the day partitions which overlap the time range
+        :return: list of file paths ordered by day
+        """
+        file_paths = []
+        for day in self.get_days(date_time_start, date_time_end):
+            file_paths += self.get_day_file_paths(day)
+        return file_paths
+
+    def get_day_file_paths(self, day):
+        """
+        Get the files of a day partition
+        :return: list of file paths ordered by name
+        """
+        day_path = self.get_day_path(day)
+        return [os.path.join(day_path, file) for file in sorted(os.listdir(day_path)) if file.endswith('.parquet')]
+
+    def get_days(self, date_time_start: datetime = None, date_time_end: datetime = None):
+        """
+        Get the days of the partitions in the store which overlap the time range
+        :return: sorted list of timestamps
+        """
+        start_day = pd.Timestamp(date_time_start).normalize() if date_time_start is not None else None
+        end_day = pd.Timestamp(date_time_end).normalize() if date_time_end is not None else None
+
+        days = []
+        for root, dirs, files in os.walk(self.root_path):
+            relative_path = os.path.relpath(root, self.root_path)
+            parts = relative_path.split(os.sep)
+            if len(parts) == 3 and all('=' in part for part in parts):
+                year, month, day = (int(part.split('=')[1]) for part in parts)
+                day = pd.Timestamp(year=year, month=month, day=day)
+                if (start_day is None or day >= start_day) and (end_day is None or day <= end_day):
+                    days.append(day)
+        return sorted(days)
+
+    def get_day_path(self, day):
+        return os.path.join(self.root_path, f"year={day.year}", f"month={day.month:02d}", f"day={day.day:02d}")
+
+    @classmethod
+    def normalize_tweets(cls, tweets_df):
+        """
+        Bring prepared tweets of both preparations to the schema of the store
+        :param tweets_df: prepared tweets with created_at as index
+        :return: data frame with the columns of the schema
+        """
+        tweets_df = tweets_df.reset_index()
+        created_at = pd.to_datetime(tweets_df['created_at'])
+        if created_at.dt.tz is not None:
+            created_at = created_at.dt.tz_convert('UTC').dt.tz_localize(None)
+        tweets_df['created_at'] = created_at
+
+        # crawled tweets store the mentions as dicts with id and screen name
+        tweets_df['mentions'] = [[m if isinstance(m, str) else m['screen_name'] for m in mentions]
+                                 for mentions in tweets_df['mentions']]
+        return tweets_df[cls.schema.names]
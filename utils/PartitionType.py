@@ -8,3 +8,17 @@ class PartitionType(Enum):
     FIVE_MINUTES = '5Min'
     FIFTEEN_MINUTES = '15Min'
     ONE_HOUR = 'H'
+
+
+def get_seconds_for_partition_type(partition_type):
+    """
+    Converts a give partition type to its corresponding amount of seconds
+    :param partition_type: partition type to transform
+    :return: seconds:int
+    """
+    if partition_type == PartitionType.FIVE_MINUTES:
+        return 60 * 5
+    if partition_type == PartitionType.FIFTEEN_MINUTES:
+        return 60 * 15
+    if partition_type == PartitionType.ONE_HOUR:
+        return 60 * 60
@@ -0,0 +1,70 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class SharedArrays:
+    """
+    Numpy arrays in shared memory blocks, so worker processes can read them without pickled copies. The owner creates
+    the blocks and passes the specs to the workers which attach to them.
+    """
+
+    def __init__(self, arrays, shared_memories, is_owner: bool):
+        """
+        :param arrays: dict of names and numpy arrays backed by the shared memory blocks
+        :param shared_memories: dict of names and SharedMemory blocks
+        :param is_owner: unlink the blocks on close
+        """
+        self.arrays = arrays
+        self.shared_memories = shared_memories
+        self.is_owner = is_owner
+
+    @classmethod
+    def create(cls, arrays):
+        """
+        Copy arrays into new shared memory blocks
+        :param arrays: dict of names and numpy arrays
+        :return: SharedArrays owning the blocks
+        """
+        shared_arrays = {}
+        shared_memories = {}
+        for name, array in arrays.items():
+            shared_memories[name] = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            shared_arrays[name] = np.ndarray(array.shape, dtype=array.dtype, buffer=shared_memories[name].buf)
+            shared_arrays[name][...] = array
+        return cls(shared_arrays, shared_memories, is_owner=True)
+
+    @classmethod
+    def attach(cls, specs):
+        """
+        Attach to the shared memory blocks of another process
+        :param specs: specs of the owner
+        :return: SharedArrays which do not unlink the blocks
+        """
+        shared_arrays = {}
+        shared_memories = {}
+        for name, (memory_name, shape, dtype) in specs.items():
+            shared_memories[name] = shared_memory.SharedMemory(name=memory_name)
+            shared_arrays[name] = np.ndarray(shape, dtype=dtype, buffer=shared_memories[name].buf)
+        return cls(shared_arrays, shared_memories, is_owner=False)
+
+    def get_specs(self):
+        """
+        :return: picklable dict of names and the block name, shape and dtype of the arrays
+        """
+        return {name: (self.shared_memories[name].name, array.shape, array.dtype.str)
+                for name, array in self.arrays.items()}
+
+    def close(self):
+        """
+        Release the arrays and close the blocks, the owner also unlinks them
+        """
+        self.arrays = {}
+        for memory in self.shared_memories.values():
+            memory.close()
+            if self.is_owner:
+                memory.unlink()
+        self.shared_memories = {}
+
+    def __getitem__(self, name):
+        return self.arrays[name]
@@ -0,0 +1,192 @@
+from datetime import datetime, timedelta
+import gzip
+import json
+import logging
+import os
+import zlib
+
+from utils.TweetTimestamps import TIMESTAMP_FIELD
+
+
+class TweetFileStore:
+    """
+    Stores raw tweets in hourly rotated, gzip compressed JSONL files which are partitioned by the tweet creation time.
+    A manifest keeps the time bounds and the number of tweets per file, so only the files of a time range have to be
+    read. The manifest is saved whenever a file is opened or closed, the open files are saved with the bounds of their
+    hour, so their tweets are also read after a crash. Every opened file of an hour is a new file with the next
+    sequence number, so tweets are never appended to a file which was not closed.
+    """
+
+    twitter_date_time_format = '%a %b %d %H:%M:%S +0000 %Y'
+    manifest_file_name = 'manifest.json'
+
+    def __init__(self, root_path: str, max_open_files: int = 2, compress_level: int = 6):
+        """
+        :param root_path: directory where the tweet files and the manifest are stored
+        :param max_open_files: number of hourly files kept open for tweets which arrive late
+        :param compress_level: gzip compression level of the tweet files
+        """
+        self.root_path = root_path
+        self.max_open_files = max_open_files
+        self.compress_level = compress_level
+        self.open_files = {}
+        self.written_count = 0
+        self.manifest = self.load_manifest()
+
+    def write(self, document):
+        """
+        Append a tweet to the file of the hour it was created in. The created_at date time which a BufferedTweetWriter
+        adds is used instead of parsing created_at again and is not stored, so the files contain the raw tweets.
+        :param document: the tweet as json object
+        """
+        created_at = document.pop(TIMESTAMP_FIELD, None)
+        if created_at is None:
+            created_at = datetime.strptime(document['created_at'], self.twitter_date_time_format)
+        partition_hour = created_at.replace(minute=0, second=0, microsecond=0)
+
+        if partition_hour not in self.open_files:
+            self.open_partition(partition_hour)
+        file_name, tweets_file = self.open_files[partition_hour]
+        tweets_file.write(json.dumps(document, default=str) + '\n')
+
+        # update the time bounds and count of the file
+        entry = self.manifest.setdefault(file_name, {'start': created_at, 'end': created_at, 'count': 0})
+        entry['start'] = min(entry['start'], created_at)
+        entry['end'] = max(entry['end'], created_at)
+        entry['count'] += 1
+        self.written_count += 1
+
+    def insert_many(self, documents, ordered=True):
+        """
+        Write a batch of tweets like a mongo database collection, so the store can be the sink of a BufferedTweetWriter
+        :param documents: list of tweets as json objects
+        :param ordered: only for the interface of a collection, the tweets are always written in order
+        """
+        for document in documents:
+            self.write(document)
+
+    def open_partition(self, partition_hour):
+        """
+        Open a new file of a partition with the next free sequence number and rotate the oldest open file if too many
+        files are open
+        :param partition_hour: start of the hour of the partition
+        :return: name of the file relative to the root path and the opened file
+        """
+        if len(self.open_files) >= self.max_open_files:
+            oldest_partition_hour = min(self.open_files)
+            self.open_files.pop(oldest_partition_hour)[1].close()
+
+        # a new file also if the hour has files already, e.g. of a previous run
+        sequence = 0
+        file_name = self.get_partition_file_name(partition_hour, sequence)
+        while file_name in self.manifest or os.path.exists(os.path.join(self.root_path, file_name)):
+            sequence += 1
+            file_name = self.get_partition_file_name(partition_hour, sequence)
+        file_path = os.path.join(self.root_path, file_name)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tweets_file = gzip.open(file_path, 'xt', encoding='utf-8', compresslevel=self.compress_level)
+        self.open_files[partition_hour] = (file_name, tweets_file)
+        self.save_manifest()
+        return self.open_files[partition_hour]
+
+    def close(self):
+        """
+        Close all open files and save the manifest
+        """
+        for file_name, tweets_file in self.open_files.values():
+            tweets_file.close()
+        self.open_files = {}
+        self.save_manifest()
+        self.log_statistics()
+
+    def log_statistics(self):
+        """
+        Log the number of written tweets and files
+        """
+        logging.info("Tweet file store: written {} tweets, {} files in manifest, {} open files".format(
+            self.written_count, len(self.manifest), len(self.open_files)))
+
+    def get_files_in_range(self, date_time_start: datetime, date_time_end: datetime):
+        """
+        Get the files which contain tweets in the given time range
+        :param date_time_start: start of the time range (utc)
+        :param date_time_end: end of the time range (utc)
+        :return: sorted list of file paths
+        """
+        file_names = [file_name for file_name, entry in self.manifest.items()
+                      if entry['start'] <= date_time_end and entry['end'] >= date_time_start]
+        return [os.path.join(self.root_path, file_name)
+                for file_name in sorted(file_names, key=lambda name: self.manifest[name]['start'])]
+
+    def read_tweets(self, date_time_start: datetime, date_time_end: datetime):
+        """
+        Read the tweets of all files which overlap the given time range. Tweets of these files outside of the range
+        are also returned.
+        :param date_time_start: start of the time range (utc)
+        :param date_time_end: end of the time range (utc)
+        :return: generator of tweet json objects
+        """
+        for file_path in self.get_files_in_range(date_time_start, date_time_end):
+            skipped_count = 0
+            try:
+                with gzip.open(file_path, 'rt', encoding='utf-8') as tweets_file:
+                    for line in tweets_file:
+                        if not line.strip():
+                            continue
+                        try:
+                            tweet = json.loads(line)
+                        except json.JSONDecodeError:
+                            # the last line of a file which was not closed can be cut off
+                            skipped_count += 1
+                            continue
+                        yield tweet
+            except (EOFError, UnicodeDecodeError, zlib.error, gzip.BadGzipFile) as e:
+                # the file was not closed e.g. after a crash, the tweets before its end are kept
+                logging.warning("Tweet file store: {} ends unexpectedly: {}".format(file_path, repr(e)))
+            if skipped_count > 0:
+                logging.warning("Tweet file store: skipped {} partial lines of {}".format(skipped_count, file_path))
+
+    def load_manifest(self):
+        """
+        Load the manifest of the store, an empty manifest is returned for a new store
+        :return: manifest as dict
+        """
+        manifest_path = os.path.join(self.root_path, self.manifest_file_name)
+        if not os.path.exists(manifest_path):
+            return {}
+
+        with open(manifest_path, 'r', encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+        return {file_name: {'start': datetime.fromisoformat(entry['start']),
+                            'end': datetime.fromisoformat(entry['end']),
+                            'count': entry['count']}
+                for file_name, entry in manifest.items()}
+
+    def save_manifest(self):
+        """
+        Save the manifest of the store, the old manifest is getting replaced atomically. The files which are still open
+        are saved with the bounds of their hour and the count of the tweets written so far.
+        """
+        os.makedirs(self.root_path, exist_ok=True)
+        manifest = {file_name: {'start': entry['start'].isoformat(),
+                                'end': entry['end'].isoformat(),
+                                'count': entry['count']}
+                    for file_name, entry in self.manifest.items()}
+        for partition_hour, (file_name, tweets_file) in self.open_files.items():
+            manifest[file_name] = {'start': partition_hour.isoformat(),
+                                   'end': (partition_hour + timedelta(hours=1, microseconds=-1)).isoformat(),
+                                   'count': self.manifest[file_name]['count'] if file_name in self.manifest else 0}
+        manifest_path = os.path.join(self.root_path, self.manifest_file_name)
+        with open(manifest_path + '.tmp', 'w', encoding='utf-8') as manifest_file:
+            json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+    @staticmethod
+    def get_partition_file_name(partition_hour, sequence):
+        """
+        Create the relative file name of a partition e.g. 2022/01/01/tweets_2022-01-01_13_000.jsonl.gz
+        :param partition_hour: start of the hour of the partition
+        :param sequence: number of the file within the hour
+        :return: relative file name
+        """
+        return f"{partition_hour:%Y/%m/%d}/tweets_{partition_hour:%Y-%m-%d_%H}_{sequence:03d}.jsonl.gz"
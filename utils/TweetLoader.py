@@ -0,0 +1,150 @@
+from datetime import datetime
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from utils.ParquetTweetStore import ParquetTweetStore
+
+
+class TweetLoader:
+    """
+    Loads tweets of time ranges from a parquet tweet store and keeps the decoded row groups in memory. Repeated loads,
+    e.g. for every partition type or for sub ranges, reuse the decoded tweets instead of reading the files again.
+    """
+
+    def __init__(self, tweet_store: ParquetTweetStore, columns=None):
+        """
+        :param tweet_store: the store to load the tweets from
+        :param columns: default columns to load, None to load all columns
+        """
+        self.tweet_store = tweet_store
+        self.columns = columns
+
+        # file path -> parquet metadata and (file path, row group) -> decoded data frame
+        self.metadata_cache = {}
+        self.row_group_cache = {}
+
+        # statistics
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def load(self, date_time_start: datetime = None, date_time_end: datetime = None, columns=None):
+        """
+        Load the tweets of a time range, only the row groups of the range which are not cached yet are read
+        :param date_time_start: start of the time range, None to load from the first tweet
+        :param date_time_end: end of the time range (inclusive), None to load till the last tweet
+        :param columns: columns to load, None for the default columns of the loader
+        :return: tweets data frame with created_at as index sorted by time
+        """
+        read_columns = self.get_read_columns(columns)
+        row_group_dfs = []
+        for file_path in self.tweet_store.get_file_paths(date_time_start, date_time_end):
+            row_group_dfs += self.get_row_group_dfs(file_path, date_time_start, date_time_end, read_columns)
+        return self.select_range(row_group_dfs, date_time_start, date_time_end, read_columns)
+
+    def iter_batches(self, date_time_start: datetime = None, date_time_end: datetime = None, columns=None,
+                     batch_size: int = 100000):
+        """
+        Lazily load the tweets of a time range day by day, e.g. to stream graphs with TwitterGraphCreator
+        :param date_time_start: start of the time range, None to load from the first tweet
+        :param date_time_end: end of the time range (inclusive), None to load till the last tweet
+        :param columns: columns to load, None for the default columns of the loader
+        :param batch_size: max number of tweets per batch
+        :return: generator of tweet data frames with created_at as index ordered by time
+        """
+        read_columns = self.get_read_columns(columns)
+        for day in self.tweet_store.get_days(date_time_start, date_time_end):
+            row_group_dfs = []
+            for file_path in self.tweet_store.get_day_file_paths(day):
+                row_group_dfs += self.get_row_group_dfs(file_path, date_time_start, date_time_end, read_columns)
+            day_df = self.select_range(row_group_dfs, date_time_start, date_time_end, read_columns)
+            for offset in range(0, day_df.shape[0], batch_size):
+                yield day_df.iloc[offset:offset + batch_size]
+
+    def get_row_group_dfs(self, file_path, date_time_start, date_time_end, read_columns):
+        """
+        Get the decoded row groups of a file which overlap the time range. Missing row groups are read together from
+        the memory mapped file and cached.
+        :param file_path: path of the parquet file
+        :param date_time_start: start of the time range, None for no lower bound
+        :param date_time_end: end of the time range (inclusive), None for no upper bound
+        :param read_columns: columns to load including created_at
+        :return: list of data frames with created_at as index
+        """
+        if file_path not in self.metadata_cache:
+            self.metadata_cache[file_path] = pq.ParquetFile(file_path, memory_map=True).metadata
+        metadata = self.metadata_cache[file_path]
+        row_groups = self.tweet_store.get_row_groups(metadata, date_time_start, date_time_end)
+
+        # a cached row group is reused if it contains all requested columns
+        missing_row_groups = []
+        for row_group_idx in row_groups:
+            cached_df = self.row_group_cache.get((file_path, row_group_idx))
+            if cached_df is not None and set(read_columns[1:]).issubset(cached_df.columns):
+                self.hit_count += 1
+            else:
+                missing_row_groups.append(row_group_idx)
+
+        if missing_row_groups:
+            self.miss_count += len(missing_row_groups)
+            self.read_row_groups(file_path, metadata, missing_row_groups, read_columns)
+
+        return [self.row_group_cache[(file_path, row_group_idx)][read_columns[1:]] for row_group_idx in row_groups]
+
+    def read_row_groups(self, file_path, metadata, row_groups, read_columns):
+        """
+        Read and decode row groups of a file into the cache. Columns which were already cached for a row group are
+        read again, so every cached row group is one data frame.
+        """
+        columns = list(read_columns)
+        for row_group_idx in row_groups:
+            cached_df = self.row_group_cache.get((file_path, row_group_idx))
+            if cached_df is not None:
+                columns += [column for column in cached_df.columns if column not in columns]
+
+        parquet_file = pq.ParquetFile(file_path, memory_map=True)
+        table = parquet_file.read_row_groups(row_groups, columns=columns)
+        offset = 0
+        for row_group_idx in row_groups:
+            num_rows = metadata.row_group(row_group_idx).num_rows
+            self.row_group_cache[(file_path, row_group_idx)] = self.tweet_store.to_tweets_df(
+                table.slice(offset, num_rows))
+            offset += num_rows
+
+    def select_range(self, tweets_dfs, date_time_start, date_time_end, read_columns):
+        """
+        Concatenate decoded row groups and select the tweets of the time range
+        :return: tweets data frame with created_at as index sorted by time
+        """
+        if not tweets_dfs:
+            empty_table = self.tweet_store.schema.empty_table().select(read_columns)
+            return self.tweet_store.to_tweets_df(empty_table)
+
+        tweets_df = pd.concat(tweets_dfs).sort_index(kind='mergesort')
+        start = pd.Timestamp(date_time_start) if date_time_start is not None else None
+        end = pd.Timestamp(date_time_end) if date_time_end is not None else None
+        return tweets_df.loc[start:end]
+
+    def get_read_columns(self, columns=None):
+        """
+        :param columns: requested columns, None for the default columns of the loader
+        :return: columns to read including created_at as first column
+        """
+        return self.tweet_store.get_read_columns(columns if columns is not None else self.columns)
+
+    def get_statistics(self):
+        """
+        Get the cache statistics of the loader
+        :return: statistics as dict
+        """
+        return {'cached_row_groups': len(self.row_group_cache),
+                'cached_tweets': sum(df.shape[0] for df in self.row_group_cache.values()),
+                'hits': self.hit_count,
+                'misses': self.miss_count}
+
+    def clear_cache(self):
+        """
+        Release the decoded tweets
+        """
+        self.metadata_cache.clear()
+        self.row_group_cache.clear()
@@ -0,0 +1,113 @@
+from datetime import datetime
+import os
+import time
+
+import pandas as pd
+
+from utils.ParquetTweetStore import ParquetTweetStore
+from utils.TweetLoader import TweetLoader
+
+
+def get_year_range(year):
+    """
+    :param year: the year e.g. '2018'
+    :return: first and last date time of the year
+    """
+    return datetime(int(year), 1, 1), datetime(int(year), 12, 31, 23, 59, 59, 999999)
+
+
+def read_monthly_data(tweets_data_path, year):
+    """
+    Read the monthly tweets data csv Files and create one full data frame
+    :param tweets_data_path: the path where the files are
+    :param year: the year in which the data is collected
+    :return: complete data frame containing all tweets
+    """
+    print(f"Start reading Files for Method Comparison for year {year}")
+    # Twitter dataframe converters
+    twitter_df_converters = {
+        'created_at': pd.to_datetime,
+        'text': str,
+        'hashtags': eval,
+        'mentions': eval,
+        'domains': eval,
+        'user_screen_name': str,
+    }
+
+    # create time frame based graphs
+    monthly_df_list = []
+    for root, dirs, files in os.walk(tweets_data_path + year + '/'):
+        for file in files:
+
+            if not file.endswith(".csv"):
+                continue
+            start_time = time.time()
+            monthly_df = pd.read_csv(root + file, converters=twitter_df_converters, header=0)
+            monthly_df.set_index('created_at', inplace=True)
+            monthly_df_list.append(monthly_df)
+            print(
+                f"Successfully loaded data from file: {file} with shape {monthly_df.shape[0]} took: "
+                f"{round(float(time.time() - start_time), 2)}[s]")
+
+    if not monthly_df_list:
+        raise FileNotFoundError(f"No tweets csv files of year {year} in {tweets_data_path}")
+    complete_tweets_df = pd.concat(monthly_df_list)
+    print(f"Concatenated all monthly tweets final size: {complete_tweets_df.shape[0]}")
+    return complete_tweets_df
+
+
+def read_tweets_store(tweet_loader: TweetLoader, year):
+    """
+    Load the tweets of a year from the parquet tweet store, only the columns of the loader are read and the entity
+    columns are already lists
+    :param tweet_loader: TweetLoader of the parquet tweet store
+    :param year: the year in which the data is collected
+    :return: complete data frame containing all tweets
+    """
+    print(f"Start reading tweets store for Method Comparison for year {year}")
+    start_time = time.time()
+    complete_tweets_df = tweet_loader.load(*get_year_range(year))
+    print(f"Successfully loaded {complete_tweets_df.shape[0]} tweets from store took: "
+          f"{round(float(time.time() - start_time), 2)}[s]")
+    return complete_tweets_df
+
+
+def has_tweets_store_year(tweets_store_path, year):
+    """
+    Check whether the tweets of a year are converted to the parquet tweet store, the store is only used for the
+    converted years
+    :param tweets_store_path: root path of the ParquetTweetStore
+    :param year: the year in which the data is collected
+    :return: True if the store has files of the year
+    """
+    if not os.path.isdir(tweets_store_path):
+        return False
+    return len(ParquetTweetStore(tweets_store_path).get_file_paths(*get_year_range(year))) > 0
+
+
+def read_year_tweets(tweets_data_path, tweet_loader: TweetLoader, tweets_store_path, year):
+    """
+    Read the tweets of a year from the parquet tweet store if the year is converted, otherwise from the csv files
+    :param tweets_data_path: the path of the monthly csv files
+    :param tweet_loader: TweetLoader of the parquet tweet store
+    :param tweets_store_path: root path of the ParquetTweetStore
+    :param year: the year in which the data is collected
+    :return: complete data frame containing all tweets
+    """
+    if has_tweets_store_year(tweets_store_path, year):
+        return read_tweets_store(tweet_loader, year)
+    return read_monthly_data(tweets_data_path, year)
+
+
+def get_tweets_input_files(tweets_data_path, tweets_store_path, year):
+    """
+    Get the files the tweets of a year are read from
+    :param tweets_data_path: the path of the monthly csv files
+    :param tweets_store_path: root path of the ParquetTweetStore which is used if the year is converted
+    :param year: the year in which the data is collected
+    :return: list of file paths
+    """
+    if has_tweets_store_year(tweets_store_path, year):
+        return ParquetTweetStore(tweets_store_path).get_file_paths(*get_year_range(year))
+    return [os.path.join(root, file) for root, dirs, files in os.walk(tweets_data_path + year + '/') for file in files
+            if file.endswith(".csv")]
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from pymongo import ASCENDING, UpdateOne
+
+# field of the stored tweets containing the parsed created_at date time
+TIMESTAMP_FIELD = 'created_at_date'
+
+TWITTER_DATE_TIME_FORMAT = '%a %b %d %H:%M:%S +0000 %Y'
+
+
+def parse_created_at(created_at):
+    """
+    Parse the created_at string of a raw tweet
+    :param created_at: created_at string e.g. 'Sat Jan 01 00:00:00 +0000 2022'
+    :return: datetime (utc)
+    """
+    return datetime.strptime(created_at, TWITTER_DATE_TIME_FORMAT)
+
+
+def add_timestamp(document):
+    """
+    Add the parsed created_at date time to a raw tweet
+    :param document: the tweet as json object
+    :return: the tweet
+    """
+    document[TIMESTAMP_FIELD] = parse_created_at(document['created_at'])
+    return document
+
+
+def create_timestamp_index(collection):
+    """
+    Create the index on the parsed created_at date time, nothing happens if it already exists. The equality field
+    retweeted comes before the range field, so the time range of the retweets or not retweets is one index range.
+    :param collection: mongo database collection of crawled tweets
+    """
+    collection.create_index([('retweeted', ASCENDING), (TIMESTAMP_FIELD, ASCENDING)])
+
+
+def migrate_collection(collection, batch_size: int = 1000):
+    """
+    Add the parsed created_at date time to all stored tweets which do not have it yet and create the index
+    :param collection: mongo database collection of crawled tweets
+    :param batch_size: number of tweets updated per bulk write
+    :return: number of migrated tweets
+    """
+    migrated_count = 0
+    updates = []
+    for tweet in collection.find({TIMESTAMP_FIELD: {'$exists': False}}, {'created_at': 1}).batch_size(batch_size):
+        updates.append(UpdateOne({'_id': tweet['_id']},
+                                 {'$set': {TIMESTAMP_FIELD: parse_created_at(tweet['created_at'])}}))
+        if len(updates) >= batch_size:
+            collection.bulk_write(updates, ordered=False)
+            migrated_count += len(updates)
+            updates = []
+
+    if updates:
+        collection.bulk_write(updates, ordered=False)
+        migrated_count += len(updates)
+
+    create_timestamp_index(collection)
+    print(f"Migrated {migrated_count} tweets of {collection.name}")
+    return migrated_count